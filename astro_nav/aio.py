@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing as mp
+import os
+import threading
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Deque, Iterable, List, TypeVar
+
+import numpy as np
+
+from .batch import _failure, _init_worker, _process_one
+from .config import ProcessingConfig
+from .image_source import ImageSource
+from .pipeline import LatitudeEstimator
+from .plate_solver import CentroidPlateSolver
+from .types import ProcessingResult
+
+T = TypeVar("T")
+
+
+class AsyncLatitudeEstimator:
+    """
+    asyncio front end of `LatitudeEstimator`. A request decodes on `decode_executor` and runs
+    detection and the pole search on `compute_executor`; both default to owned thread pools
+    (the detector keeps per-thread buffers, so one estimator is shared). At most
+    `max_concurrency` requests hold a slot at once; waiting ones hold no thread and no frame.
+    With `processes > 0` each request instead runs as one task on a pool of warm worker
+    processes (see astro_nav.batch), which keeps the south search off the GIL. The workers
+    build their estimators from `config` alone, so `plate_solver` is not applied there. If a
+    worker dies the pool is replaced and the affected request is retried once on the new one.
+
+    Timeouts cover queueing and both stages. Cancelling a request stops it at the next stage
+    boundary; a stage already running on an executor finishes there and its result is dropped.
+    The slot is held until that stage finishes, so abandoned work still counts against
+    `max_concurrency`.
+    """
+
+    def __init__(
+        self,
+        config: ProcessingConfig | None = None,
+        plate_solver: CentroidPlateSolver | None = None,
+        max_concurrency: int = 8,
+        decode_executor: Executor | None = None,
+        compute_executor: Executor | None = None,
+        processes: int = 0,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.estimator = LatitudeEstimator(config, plate_solver=plate_solver)
+        self.max_concurrency = max_concurrency
+        self._owned: List[Executor] = []
+        self._processes = processes
+        self._pool: ProcessPoolExecutor | None = None
+        self._pool_lock = threading.Lock()
+        if processes > 0:
+            self._pool = self._new_pool()
+        if decode_executor is None:
+            decode_executor = ThreadPoolExecutor(max_concurrency, thread_name_prefix="astro-decode")
+            self._owned.append(decode_executor)
+        if compute_executor is None:
+            compute_executor = ThreadPoolExecutor(
+                min(max_concurrency, os.cpu_count() or 1), thread_name_prefix="astro-compute"
+            )
+            self._owned.append(compute_executor)
+        self.decode_executor = decode_executor
+        self.compute_executor = compute_executor
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    async def process_file(
+        self,
+        image_path: str | ImageSource,
+        hemisphere_mode: str,
+        day_of_year: float | None = None,
+        timeout: float | None = None,
+    ) -> ProcessingResult:
+        """Async `LatitudeEstimator.process_file`; raises TimeoutError after `timeout` seconds."""
+        async with asyncio.timeout(timeout):
+            async with _Slot(self._slots) as slot:
+                if self._pool is not None:
+                    # Only paths cross the process boundary (see batch.process_many).
+                    path = os.fspath(image_path)
+                    pool = self._pool
+                    try:
+                        return await slot.run(pool, _process_one, path, hemisphere_mode, day_of_year)
+                    except BrokenProcessPool:
+                        pool = self._replace_pool(pool)
+                        return await slot.run(pool, _process_one, path, hemisphere_mode, day_of_year)
+                est = self.estimator
+                try:
+                    image, scale, full_size = await slot.run(self.decode_executor, est._decode, image_path)
+                except (ValueError, OSError):
+                    return est._unreadable(image_path, hemisphere_mode)
+                return await slot.run(
+                    self.compute_executor, est._process, image, hemisphere_mode, scale, full_size, day_of_year
+                )
+
+    async def process_image(
+        self,
+        image_bgr: np.ndarray,
+        hemisphere_mode: str,
+        day_of_year: float | None = None,
+        timeout: float | None = None,
+    ) -> ProcessingResult:
+        """Async `LatitudeEstimator.process_image` (compute stage only, always in-process)."""
+        async with asyncio.timeout(timeout):
+            async with _Slot(self._slots) as slot:
+                return await slot.run(
+                    self.compute_executor, self.estimator.process_image, image_bgr, hemisphere_mode, day_of_year
+                )
+
+    async def stream(
+        self,
+        image_paths: Iterable[str | ImageSource] | AsyncIterable[str | ImageSource],
+        hemisphere_mode: str,
+        day_of_year: float | None = None,
+        timeout: float | None = None,
+        ordered: bool = False,
+    ) -> AsyncIterator[ProcessingResult]:
+        """
+        Yields one result per input (completion order unless `ordered`), each with `source` set.
+        Inputs are pulled lazily, 2 * max_concurrency ahead at most. Timeouts and errors become
+        failed results for that input; closing the iterator cancels the requests still pending.
+        """
+        source = image_paths.__aiter__() if hasattr(image_paths, "__aiter__") else _aiter(image_paths)
+        pending: Deque[asyncio.Task] = deque()
+        limit = 2 * self.max_concurrency
+        exhausted = False
+
+        async def fill() -> None:
+            nonlocal exhausted
+            while not exhausted and len(pending) < limit:
+                try:
+                    item = await source.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    return
+                pending.append(asyncio.ensure_future(self._guarded(item, hemisphere_mode, day_of_year, timeout)))
+
+        try:
+            await fill()
+            while pending:
+                if ordered:
+                    task = pending.popleft()
+                else:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    task = next(t for t in pending if t in done)
+                    pending.remove(task)
+                result = await task
+                await fill()
+                yield result
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _guarded(
+        self, image_path: str | ImageSource, hemisphere_mode: str, day_of_year: float | None, timeout: float | None
+    ) -> ProcessingResult:
+        path = str(getattr(image_path, "path", image_path))
+        try:
+            result = await self.process_file(image_path, hemisphere_mode, day_of_year, timeout)
+        except TimeoutError:
+            return _failure(path, hemisphere_mode, f"Zaman asimi: {timeout:g} s icinde islenemedi.")
+        except Exception as exc:
+            return _failure(path, hemisphere_mode, f"Isleme hatasi: {type(exc).__name__}: {exc}")
+        result.source = path
+        return result
+
+    def close(self) -> None:
+        """
+        Shuts down the executors this instance created and the estimator's auto-mode helper
+        thread; running stages are not waited for.
+        """
+        for executor in self._owned:
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._owned.clear()
+        self.estimator.close(wait=False)
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        pool = ProcessPoolExecutor(
+            self._processes,
+            mp_context=mp.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.estimator.config,),
+        )
+        self._owned.append(pool)
+        return pool
+
+    def _replace_pool(self, broken: ProcessPoolExecutor) -> ProcessPoolExecutor:
+        """Swaps a broken worker pool for a fresh one, once per crash (requests race here)."""
+        with self._pool_lock:
+            if self._pool is broken and broken in self._owned:  # not after close()
+                self._owned.remove(broken)
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._pool = self._new_pool()
+            return self._pool
+
+    async def __aenter__(self) -> "AsyncLatitudeEstimator":
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        self.close()
+
+
+class _Slot:
+    """
+    One `max_concurrency` slot. On exit it is released at once if no executor work is running,
+    otherwise when that work completes (a timeout or cancel cannot stop a running stage).
+    """
+
+    def __init__(self, slots: asyncio.Semaphore) -> None:
+        self.slots = slots
+        self.running: Future | None = None
+
+    async def __aenter__(self) -> "_Slot":
+        await self.slots.acquire()
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        running = self.running
+        if running is None or running.done():
+            self.slots.release()
+            return
+        loop = asyncio.get_running_loop()
+
+        def release(_: Future) -> None:
+            try:
+                loop.call_soon_threadsafe(self.slots.release)
+            except RuntimeError:  # loop already closed
+                pass
+
+        running.add_done_callback(release)
+
+    async def run(self, executor: Executor, fn: Callable[..., T], *args: Any) -> T:
+        self.running = executor.submit(fn, *args)
+        return await asyncio.wrap_future(self.running)
+
+
+async def _aiter(items: Iterable[str | ImageSource]) -> AsyncIterator[str | ImageSource]:
+    for item in items:
+        yield item
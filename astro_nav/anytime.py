@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, List, Optional, Sequence, TypeVar
+
+from .types import DetectedStar
+
+T = TypeVar("T")
+
+
+def _now() -> float:
+    return time.perf_counter()
+
+
+class Deadline:
+    """Wall-clock budget; `None` never expires. `clock` (seconds) defaults to perf_counter."""
+
+    def __init__(self, budget_ms: float | None, clock: Callable[[], float] | None = None) -> None:
+        self.clock = clock or _now
+        self.start = self.clock()
+        self.end = None if budget_ms is None else self.start + budget_ms / 1000.0
+
+    def remaining(self) -> float:
+        return float("inf") if self.end is None else self.end - self.clock()
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+
+def prior_order(
+    stars: Sequence[DetectedStar],
+    image_w: int,
+    image_h: int,
+    vertical_weight: float = 0.0,
+    central_weight: float = 0.0,
+) -> List[DetectedStar]:
+    """
+    Stars by prior likelihood of belonging to the target asterism: brightness, plus optional
+    bonuses for sitting high in the frame or near its center. Stable for equal priors.
+    """
+    half_diag = max(1.0, 0.5 * (image_w**2 + image_h**2) ** 0.5)
+
+    def prior(s: DetectedStar) -> float:
+        p = s.brightness / 255.0
+        if vertical_weight:
+            p += vertical_weight * (1.0 - s.y / max(1.0, float(image_h)))
+        if central_weight:
+            off = ((s.x - 0.5 * image_w) ** 2 + (s.y - 0.5 * image_h) ** 2) ** 0.5
+            p += central_weight * (1.0 - off / half_diag)
+        return p
+
+    return sorted(stars, key=prior, reverse=True)
+
+
+def pool_schedule(total: int, first: int, cap: int) -> List[int]:
+    """Doubling pool sizes from `first` while below `cap`, ending with `total`."""
+    sizes: List[int] = []
+    size = max(1, first)
+    while size < min(cap, total):
+        sizes.append(size)
+        size *= 2
+    sizes.append(total)
+    return sizes
+
+
+def anytime_search(
+    solve: Callable[[Sequence[DetectedStar]], Optional[T]],
+    stars: Sequence[DetectedStar],
+    schedule: Sequence[int],
+    deadline: Deadline,
+    rank: Callable[[T], Any],
+    growth: float = 2.0,
+    cap: int | None = None,
+) -> tuple[Optional[T], bool]:
+    """
+    Runs `solve` on progressively larger prefixes of `stars` and keeps the result with the
+    highest `rank`. The first stage always runs; a later stage is skipped when the deadline
+    has passed or the previous stage's time (on the deadline's clock) scaled by
+    (pool ratio) ** `growth` would overrun it. Pools above `cap` are costed as `cap` (the
+    solver truncates them itself).
+    Returns (best, truncated).
+    """
+    best: Optional[T] = None
+    previous: Optional[tuple[int, float]] = None
+    for size in schedule:
+        effective = size if cap is None else min(size, cap)
+        if previous is not None:
+            last_size, last_cost = previous
+            estimate = last_cost * (effective / max(1, last_size)) ** growth
+            if deadline.expired() or estimate > deadline.remaining():
+                return best, True
+        t0 = deadline.clock()
+        result = solve(stars[:size])
+        previous = (effective, deadline.clock() - t0)
+        if result is not None and (best is None or rank(result) > rank(best)):
+            best = result
+    return best, False
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Protocol
+
+import numpy as np
+
+from .config import DetectionConfig
+from .contour import find_star_blobs
+from .detection import StarDetector
+from .image_source import to_display_8bit
+from .types import DetectedStar
+
+
+class DetectorBackend(Protocol):
+    """
+    Shared detector contract: BGR or single-channel frame in, `DetectedStar` list out,
+    brightest first, at most `top_star_limit` entries, coordinates in input pixels.
+    """
+
+    def detect(self, image: np.ndarray) -> List[DetectedStar]: ...
+
+
+BackendFactory = Callable[[DetectionConfig], DetectorBackend]
+
+_REGISTRY: Dict[str, BackendFactory] = {}
+
+
+def register_backend(name: str, factory: BackendFactory | None = None):
+    """Register a factory under `name`; usable directly or as a decorator."""
+
+    def _register(f: BackendFactory) -> BackendFactory:
+        _REGISTRY[name] = f
+        return f
+
+    return _register(factory) if factory is not None else _register
+
+
+def available_backends() -> List[str]:
+    return sorted(_REGISTRY)
+
+
+def create_detector(name: str, config: DetectionConfig | None = None) -> DetectorBackend:
+    factory = _REGISTRY.get(name)
+    if factory is None:
+        raise ValueError(f"unknown detector backend: {name} (available: {', '.join(available_backends())})")
+    return factory(config or DetectionConfig())
+
+
+class PyramidBackend:
+    """StarDetector in coarse-to-fine mode."""
+
+    def __init__(self, config: DetectionConfig) -> None:
+        self.detector = StarDetector(config)
+
+    def detect(self, image: np.ndarray) -> List[DetectedStar]:
+        return self.detector.detect_coarse_to_fine(image)
+
+
+class AutoBackend:
+    """Full-resolution StarDetector, switching to the pyramid above `pyramid_pixel_budget`."""
+
+    def __init__(self, config: DetectionConfig) -> None:
+        self.config = config
+        self.detector = StarDetector(config)
+
+    def detect(self, image: np.ndarray) -> List[DetectedStar]:
+        budget = self.config.pyramid_pixel_budget
+        h, w = image.shape[:2]
+        if budget > 0 and h * w > budget:
+            return self.detector.detect_coarse_to_fine(image)
+        return self.detector.detect(image)
+
+
+class ContourBackend:
+    """Adaptive-threshold contour detector (astro_nav.contour) behind the shared contract."""
+
+    def __init__(self, config: DetectionConfig) -> None:
+        self.config = config
+
+    def detect(self, image: np.ndarray) -> List[DetectedStar]:
+        if image.ndim == 3:
+            # Same luminance weights as star_detection.load_luminance.
+            image = np.dot(image[..., ::-1].astype(np.float32), [0.299, 0.587, 0.114]).astype(np.uint8)
+        image = np.ascontiguousarray(to_display_8bit(image))
+        blobs = find_star_blobs(image, self.config.centroid_method, self.config.centroid_radius_px)
+        stars = [
+            DetectedStar(x=x, y=y, brightness=brightness, radius_px=float(np.sqrt(area / np.pi)))
+            for x, y, brightness, area in blobs
+        ]
+        stars.sort(key=lambda s: s.brightness, reverse=True)
+        return stars[: self.config.top_star_limit]
+
+
+register_backend("auto", AutoBackend)
+register_backend("clahe", StarDetector)
+register_backend("pyramid", PyramidBackend)
+register_backend("contour", ContourBackend)
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Deque, Iterable, Iterator, List
+
+from .config import ProcessingConfig
+from .types import ProcessingResult
+
+# Worker-process estimator, built once by the pool initializer.
+_ESTIMATOR = None
+
+
+def _init_worker(config: ProcessingConfig) -> None:
+    global _ESTIMATOR
+    from .pipeline import LatitudeEstimator
+
+    _ESTIMATOR = LatitudeEstimator(config)
+
+
+def _process_one(path: str, hemisphere_mode: str, day_of_year: float | None = None) -> ProcessingResult:
+    try:
+        result = _ESTIMATOR.process_file(path, hemisphere_mode, day_of_year)
+    except Exception as exc:  # one bad frame must not take the batch down
+        result = _failure(path, hemisphere_mode, f"Isleme hatasi: {type(exc).__name__}: {exc}")
+    result.source = path
+    return result
+
+
+def _failure(path: str, hemisphere_mode: str, message: str) -> ProcessingResult:
+    return ProcessingResult(
+        success=False,
+        hemisphere_mode=hemisphere_mode,
+        stars=[],
+        detected_patterns=[],
+        warnings=[message],
+        source=path,
+    )
+
+
+def _lost(future: Future) -> bool:
+    """True unless the future already holds the frame's own result or error."""
+    if not future.done() or future.cancelled():
+        return True
+    return isinstance(future.exception(), BrokenProcessPool)
+
+
+def process_many(
+    paths: Iterable[str | os.PathLike],
+    hemisphere_mode: str,
+    config: ProcessingConfig | None = None,
+    workers: int | None = None,
+    ordered: bool = True,
+    max_in_flight: int | None = None,
+    start_method: str = "spawn",
+    day_of_year: float | None = None,
+) -> Iterator[ProcessingResult]:
+    """
+    Streams `ProcessingResult`s for image `paths` computed on a pool of `workers` processes
+    (default: every core), each holding one warm `LatitudeEstimator`. Only paths cross the
+    process boundary; open `ImageSource`s are not accepted. `paths` is consumed lazily: at
+    most `max_in_flight` (default 2 * workers) frames are submitted at a time. `ordered=False`
+    yields in completion order; every result carries its input in `source`. `day_of_year`
+    (capture date, shared by the batch) feeds the sky-pattern prior as in `process_file`.
+    Errors become failed results for the affected frame only. When a worker dies, every frame
+    in flight on that pool and not yet finished is retried once on a fresh pool, one retry at a time so the frame
+    that crashed it cannot take the others down again; a frame whose retry also crashes fails.
+    """
+    config = config or ProcessingConfig()
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max(1, max_in_flight or 2 * workers)
+    ctx = mp.get_context(start_method)
+
+    def new_pool() -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(workers, mp_context=ctx, initializer=_init_worker, initargs=(config,))
+
+    source = iter(paths)
+    pool = new_pool()
+    # [input, future, pool that ran it, retried]; a retry waiting for its turn has no future.
+    pending: Deque[List[Any]] = deque()
+    exhausted = False
+
+    def submit(entry: List[Any]) -> None:
+        try:
+            future = pool.submit(_process_one, entry[0], hemisphere_mode, day_of_year)
+        except BrokenProcessPool:  # a worker died since the last result was read
+            recover(pool)
+            future = pool.submit(_process_one, entry[0], hemisphere_mode, day_of_year)
+        entry[1], entry[2] = future, pool
+
+    def fill() -> None:
+        nonlocal exhausted
+        while not exhausted and len(pending) < max_in_flight:
+            item = next(source, None)
+            if item is None:
+                exhausted = True
+                return
+            entry = [os.fspath(item), None, None, False]
+            submit(entry)
+            pending.append(entry)
+
+    def recover(broken: ProcessPoolExecutor) -> None:
+        # A crash is handled once, by the pool it broke: later frames get a fresh pool.
+        nonlocal pool
+        if broken is pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+            pool = new_pool()
+        for entry in pending:
+            if entry[2] is broken and not entry[3] and _lost(entry[1]):
+                entry[1], entry[2], entry[3] = None, None, True
+
+    def schedule_retry() -> None:
+        if any(e[3] and e[1] is not None and not e[1].done() for e in pending):
+            return
+        waiting = next((e for e in pending if e[3] and e[1] is None), None)
+        if waiting is not None:
+            submit(waiting)
+
+    try:
+        fill()
+        while pending:
+            schedule_retry()
+            running = [e[1] for e in pending if e[1] is not None]
+            if ordered:
+                entry = pending[0]
+                if entry[1] is None:
+                    wait(running, return_when=FIRST_COMPLETED)
+                    continue
+            else:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                entry = next(e for e in pending if e[1] in done)
+            path, future, owner, retried = entry
+            try:
+                result = future.result()
+            except (BrokenProcessPool, CancelledError):
+                recover(owner)
+                if not retried:
+                    continue
+                result = _failure(path, hemisphere_mode, "Isleme sureci coktu; kare islenemedi.")
+            except Exception as exc:
+                result = _failure(path, hemisphere_mode, f"Isleme hatasi: {type(exc).__name__}: {exc}")
+            del pending[next(i for i, e in enumerate(pending) if e is entry)]
+            fill()
+            yield result
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
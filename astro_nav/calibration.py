@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import Iterable, Optional
+
+import cv2
+import numpy as np
+
+_META_FILE = "calibration.json"
+_HOT_FILE = "hot_pixels.npy"
+_DARK_FILE = "master_dark.npy"
+
+# 8-neighbourhood used to patch hot pixels.
+_NEIGHBOURS = np.array([(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)])
+
+
+class DarkCalibration:
+    """
+    Per-device sensor calibration: hot-pixel coordinates and an optional master dark.
+    Stored as a directory of .npy arrays plus a small JSON header; arrays are opened
+    memory-mapped, so loading costs nothing until pixels are touched.
+    """
+
+    def __init__(self, shape: tuple[int, int], hot_pixels: np.ndarray, master_dark: Optional[np.ndarray] = None) -> None:
+        self.shape = (int(shape[0]), int(shape[1]))
+        self.hot_pixels = hot_pixels
+        self.master_dark = master_dark
+
+    @classmethod
+    def build(
+        cls,
+        dark_frames: Iterable[np.ndarray | str],
+        hot_sigma: float = 6.0,
+        min_excess: float = 24.0,
+        keep_dark: bool = True,
+    ) -> "DarkCalibration":
+        """
+        Average lens-capped frames (streaming, one frame in memory) and flag pixels whose mean
+        sits `hot_sigma` robust sigmas and at least `min_excess` gray levels above the median.
+        """
+        total: Optional[np.ndarray] = None
+        count = 0
+        for frame in dark_frames:
+            if isinstance(frame, str):
+                path = frame
+                frame = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+                if frame is None:
+                    raise ValueError(f"Dark kare okunamadi: {path}")
+            elif frame.ndim == 3:
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            if total is None:
+                total = np.zeros(frame.shape[:2], dtype=np.float32)
+            elif frame.shape[:2] != total.shape:
+                raise ValueError("dark frames must share one resolution")
+            cv2.accumulate(frame, total)
+            count += 1
+        if total is None:
+            raise ValueError("no dark frames given")
+
+        mean = total / count
+        level = float(np.median(mean))
+        sigma = 1.4826 * float(np.median(np.abs(mean - level)))
+        hot = mean > level + max(hot_sigma * sigma, min_excess)
+        hot_pixels = np.argwhere(hot).astype(np.int32)
+        master_dark = np.clip(np.rint(mean), 0, 255).astype(np.uint8) if keep_dark else None
+        return cls(mean.shape, hot_pixels, master_dark)
+
+    def save(self, path: str) -> None:
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, _HOT_FILE), self.hot_pixels)
+        dark_file = os.path.join(path, _DARK_FILE)
+        if self.master_dark is not None:
+            np.save(dark_file, self.master_dark)
+        elif os.path.exists(dark_file):
+            os.remove(dark_file)
+        with open(os.path.join(path, _META_FILE), "w", encoding="utf-8") as f:
+            json.dump({"shape": list(self.shape), "hot_pixels": int(len(self.hot_pixels))}, f)
+
+    @classmethod
+    def load(cls, path: str) -> "DarkCalibration":
+        with open(os.path.join(path, _META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        hot_pixels = np.load(os.path.join(path, _HOT_FILE), mmap_mode="r")
+        dark_file = os.path.join(path, _DARK_FILE)
+        master_dark = np.load(dark_file, mmap_mode="r") if os.path.exists(dark_file) else None
+        return cls(tuple(meta["shape"]), hot_pixels, master_dark)
+
+    def apply(self, gray: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Dark-subtracted copy of `gray` with hot pixels replaced by their neighbour median.
+        `out` (same shape and type as `gray`) is reused when given.
+        """
+        if gray.shape[:2] != self.shape:
+            raise ValueError(f"calibration is for {self.shape[1]}x{self.shape[0]} frames, got {gray.shape[1]}x{gray.shape[0]}")
+        if self.master_dark is not None:
+            out = cv2.subtract(gray, np.asarray(self.master_dark), dst=out)
+        elif out is not None:
+            np.copyto(out, gray)
+        else:
+            out = gray.copy()
+        if len(self.hot_pixels) == 0:
+            return out
+
+        h, w = self.shape
+        ys = self.hot_pixels[:, 0]
+        xs = self.hot_pixels[:, 1]
+        rows = np.clip(ys[:, None] + _NEIGHBOURS[None, :, 0], 0, h - 1)
+        cols = np.clip(xs[:, None] + _NEIGHBOURS[None, :, 1], 0, w - 1)
+        out[ys, xs] = np.median(out[rows, cols], axis=1).astype(out.dtype)
+        return out
@@ -0,0 +1,407 @@
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import combinations, product
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+# Same catalog the Android app ships (name, raDeg, decDeg, mag, hemisphere).
+DEFAULT_CATALOG_PATH = Path(__file__).resolve().parent.parent / "src" / "main" / "assets" / "polar_star_catalog.json"
+
+_PAIRS = np.array(list(combinations(range(4), 2)))
+# For each of the 6 pairs, the two remaining quad members.
+_REST = np.array([[k for k in range(4) if k not in pair] for pair in _PAIRS])
+
+
+@dataclass(frozen=True)
+class CatalogStar:
+    name: str
+    ra_deg: float
+    dec_deg: float
+    mag: float
+    hemisphere: str
+
+
+def load_catalog(path: str | Path | None = None, hemisphere: str | None = None) -> List[CatalogStar]:
+    with open(path or DEFAULT_CATALOG_PATH, encoding="utf-8") as f:
+        raw = json.load(f)
+    stars = [
+        CatalogStar(
+            name=s["name"],
+            ra_deg=float(s["raDeg"]),
+            dec_deg=float(s["decDeg"]),
+            mag=float(s["mag"]),
+            hemisphere=s.get("hemisphere", ""),
+        )
+        for s in raw
+    ]
+    if hemisphere is not None:
+        stars = [s for s in stars if s.hemisphere == hemisphere]
+    return stars
+
+
+def unit_vectors(ra_deg: np.ndarray, dec_deg: np.ndarray) -> np.ndarray:
+    ra = np.radians(np.asarray(ra_deg, dtype=np.float64))
+    dec = np.radians(np.asarray(dec_deg, dtype=np.float64))
+    return np.stack([np.cos(dec) * np.cos(ra), np.cos(dec) * np.sin(ra), np.sin(dec)], axis=-1)
+
+
+def _tangent_basis(center: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    c = center / np.linalg.norm(center)
+    east = np.cross([0.0, 0.0, 1.0], c)
+    if np.linalg.norm(east) < 1e-9:  # center on a pole: any east direction will do
+        east = np.array([0.0, 1.0, 0.0])
+    east /= np.linalg.norm(east)
+    return c, east, np.cross(c, east)
+
+
+def gnomonic(vectors: np.ndarray, center: np.ndarray) -> np.ndarray:
+    """
+    Tangent-plane (xi east, eta north) coordinates in radians about `center`. Camera pixels
+    are a proper similarity of these, so quad codes need no mirror handling. Points more than
+    80 degrees from the center come back as NaN.
+    """
+    c, east, north = _tangent_basis(center)
+    cos_d = vectors @ c
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.stack([(vectors @ east) / cos_d, (vectors @ north) / cos_d], axis=-1)
+    out[cos_d < math.cos(math.radians(80.0))] = np.nan
+    return out
+
+
+def inverse_gnomonic(xi: float, eta: float, center: np.ndarray) -> np.ndarray:
+    """Unit vector of tangent-plane point (xi, eta) about `center`."""
+    c, east, north = _tangent_basis(center)
+    v = c + xi * east + eta * north
+    return v / np.linalg.norm(v)
+
+
+def quad_codes(points: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Similarity-invariant codes of (M, 4, 2) quads. The longest pair A, B is mapped to (0, 0)
+    and (1, 1); the code is the position of the other two (xc, yc, xd, yd), canonicalized by
+    xc + xd <= 1 and xc <= xd. Returns (codes (M, 4), member order A, B, C, D (M, 4)).
+    """
+    z = points[..., 0] + 1j * points[..., 1]
+    lengths = np.abs(z[:, _PAIRS[:, 0]] - z[:, _PAIRS[:, 1]])
+    longest = lengths.argmax(axis=1)
+    order = np.column_stack([_PAIRS[longest], _REST[longest]])
+    return _codes_for_order(z, order)
+
+
+def _codes_for_order(z: np.ndarray, order: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    zz = np.take_along_axis(z, order, axis=1)
+    w = (zz - zz[:, :1]) / (zz[:, 1:2] - zz[:, :1]) * (1 + 1j)
+    c, d = w[:, 2], w[:, 3]
+    order = order.copy()
+
+    flip = c.real + d.real > 1.0
+    c = np.where(flip, (1 + 1j) - c, c)
+    d = np.where(flip, (1 + 1j) - d, d)
+    order[flip] = order[flip][:, [1, 0, 2, 3]]
+
+    swap = c.real > d.real
+    c, d = np.where(swap, d, c), np.where(swap, c, d)
+    order[swap] = order[swap][:, [0, 1, 3, 2]]
+    return np.column_stack([c.real, c.imag, d.real, d.imag]), order
+
+
+class QuadHashIndex:
+    """
+    Quantized hash of quad codes. Each entry is stored in every cell its +-tolerance box
+    touches (at most 16), so a lookup is a single dict access plus an exact tolerance check.
+    """
+
+    def __init__(self, tolerance: float) -> None:
+        self.tolerance = tolerance
+        self.bin_width = 2.0 * tolerance
+        self.codes: List[np.ndarray] = []
+        self.members: List[tuple[int, ...]] = []
+        self._cells: Dict[tuple[int, ...], List[int]] = {}
+
+    def add(self, code: np.ndarray, members: Sequence[int]) -> None:
+        entry = len(self.codes)
+        self.codes.append(np.asarray(code, dtype=np.float64))
+        self.members.append(tuple(int(m) for m in members))
+        lo = np.floor((code - self.tolerance) / self.bin_width).astype(int)
+        hi = np.floor((code + self.tolerance) / self.bin_width).astype(int)
+        for cell in product(*[range(a, b + 1) for a, b in zip(lo, hi)]):
+            self._cells.setdefault(cell, []).append(entry)
+
+    def keys(self, codes: np.ndarray) -> List[tuple[int, ...]]:
+        return [tuple(k) for k in np.floor(codes / self.bin_width).astype(int).tolist()]
+
+    def cell_keys(self) -> List[tuple[int, ...]]:
+        return list(self._cells)
+
+    def cell(self, key: tuple[int, ...]) -> List[int]:
+        """Every entry stored in cell `key` (candidates for any code quantized to it)."""
+        return self._cells.get(key, [])
+
+    def query(self, code: np.ndarray, key: tuple[int, ...] | None = None) -> List[int]:
+        """Entries whose code is within `tolerance` of `code` in every component."""
+        cell = self._cells.get(key if key is not None else self.keys(code[None])[0], ())
+        return [e for e in cell if np.max(np.abs(self.codes[e] - code)) <= self.tolerance]
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+
+def fit_similarity(src: np.ndarray, dst: np.ndarray) -> tuple[complex, complex, float]:
+    """Least-squares dst = a * src + t over complex points; returns (a, t, rms residual)."""
+    s = src[:, 0] + 1j * src[:, 1]
+    d = dst[:, 0] + 1j * dst[:, 1]
+    sc = s - s.mean()
+    dc = d - d.mean()
+    a = complex(np.sum(np.conj(sc) * dc) / max(1e-300, float(np.sum(np.abs(sc) ** 2))))
+    t = complex(d.mean() - a * s.mean())
+    rms = float(np.sqrt(np.mean(np.abs(a * s + t - d) ** 2)))
+    return a, t, rms
+
+
+def fit_similarities(src: np.ndarray, dst: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """`fit_similarity` over (H, K) complex point sets at once; returns (a, t, rms) of shape (H,)."""
+    s_mean = src.mean(axis=1, keepdims=True)
+    d_mean = dst.mean(axis=1, keepdims=True)
+    sc = src - s_mean
+    a = np.sum(np.conj(sc) * (dst - d_mean), axis=1) / np.maximum(1e-300, np.sum(np.abs(sc) ** 2, axis=1))
+    t = d_mean[:, 0] - a * s_mean[:, 0]
+    rms = np.sqrt(np.mean(np.abs(a[:, None] * src + t[:, None] - dst) ** 2, axis=1))
+    return a, t, rms
+
+
+@dataclass(frozen=True)
+class CatalogMatch:
+    """Catalog-to-pixel similarity in the tangent plane about `center`."""
+
+    center: np.ndarray
+    scale_rotation: complex
+    offset: complex
+    # (catalog index, pixel index) of every verified star
+    pairs: List[tuple[int, int]]
+    residual_px: float
+    visible: int
+
+    def project(self, ra_deg: float, dec_deg: float) -> tuple[float, float]:
+        tan = gnomonic(unit_vectors(ra_deg, dec_deg)[None], self.center)[0]
+        p = self.scale_rotation * complex(tan[0], tan[1]) + self.offset
+        return (p.real, p.imag)
+
+
+@lru_cache(maxsize=8)
+def _quad_combinations(n: int) -> np.ndarray:
+    return np.array(list(combinations(range(n), 4)), dtype=np.intp).reshape(-1, 4)
+
+
+class AsterismMatcher:
+    """
+    Identifies catalog stars among detections by quad hashing: every catalog quad up to
+    `max_quad_deg` across is hashed once; each observed quad of the brightest candidates is one
+    hash lookup, and hits are verified by projecting the whole catalog through the fitted
+    similarity and counting detections within the match radius.
+    """
+
+    def __init__(
+        self,
+        stars: Sequence[CatalogStar],
+        tolerance: float = 0.02,
+        min_quad_deg: float = 2.0,
+        max_quad_deg: float = 40.0,
+    ) -> None:
+        self.stars = list(stars)
+        self.vectors = unit_vectors([s.ra_deg for s in self.stars], [s.dec_deg for s in self.stars])
+        self.index = QuadHashIndex(tolerance)
+        # Tangent coordinates of every catalog star about each hashed quad's center.
+        centers: List[np.ndarray] = []
+        planes: List[np.ndarray] = []
+
+        n = len(self.stars)
+        if n < 4:
+            return
+        quads = _quad_combinations(n)
+        cos_sep = np.clip(self.vectors @ self.vectors.T, -1.0, 1.0)
+        span = np.degrees(np.arccos(cos_sep[quads[:, _PAIRS[:, 0]], quads[:, _PAIRS[:, 1]]].min(axis=1)))
+        quads = quads[(span >= min_quad_deg) & (span <= max_quad_deg)]
+        for quad in quads:
+            center = self.vectors[quad].sum(axis=0)
+            center /= np.linalg.norm(center)
+            plane = gnomonic(self.vectors, center)
+            for code, order in _code_variants(plane[quad], tolerance):
+                self.index.add(code, (len(centers),) + tuple(quad[order]))
+            centers.append(center)
+            planes.append(plane)
+        self._centers = np.array(centers).reshape(-1, 3)
+        self._planes = np.array(planes).reshape(-1, n, 2)
+        self._planes_c = self._planes[:, :, 0] + 1j * self._planes[:, :, 1]
+
+    def match(
+        self,
+        xy: np.ndarray,
+        image_w: int,
+        image_h: int,
+        candidates: int = 16,
+        radius_px: float | None = None,
+        min_inliers: int = 5,
+        focal_px: float | None = None,
+        focal_tolerance: float = 0.35,
+    ) -> Optional[CatalogMatch]:
+        """
+        `xy`: detections brightest first. The first `candidates` form observed quads; all
+        detections count for verification. With `focal_px` (pixels per tangent-plane radian),
+        hypotheses whose scale is off by more than `focal_tolerance` are dropped unverified.
+        """
+        xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+        if len(self.index) == 0 or len(xy) < 4:
+            return None
+        radius = radius_px if radius_px is not None else max(3.0, 0.006 * max(image_w, image_h))
+        k = min(candidates, len(xy))
+        quads = _quad_combinations(k)
+        pts = xy[quads]
+        longest = np.abs(
+            (pts[:, _PAIRS[:, 0], 0] - pts[:, _PAIRS[:, 1], 0])
+            + 1j * (pts[:, _PAIRS[:, 0], 1] - pts[:, _PAIRS[:, 1], 1])
+        ).max(axis=1)
+        keep = longest >= 8.0 * radius  # below this the code is dominated by centroid noise
+        quads, pts = quads[keep], pts[keep]
+        if len(quads) == 0:
+            return None
+        codes, orders = quad_codes(pts)
+        observed = np.take_along_axis(quads, orders, axis=1)
+
+        # Every hash hit becomes a row (plane, 4 catalog members, 4 detections).
+        rows = {
+            self.index.members[entry] + tuple(obs)
+            for code, key, obs in zip(codes, self.index.keys(codes), observed.tolist())
+            for entry in self.index.query(code, key)
+        }
+        if not rows:
+            return None
+        hyp = np.array(sorted(rows), dtype=np.intp)
+        plane_ids, members, obs = hyp[:, 0], hyp[:, 1:5], hyp[:, 5:9]
+        planes = self._planes_c
+
+        # Vectorized scoring: 4-point fits of all hypotheses, then one KD-tree query for the
+        # whole catalog projected through each surviving fit.
+        a, t, rms = fit_similarities(np.take_along_axis(planes[plane_ids], members, axis=1), xy[obs, 0] + 1j * xy[obs, 1])
+        keep = rms <= radius
+        if focal_px is not None:
+            keep &= np.abs(np.abs(a) / focal_px - 1.0) <= focal_tolerance
+        plane_ids, members, obs, a, t, rms = (v[keep] for v in (plane_ids, members, obs, a, t, rms))
+        if len(a) == 0:
+            return None
+        proj = a[:, None] * planes[plane_ids] + t[:, None]
+        finite = np.isfinite(proj)
+        tree = cKDTree(xy)
+        d = np.full(proj.shape, np.inf)
+        # Loose radius: far from the quad its tangent plane is not the camera's.
+        d[finite] = tree.query(np.column_stack([proj[finite].real, proj[finite].imag]), distance_upper_bound=2.0 * radius)[0]
+        loose_counts = np.isfinite(d).sum(axis=1)
+
+        best: Optional[CatalogMatch] = None
+        refined = set()
+        for h in np.lexsort((rms, -loose_counts)):
+            if loose_counts[h] < min_inliers:
+                break  # sorted: no later hypothesis has enough loose support either
+            plane_id = int(plane_ids[h])
+            loose = self._inliers(self._planes[plane_id], a[h], t[h], tree, 2.0 * radius)
+            if len(loose) < min_inliers or tuple(loose) in refined:
+                continue
+            refined.add(tuple(loose))
+            pairs = list(zip(members[h].tolist(), obs[h].tolist()))
+            match = self._refine(xy, tree, plane_id, pairs, image_w, image_h, radius)
+            # Chance alignments fit the hashed quad but fall apart once refit on all their stars.
+            if len(match.pairs) < min_inliers or match.residual_px > 0.5 * radius:
+                continue
+            # Refits can drift away from the hashed quad's scale; the prior applies to the result too.
+            if focal_px is not None and abs(abs(match.scale_rotation) / focal_px - 1.0) > focal_tolerance:
+                continue
+            if best is None or (len(match.pairs), -match.residual_px) > (len(best.pairs), -best.residual_px):
+                best = match
+                if len(best.pairs) >= best.visible:
+                    return best  # every catalog star in the frame is accounted for
+        return best
+
+    def _refine(
+        self,
+        xy: np.ndarray,
+        tree: cKDTree,
+        plane_id: int,
+        pairs: List[tuple[int, int]],
+        image_w: int,
+        image_h: int,
+        radius: float,
+    ) -> CatalogMatch:
+        """
+        Moves the tangent point to the optical axis (the image center), where a rectilinear
+        camera is exactly gnomonic, and refits on the stars verified at each step.
+        """
+        center = self._centers[plane_id]
+        plane = self._planes[plane_id]
+        for _ in range(4):
+            a, t, _ = fit_similarity(plane[[c for c, _ in pairs]], xy[[p for _, p in pairs]])
+            tan = (complex(image_w / 2.0, image_h / 2.0) - t) / a
+            center = inverse_gnomonic(tan.real, tan.imag, center)
+            plane = gnomonic(self.vectors, center)
+            a, t, _ = fit_similarity(plane[[c for c, _ in pairs]], xy[[p for _, p in pairs]])
+            refined = self._inliers(plane, a, t, tree, radius)
+            if len(refined) < len(pairs):
+                break
+            pairs = refined
+        a, t, rms = fit_similarity(plane[[c for c, _ in pairs]], xy[[p for _, p in pairs]])
+
+        proj = a * (plane[:, 0] + 1j * plane[:, 1]) + t
+        visible = int(np.sum((proj.real >= 0) & (proj.real < image_w) & (proj.imag >= 0) & (proj.imag < image_h)))
+        return CatalogMatch(
+            center=center,
+            scale_rotation=a,
+            offset=t,
+            pairs=pairs,
+            residual_px=rms,
+            visible=max(visible, len(pairs)),
+        )
+
+    @staticmethod
+    def _inliers(plane: np.ndarray, a: complex, t: complex, tree: cKDTree, radius: float) -> List[tuple[int, int]]:
+        """(catalog, pixel) pairs within `radius`, each detection used once (closest wins)."""
+        valid = np.flatnonzero(np.isfinite(plane[:, 0]))
+        proj = a * (plane[valid, 0] + 1j * plane[valid, 1]) + t
+        d, idx = tree.query(np.column_stack([proj.real, proj.imag]), distance_upper_bound=radius)
+        pairs: Dict[int, tuple[float, int]] = {}
+        for cat, dd, pix in zip(valid, d, idx):
+            if np.isfinite(dd) and (pix not in pairs or dd < pairs[pix][0]):
+                pairs[int(pix)] = (float(dd), int(cat))
+        return sorted((cat, pix) for pix, (_, cat) in pairs.items())
+
+
+@lru_cache(maxsize=8)
+def hemisphere_matcher(hemisphere: str, catalog_path: str | None = None, tolerance: float = 0.02) -> AsterismMatcher:
+    """Matcher over one hemisphere of the catalog, built once per (hemisphere, path, tolerance)."""
+    return AsterismMatcher(load_catalog(catalog_path, hemisphere=hemisphere), tolerance=tolerance)
+
+
+def _code_variants(points: np.ndarray, tolerance: float) -> List[tuple[np.ndarray, np.ndarray]]:
+    """
+    Codes a noisy observation of this quad could produce: the canonical one plus orderings
+    that sit within 2 * tolerance of a canonicalization boundary (near-equal longest pairs,
+    xc + xd ~ 1, xc ~ xd).
+    """
+    z = (points[:, 0] + 1j * points[:, 1])[None]
+    lengths = np.abs(z[0, _PAIRS[:, 0]] - z[0, _PAIRS[:, 1]])
+    slack = 2.0 * tolerance
+    variants: List[tuple[np.ndarray, np.ndarray]] = []
+    for p in np.flatnonzero(lengths >= lengths.max() * (1.0 - slack)):
+        for ab, cd in product((0, 1), (0, 1)):
+            order = np.array([_PAIRS[p][ab], _PAIRS[p][1 - ab], _REST[p][cd], _REST[p][1 - cd]])
+            zz = z[0, order]
+            w = (zz - zz[0]) / (zz[1] - zz[0]) * (1 + 1j)
+            code = np.array([w[2].real, w[2].imag, w[3].real, w[3].imag])
+            if code[0] + code[2] <= 1.0 + slack and code[0] <= code[2] + slack:
+                if not any(np.array_equal(order, o) for _, o in variants):
+                    variants.append((code, order))
+    return variants
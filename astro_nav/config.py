@@ -5,16 +5,51 @@ from dataclasses import dataclass, field
 
 @dataclass(frozen=True)
 class DetectionConfig:
+    # Registered detector (astro_nav.backends): "auto", "clahe", "pyramid" or "contour".
+    backend: str = "auto"
     min_blob_area_px: int = 3
     max_blob_area_px: int = 180
     min_threshold: int = 145
     top_star_limit: int = 80
+    # Tiled execution: 0 disables tiling. Overlap defaults to max_blob_area_px, which keeps
+    # the tiled output identical to the single-pass result.
+    tile_size_px: int = 0
+    tile_overlap_px: int | None = None
+    tile_workers: int = 0
+    # Sub-pixel refinement of blob centers: "none", "moments" or "gaussian".
+    centroid_method: str = "moments"
+    centroid_radius_px: int = 3
+    # Coarse-to-fine mode: candidates on a 1/N max-pooled frame, refined in full-res ROIs.
+    # LatitudeEstimator switches to it above the pixel budget (0 disables the switch).
+    pyramid_downscale: int = 4
+    pyramid_pixel_budget: int = 24_000_000
+    # Directory written by DarkCalibration.save (hot-pixel map + optional master dark).
+    calibration_path: str | None = None
+    # Opt-in JPEG fast path: decode at 1/2, 1/4 or 1/8 scale (DCT scaling) as long as a star of
+    # `expected_star_size_arcmin` still spans `min_star_diameter_px` at the configured FOV. The
+    # star size is assumed, not measured: 1-3 px stars lose peak brightness and can drop out.
+    reduced_decode: bool = False
+    expected_star_size_arcmin: float = 6.0
+    min_star_diameter_px: float = 4.0
 
 
 @dataclass(frozen=True)
 class NorthConfig:
     min_candidates: int = 5
     min_confidence: float = 0.34
+    # Brightest detections scored as Polaris candidates.
+    candidate_limit: int = 25
+    # Catalog identification (astro_nav.catalog) before the heuristic: quads of the brightest
+    # `catalog_candidates` detections are looked up in a quad-hash index of the north polar
+    # catalog stars. `catalog_path` defaults to src/main/assets/polar_star_catalog.json.
+    catalog_match: bool = True
+    catalog_path: str | None = None
+    catalog_candidates: int = 16
+    catalog_tolerance: float = 0.02
+    catalog_min_inliers: int = 5
+    # Anytime search: with a deadline, candidates are ordered by prior likelihood and searched
+    # in growing pools; the best solution when time runs out is returned with truncated=True.
+    deadline_ms: float | None = None
 
 
 @dataclass(frozen=True)
@@ -26,6 +61,12 @@ class SouthConfig:
     axis_extension_factor: float = 4.5
     pointer_extension_factor: float = 2.8
     min_confidence: float = 0.42
+    # Brightest detections searched for Crux and the pointers.
+    bright_pool: int = 40
+    # Best Crux quads whose pointer pairs are evaluated jointly; the best combination wins.
+    crux_hypotheses: int = 5
+    # Anytime search deadline (see NorthConfig.deadline_ms).
+    deadline_ms: float | None = None
 
 
 @dataclass(frozen=True)
@@ -36,6 +77,28 @@ class SolverConfig:
     camera_roll_deg: float = 0.0
     expected_latitude_deg: float | None = None
     debug: bool = False
+    # Auto mode: heuristic-only north and south solutions closer than this in confidence are
+    # reported as ambiguous.
+    auto_margin: float = 0.1
+
+
+@dataclass(frozen=True)
+class StackingConfig:
+    alignment_stars: int = 40
+    match_radius_px: float = 6.0
+    ransac_threshold_px: float = 1.5
+    min_matches: int = 6
+
+
+@dataclass(frozen=True)
+class PatternConfig:
+    # Seasonal sky-pattern prior (astro_nav.sky_patterns) run before the pole searches.
+    # `path` defaults to src/main/assets/sky_patterns.json.
+    enabled: bool = False
+    path: str | None = None
+    tolerance: float = 0.03
+    # Frames whose best in-season template scores below this skip the pole search (0 never skips).
+    min_prior: float = 0.0
 
 
 @dataclass(frozen=True)
@@ -44,3 +107,5 @@ class ProcessingConfig:
     north: NorthConfig = field(default_factory=NorthConfig)
     south: SouthConfig = field(default_factory=SouthConfig)
     solver: SolverConfig = field(default_factory=SolverConfig)
+    stacking: StackingConfig = field(default_factory=StackingConfig)
+    patterns: PatternConfig = field(default_factory=PatternConfig)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+from .centroid import refine_centroids
+
+
+def adaptive_threshold(img_blur: np.ndarray, base_threshold: int = 180) -> int:
+    """Binary threshold scaled to the frame's median brightness (dark skies lower it, city glow raises it)."""
+    median_brightness = np.median(img_blur)
+    if median_brightness < 30:
+        threshold = max(base_threshold * 0.6, median_brightness * 5)
+    elif median_brightness > 80:
+        threshold = min(base_threshold * 1.3, 240)
+    else:
+        threshold = base_threshold
+    return int(threshold)
+
+
+def label_contours(shape: Tuple[int, ...], contours) -> np.ndarray:
+    """
+    Filled contours drawn into one label image: contours[k] -> label k + 1 (0 = background).
+    Each fill only touches the contour's bounding box.
+    """
+    labels = np.zeros(shape[:2], dtype=np.int32)
+    for k in range(len(contours)):
+        cv2.drawContours(labels, contours, k, k + 1, -1)
+    return labels
+
+
+def blob_brightness(img: np.ndarray, labels: np.ndarray, count: int) -> np.ndarray:
+    """
+    Brightness (0.6 * max + 0.4 * mean) of every labelled blob in one pass over the
+    foreground pixels. Index 0 (background) is unused.
+    """
+    brightness = np.zeros(count + 1, dtype=np.float64)
+    fg = np.flatnonzero(labels)
+    if fg.size == 0:
+        return brightness
+    lab = labels.ravel()[fg]
+    values = img.ravel()[fg]
+
+    sizes = np.bincount(lab, minlength=count + 1)
+    sums = np.bincount(lab, weights=values, minlength=count + 1)
+    peaks = np.zeros(count + 1, dtype=np.float64)
+    np.maximum.at(peaks, lab, values)
+
+    present = sizes > 0
+    brightness[present] = 0.6 * peaks[present] + 0.4 * sums[present] / sizes[present]
+    return brightness
+
+
+def calculate_area_limits(img_shape: Tuple[int, ...]) -> Tuple[float, float]:
+    """Blob area limits proportional to the frame diagonal (0.05% .. 1% of it, squared)."""
+    height, width = img_shape[:2]
+    diagonal = np.hypot(height, width)
+    min_area = max(3, (diagonal * 0.0005) ** 2)
+    max_area = min(500, (diagonal * 0.01) ** 2)
+    return min_area, max_area
+
+
+def find_star_blobs(
+    img: np.ndarray, centroid_method: str = "moments", centroid_radius: int = 3
+) -> List[Tuple[float, float, float, float]]:
+    """
+    Contour + adaptive-threshold star detection on a single-channel 8-bit frame.
+    Returns [(x, y, brightness, area), ...] in image pixels.
+    """
+    img_blur = cv2.GaussianBlur(img, (5, 5), 0)
+    threshold_val = adaptive_threshold(img_blur)
+    _, thresh = cv2.threshold(img_blur, threshold_val, 255, cv2.THRESH_BINARY)
+    thresh = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, np.ones((3, 3), np.uint8), iterations=1)
+    contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    min_area, max_area = calculate_area_limits(img.shape)
+    candidates = [cnt for cnt in contours if min_area < cv2.contourArea(cnt) < max_area]
+    labels = label_contours(img.shape, candidates)
+    brightness_by_label = blob_brightness(img, labels, len(candidates))
+
+    # Bounding-box centers seed the batched sub-pixel refinement.
+    boxes = np.array([cv2.boundingRect(cnt) for cnt in candidates], dtype=np.float64).reshape(-1, 4)
+    centers_x, centers_y = refine_centroids(
+        img,
+        boxes[:, 0] + boxes[:, 2] / 2.0,
+        boxes[:, 1] + boxes[:, 3] / 2.0,
+        radius=centroid_radius,
+        method=centroid_method,
+    )
+
+    stars = []
+    for label, (cx, cy) in enumerate(zip(centers_x, centers_y), start=1):
+        brightness = float(brightness_by_label[label])
+        # Blobs below 70% of the threshold are too faint to trust.
+        if brightness > threshold_val * 0.7:
+            stars.append((float(cx), float(cy), brightness, float(cv2.contourArea(candidates[label - 1]))))
+    return stars
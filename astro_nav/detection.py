@@ -1,56 +1,293 @@
 from __future__ import annotations
 
-from typing import List
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
 
 import cv2
 import numpy as np
 
+from .calibration import DarkCalibration
+from .centroid import refine_centroids
 from .config import DetectionConfig
+from .image_source import to_display_8bit
+from .pyramid import ClaheModel, block_max, pooled_mask
 from .types import DetectedStar
 
+# Extra pixels read around each tile so the 2x2 morphological opening sees the same
+# neighbourhood as in the single-pass run.
+_MORPH_HALO_PX = 3
+_OPEN_KERNEL = np.ones((2, 2), np.uint8)
+
+
+class DetectorWorkspace:
+    """
+    Frame-sized scratch buffers and the CLAHE object for one thread. Buffers are allocated
+    on the first frame and handed to OpenCV as `dst=` outputs afterwards; a frame of a new
+    size or type simply replaces the affected buffer.
+    """
+
+    def __init__(self) -> None:
+        self.clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+        self._buffers: Dict[str, np.ndarray] = {}
+
+    def buffer(self, name: str, shape: Tuple[int, ...], dtype: type = np.uint8) -> np.ndarray:
+        buf = self._buffers.get(name)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = np.empty(shape, dtype=dtype)
+            self._buffers[name] = buf
+        return buf
+
 
 class StarDetector:
     def __init__(self, config: DetectionConfig) -> None:
         self.config = config
+        self.calibration = DarkCalibration.load(config.calibration_path) if config.calibration_path else None
+        # One workspace per calling thread, so a shared detector is safe in a thread pool.
+        self._local = threading.local()
+
+    @property
+    def workspace(self) -> DetectorWorkspace:
+        ws = getattr(self._local, "workspace", None)
+        if ws is None:
+            ws = DetectorWorkspace()
+            self._local.workspace = ws
+        return ws
 
     def detect(self, image_bgr: np.ndarray) -> List[DetectedStar]:
         if image_bgr is None or image_bgr.size == 0:
             raise ValueError("image_bgr is empty")
 
-        gray = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2GRAY)
-        denoised = cv2.GaussianBlur(gray, (3, 3), 0)
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        enhanced = clahe.apply(denoised)
+        ws = self.workspace
+        gray = self._prepare(image_bgr, ws)
+        enhanced = self._enhance(gray, ws)
+
+        tile = self.config.tile_size_px
+        if tile > 0 and max(gray.shape) > tile:
+            stats, centroids = self._segment_tiled(enhanced)
+        else:
+            stats, centroids = self._segment(enhanced, ws)
+        return self._build_stars(gray, stats, centroids)
+
+    def detect_coarse_to_fine(self, image_bgr: np.ndarray) -> List[DetectedStar]:
+        """
+        Pyramid mode: find candidate blobs on a max-pooled 1/N frame, then segment only small
+        full-resolution ROIs around them. CLAHE is reproduced from a subsampled histogram, so the
+        full-resolution blurred, enhanced, binary and label frames are never allocated. On large
+        frames the output approximates `detect` (see ClaheModel and pooled_mask): stars within
+        about one gray level of the threshold may differ.
+        """
+        if image_bgr is None or image_bgr.size == 0:
+            raise ValueError("image_bgr is empty")
+
+        gray = self._prepare(image_bgr, self.workspace)
+        factor = max(1, self.config.pyramid_downscale)
+        clahe = ClaheModel(gray)
+
+        coarse = block_max(gray, factor)
+        coarse_binary = pooled_mask(clahe, coarse, factor, self.config.min_threshold).view(np.uint8)
+        num_labels, _, coarse_stats, _ = cv2.connectedComponentsWithStats(coarse_binary, connectivity=8)
+
+        h, w = gray.shape[:2]
+        margin = factor + _MORPH_HALO_PX
+        seen: set[tuple[int, int]] = set()
+        stats_list: List[np.ndarray] = []
+        centroid_list: List[np.ndarray] = []
+        for stat in coarse_stats[1:num_labels]:
+            if int(stat[cv2.CC_STAT_AREA]) > self.config.max_blob_area_px:
+                continue
+            x0 = max(0, int(stat[cv2.CC_STAT_LEFT]) * factor - margin)
+            y0 = max(0, int(stat[cv2.CC_STAT_TOP]) * factor - margin)
+            x1 = min(w, (int(stat[cv2.CC_STAT_LEFT]) + int(stat[cv2.CC_STAT_WIDTH])) * factor + margin)
+            y1 = min(h, (int(stat[cv2.CC_STAT_TOP]) + int(stat[cv2.CC_STAT_HEIGHT])) * factor + margin)
+            roi_stats, roi_centroids = self._segment_roi(gray, clahe, (x0, y0, x1, y1))
+            for roi_stat, roi_centroid in zip(roi_stats, roi_centroids):
+                key = (int(roi_stat[cv2.CC_STAT_LEFT]), int(roi_stat[cv2.CC_STAT_TOP]))
+                if key in seen:
+                    continue
+                seen.add(key)
+                stats_list.append(roi_stat)
+                centroid_list.append(roi_centroid)
+
+        if not stats_list:
+            return []
+        stats, centroids = _raster_order(np.array(stats_list), np.array(centroid_list))
+        return self._build_stars(gray, stats, centroids)
+
+    def _segment_roi(
+        self,
+        gray: np.ndarray,
+        clahe: ClaheModel,
+        box: tuple[int, int, int, int],
+    ) -> tuple[np.ndarray, np.ndarray]:
+        h, w = gray.shape[:2]
+        x0, y0, x1, y1 = box
+        hx0, hy0 = max(0, x0 - _MORPH_HALO_PX), max(0, y0 - _MORPH_HALO_PX)
+        hx1, hy1 = min(w, x1 + _MORPH_HALO_PX), min(h, y1 + _MORPH_HALO_PX)
+        denoised = cv2.GaussianBlur(gray[hy0:hy1, hx0:hx1], (3, 3), 0)
+        enhanced = clahe.enhance(denoised, hx0, hy0)
+        binary = self._binarize(enhanced)[y0 - hy0 : y1 - hy0, x0 - hx0 : x1 - hx0]
+        num_labels, _, stats, centroids = cv2.connectedComponentsWithStats(
+            np.ascontiguousarray(binary), connectivity=8
+        )
+        stats = stats[1:num_labels].copy()
+        centroids = centroids[1:num_labels]
+        left = stats[:, cv2.CC_STAT_LEFT]
+        top = stats[:, cv2.CC_STAT_TOP]
+        area = stats[:, cv2.CC_STAT_AREA]
+        clipped = (
+            ((left == 0) & (x0 > 0))
+            | ((top == 0) & (y0 > 0))
+            | ((left + stats[:, cv2.CC_STAT_WIDTH] == x1 - x0) & (x1 < w))
+            | ((top + stats[:, cv2.CC_STAT_HEIGHT] == y1 - y0) & (y1 < h))
+        )
+        keep = ~clipped & (area >= self.config.min_blob_area_px) & (area <= self.config.max_blob_area_px)
+        stats, centroids = stats[keep], centroids[keep]
+        stats[:, cv2.CC_STAT_LEFT] += x0
+        stats[:, cv2.CC_STAT_TOP] += y0
+        return stats, centroids + np.array([x0, y0], dtype=np.float64)
 
-        _, binary = cv2.threshold(
+    def _prepare(self, image: np.ndarray, ws: DetectorWorkspace) -> np.ndarray:
+        # Hot pixels are patched before anything else so they never reach the area filters.
+        gray = _to_gray(image, ws)
+        if self.calibration is not None:
+            gray = self.calibration.apply(gray, out=ws.buffer("calibrated", gray.shape))
+        return gray
+
+    def _enhance(self, gray: np.ndarray, ws: DetectorWorkspace) -> np.ndarray:
+        # CLAHE equalises over a frame-global tile grid, so it always runs on the full frame.
+        denoised = cv2.GaussianBlur(gray, (3, 3), 0, dst=ws.buffer("blurred", gray.shape))
+        return ws.clahe.apply(denoised, dst=ws.buffer("enhanced", gray.shape))
+
+    def _binarize(self, enhanced: np.ndarray, ws: DetectorWorkspace | None = None) -> np.ndarray:
+        thresh = ws.buffer("thresh", enhanced.shape) if ws is not None else None
+        binary = ws.buffer("binary", enhanced.shape) if ws is not None else None
+        _, thresh = cv2.threshold(
             enhanced,
             self.config.min_threshold,
             255,
             cv2.THRESH_BINARY,
+            dst=thresh,
         )
-        kernel = np.ones((2, 2), np.uint8)
-        binary = cv2.morphologyEx(binary, cv2.MORPH_OPEN, kernel, iterations=1)
+        return cv2.morphologyEx(thresh, cv2.MORPH_OPEN, _OPEN_KERNEL, dst=binary, iterations=1)
+
+    def _segment(self, enhanced: np.ndarray, ws: DetectorWorkspace) -> tuple[np.ndarray, np.ndarray]:
+        binary = self._binarize(enhanced, ws)
+        num_labels, _, stats, centroids = cv2.connectedComponentsWithStats(
+            binary, labels=ws.buffer("labels", binary.shape, np.int32), connectivity=8
+        )
+        area = stats[1:num_labels, cv2.CC_STAT_AREA]
+        keep = (area >= self.config.min_blob_area_px) & (area <= self.config.max_blob_area_px)
+        return _raster_order(stats[1:num_labels][keep], centroids[1:num_labels][keep])
+
+    def _segment_tiled(self, enhanced: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Tile-parallel equivalent of `_segment`.
+        Every blob is owned by the tile whose core contains its bounding-box corner. With an
+        overlap of at least `max_blob_area_px` any blob that passes the area filter lies fully
+        inside its owner's extended tile, and anything touching an inner tile edge is too large
+        to pass the filter, so the merged output equals the single-pass result.
+        """
+        h, w = enhanced.shape[:2]
+        tile = self.config.tile_size_px
+        overlap = self.config.tile_overlap_px
+        if overlap is None:
+            overlap = self.config.max_blob_area_px
+        cores = [
+            (x0, y0, min(w, x0 + tile), min(h, y0 + tile))
+            for y0 in range(0, h, tile)
+            for x0 in range(0, w, tile)
+        ]
+        workers = self.config.tile_workers or os.cpu_count() or 1
+        with ThreadPoolExecutor(max_workers=min(workers, len(cores))) as pool:
+            parts = list(pool.map(lambda core: self._segment_tile(enhanced, core, overlap), cores))
 
-        num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(binary, connectivity=8)
+        stats = np.concatenate([p[0] for p in parts])
+        centroids = np.concatenate([p[1] for p in parts])
+        return _raster_order(stats, centroids)
+
+    def _segment_tile(
+        self,
+        enhanced: np.ndarray,
+        core: tuple[int, int, int, int],
+        overlap: int,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        h, w = enhanced.shape[:2]
+        x0, y0, x1, y1 = core
+        ex0, ey0 = max(0, x0 - overlap), max(0, y0 - overlap)
+        ex1, ey1 = min(w, x1 + overlap), min(h, y1 + overlap)
+        hx0, hy0 = max(0, ex0 - _MORPH_HALO_PX), max(0, ey0 - _MORPH_HALO_PX)
+        hx1, hy1 = min(w, ex1 + _MORPH_HALO_PX), min(h, ey1 + _MORPH_HALO_PX)
+
+        binary = self._binarize(enhanced[hy0:hy1, hx0:hx1])
+        binary = np.ascontiguousarray(binary[ey0 - hy0 : ey1 - hy0, ex0 - hx0 : ex1 - hx0])
+        num_labels, _, stats, centroids = cv2.connectedComponentsWithStats(binary, connectivity=8)
+        stats = stats[1:num_labels].copy()
+        centroids = centroids[1:num_labels]
+
+        left = stats[:, cv2.CC_STAT_LEFT]
+        top = stats[:, cv2.CC_STAT_TOP]
+        right = left + stats[:, cv2.CC_STAT_WIDTH]
+        bottom = top + stats[:, cv2.CC_STAT_HEIGHT]
+        area = stats[:, cv2.CC_STAT_AREA]
+        owned = (left + ex0 >= x0) & (left + ex0 < x1) & (top + ey0 >= y0) & (top + ey0 < y1)
+        clipped = (
+            ((left == 0) & (ex0 > 0))
+            | ((top == 0) & (ey0 > 0))
+            | ((right == ex1 - ex0) & (ex1 < w))
+            | ((bottom == ey1 - ey0) & (ey1 < h))
+        )
+        keep = owned & ~clipped & (area >= self.config.min_blob_area_px) & (area <= self.config.max_blob_area_px)
+        stats, centroids = stats[keep], centroids[keep]
+
+        stats[:, cv2.CC_STAT_LEFT] += ex0
+        stats[:, cv2.CC_STAT_TOP] += ey0
+        centroids = centroids + np.array([ex0, ey0], dtype=np.float64)
+        return stats, centroids
+
+    def _build_stars(self, gray: np.ndarray, stats: np.ndarray, centroids: np.ndarray) -> List[DetectedStar]:
+        xs, ys = refine_centroids(
+            gray,
+            centroids[:, 0],
+            centroids[:, 1],
+            radius=self.config.centroid_radius_px,
+            method=self.config.centroid_method,
+        )
         stars: List[DetectedStar] = []
-        for idx in range(1, num_labels):
-            area = int(stats[idx, cv2.CC_STAT_AREA])
-            if area < self.config.min_blob_area_px or area > self.config.max_blob_area_px:
-                continue
-            x = float(centroids[idx][0])
-            y = float(centroids[idx][1])
-            left = int(stats[idx, cv2.CC_STAT_LEFT])
-            top = int(stats[idx, cv2.CC_STAT_TOP])
-            w = int(stats[idx, cv2.CC_STAT_WIDTH])
-            h = int(stats[idx, cv2.CC_STAT_HEIGHT])
+        for stat, x, y in zip(stats, xs, ys):
+            area = int(stat[cv2.CC_STAT_AREA])
+            left = int(stat[cv2.CC_STAT_LEFT])
+            top = int(stat[cv2.CC_STAT_TOP])
+            w = int(stat[cv2.CC_STAT_WIDTH])
+            h = int(stat[cv2.CC_STAT_HEIGHT])
 
             roi = gray[top : top + h, left : left + w]
             if roi.size == 0:
                 continue
             brightness = float(np.max(roi))
             radius = float(np.sqrt(area / np.pi))
-            stars.append(DetectedStar(x=x, y=y, brightness=brightness, radius_px=radius))
+            stars.append(DetectedStar(x=float(x), y=float(y), brightness=brightness, radius_px=radius))
 
         stars.sort(key=lambda s: s.brightness, reverse=True)
         return stars[: self.config.top_star_limit]
 
+
+def _to_gray(image: np.ndarray, ws: DetectorWorkspace | None = None) -> np.ndarray:
+    # Single-channel frames (stacked, pre-converted or memory-mapped views) are used as-is;
+    # 16-bit and float data is stretched to 8 bit once, here.
+    if image.ndim == 3:
+        dst = ws.buffer("gray", image.shape[:2], image.dtype) if ws is not None else None
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=dst)
+    if image.dtype != np.uint8:
+        image = to_display_8bit(image, out=ws.buffer("gray8", image.shape[:2]) if ws is not None else None)
+    # Strided views (FITS bottom-up rows, one plane of an RGB TIFF) need a compact copy for OpenCV.
+    return image if image.flags.c_contiguous else np.ascontiguousarray(image)
+
+
+def _raster_order(stats: np.ndarray, centroids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # Label numbering depends on OpenCV's labelling algorithm; sort by bounding box so that
+    # brightness ties resolve identically in single-pass and tiled runs.
+    order = np.lexsort((centroids[:, 0], stats[:, cv2.CC_STAT_LEFT], stats[:, cv2.CC_STAT_TOP]))
+    return stats[order], centroids[order]
+
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from .backends import available_backends, create_detector
+from .config import DetectionConfig
+
+# (frame, ground-truth star centers as an (N, 2) array of x, y)
+HarnessCase = Tuple[np.ndarray, np.ndarray]
+
+
+@dataclass
+class BackendReport:
+    backend: str
+    latency_ms: float
+    peak_memory_mb: float
+    recall: float
+    precision: float
+    detected: int
+    truth: int
+
+
+def match_counts(detected: np.ndarray, truth: np.ndarray, radius_px: float) -> tuple[int, int]:
+    """(truth stars with a detection within radius, detections within radius of a truth star)."""
+    if len(detected) == 0 or len(truth) == 0:
+        return 0, 0
+    found = np.isfinite(cKDTree(detected).query(truth, distance_upper_bound=radius_px)[0])
+    real = np.isfinite(cKDTree(truth).query(detected, distance_upper_bound=radius_px)[0])
+    return int(found.sum()), int(real.sum())
+
+
+def run_harness(
+    cases: Sequence[HarnessCase],
+    backends: Sequence[str] | None = None,
+    config: DetectionConfig | None = None,
+    match_radius_px: float = 2.0,
+    repeats: int = 3,
+) -> List[BackendReport]:
+    """
+    Run every backend on the same frames. Latency is the best of `repeats` runs summed over
+    all frames; peak memory is the tracemalloc peak (NumPy and Python allocations) of one pass
+    after a warm-up, i.e. the steady state of a reused detector.
+    """
+    config = config or DetectionConfig()
+    reports: List[BackendReport] = []
+    for name in backends or available_backends():
+        detector = create_detector(name, config)
+        for image, _ in cases:
+            detector.detect(image)  # warm-up: lazy imports, workspaces
+
+        tracemalloc.start()
+        results = [detector.detect(image) for image, _ in cases]
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        best = float("inf")
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            for image, _ in cases:
+                detector.detect(image)
+            best = min(best, time.perf_counter() - t0)
+
+        found = real = detected = truth = 0
+        for stars, (_, expected) in zip(results, cases):
+            xy = np.array([(s.x, s.y) for s in stars], dtype=np.float64).reshape(-1, 2)
+            f, r = match_counts(xy, np.asarray(expected, dtype=np.float64).reshape(-1, 2), match_radius_px)
+            found += f
+            real += r
+            detected += len(xy)
+            truth += len(expected)
+        reports.append(
+            BackendReport(
+                backend=name,
+                latency_ms=best * 1000.0,
+                peak_memory_mb=peak / 2**20,
+                recall=found / truth if truth else 0.0,
+                precision=real / detected if detected else 0.0,
+                detected=detected,
+                truth=truth,
+            )
+        )
+    return reports
@@ -0,0 +1,351 @@
+from __future__ import annotations
+
+import os
+import struct
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+MAPPED_EXTENSIONS = (".fits", ".fit", ".fts", ".tif", ".tiff", ".dng")
+JPEG_EXTENSIONS = (".jpg", ".jpeg")
+REDUCED_SCALES = (8, 4, 2)
+_REDUCED_FLAGS = {
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+_EXIF_ORIENTATION = 0x0112
+
+_FITS_BLOCK = 2880
+_FITS_DTYPES = {8: "u1", 16: ">i2", 32: ">i4", -32: ">f4", -64: ">f8"}
+
+_TIFF_TYPES = {1: "B", 3: "H", 4: "I", 16: "Q"}
+_TIFF_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 6: 1, 7: 1, 8: 2, 9: 4, 10: 8, 11: 4, 12: 8, 16: 8}
+_TAG_SUBFILE_TYPE = 254
+_TAG_WIDTH = 256
+_TAG_HEIGHT = 257
+_TAG_BITS = 258
+_TAG_COMPRESSION = 259
+_TAG_STRIP_OFFSETS = 273
+_TAG_SAMPLES = 277
+_TAG_ROWS_PER_STRIP = 278
+_TAG_STRIP_COUNTS = 279
+_TAG_PLANAR = 284
+_TAG_TILE_WIDTH = 322
+_TAG_SAMPLE_FORMAT = 339
+_TAG_SUB_IFDS = 330
+
+# Rows converted per step when stretching high bit-depth frames to 8 bit.
+_STRETCH_ROWS = 256
+_STRETCH_SAMPLES = 1_000_000
+
+
+class ImageSource(ABC):
+    """
+    A frame on disk that can hand out a single-channel view without a full BGR decode.
+    `gray()` returns a memory-mapped view where the file layout allows it.
+    """
+
+    path: str = ""
+    shape: Tuple[int, int] = (0, 0)
+
+    @abstractmethod
+    def gray(self) -> np.ndarray:
+        ...
+
+
+class ArraySource(ImageSource):
+    """Wraps an in-memory frame (BGR or single channel)."""
+
+    def __init__(self, image: np.ndarray, path: str = "<array>") -> None:
+        self.path = path
+        self._image = image
+        self.shape = image.shape[:2]
+
+    def gray(self) -> np.ndarray:
+        if self._image.ndim == 2:
+            return self._image
+        return cv2.cvtColor(self._image, cv2.COLOR_BGR2GRAY)
+
+
+class DecodedSource(ImageSource):
+    """Compressed formats (JPEG, PNG, compressed TIFF) decoded by OpenCV, keeping 16-bit depth."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._gray: Optional[np.ndarray] = None
+        self.shape = self.gray().shape[:2]
+
+    def gray(self) -> np.ndarray:
+        if self._gray is None:
+            # Same decode + conversion as cv2.imread(IMREAD_COLOR) and StarDetector for 8-bit files.
+            image = cv2.imread(self.path, cv2.IMREAD_COLOR | cv2.IMREAD_ANYDEPTH)
+            if image is None:
+                raise ValueError(f"Fotograf okunamadi: {self.path}")
+            self._gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+
+class RawSource(ImageSource):
+    """Headerless sensor dump with a known geometry, mapped as-is."""
+
+    def __init__(self, path: str, width: int, height: int, dtype: str = "<u2", offset: int = 0) -> None:
+        self.path = path
+        self.shape = (height, width)
+        self._data = np.memmap(path, dtype=np.dtype(dtype), mode="r", offset=offset, shape=(height, width))
+
+    def gray(self) -> np.ndarray:
+        return self._data
+
+
+class FitsSource(ImageSource):
+    """
+    Primary HDU of a FITS file, mapped without decoding. BZERO/BSCALE are not applied: the
+    detector's stretch is invariant to them. For cubes the middle plane (G of RGB) is used.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        header, data_offset = _read_fits_header(path)
+        bitpix = header.get("BITPIX")
+        if bitpix not in _FITS_DTYPES:
+            raise ValueError(f"Desteklenmeyen FITS BITPIX: {bitpix}")
+        naxis = header.get("NAXIS", 0)
+        if naxis not in (2, 3):
+            raise ValueError("FITS dosyasi 2 veya 3 boyutlu bir goruntu icermeli")
+        axes = [header.get(f"NAXIS{i}") for i in range(1, naxis + 1)]
+        if not all(isinstance(n, int) and n > 0 for n in axes):
+            raise ValueError(f"FITS basliginda eksen boyutlari eksik: {path}")
+        width, height = axes[0], axes[1]
+        planes = axes[2] if naxis == 3 else 1
+        data = np.memmap(path, dtype=np.dtype(_FITS_DTYPES[bitpix]), mode="r", offset=data_offset,
+                         shape=(planes, height, width))
+        plane = data[planes // 2]
+        # FITS rows run bottom-up unless the writer says otherwise.
+        if str(header.get("ROWORDER", "BOTTOM-UP")).upper() != "TOP-DOWN":
+            plane = plane[::-1]
+        self._data = plane
+        self.header = header
+        self.shape = (height, width)
+
+    def gray(self) -> np.ndarray:
+        return self._data
+
+
+class TiffSource(ImageSource):
+    """
+    Uncompressed, strip-organised TIFF / DNG. Each strip is mapped separately; contiguous
+    strips collapse into a single view. For DNG the full-resolution raw sub-image (CFA mosaic)
+    is used. RGB files expose the green plane as a strided view.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        ifd = _pick_tiff_image(path)
+        if ifd is None:
+            raise ValueError(f"TIFF dosyasi dogrudan okunamiyor (sikistirilmis veya karo duzeninde): {path}")
+        self._endian, tags = ifd
+        self.shape = (int(tags[_TAG_HEIGHT][0]), int(tags[_TAG_WIDTH][0]))
+        bits = int(tags[_TAG_BITS][0])
+        fmt = int(tags.get(_TAG_SAMPLE_FORMAT, [1])[0])
+        kind = {1: "u", 2: "i", 3: "f"}[fmt]
+        self._dtype = np.dtype(f"{self._endian}{kind}{bits // 8}")
+        self._samples = int(tags.get(_TAG_SAMPLES, [1])[0])
+        self._channel = 1 if self._samples >= 3 else 0
+        self._rows_per_strip = min(int(tags.get(_TAG_ROWS_PER_STRIP, [self.shape[0]])[0]), self.shape[0])
+        self._offsets = [int(v) for v in tags[_TAG_STRIP_OFFSETS]]
+        counts = [int(v) for v in tags[_TAG_STRIP_COUNTS]]
+        contiguous = all(a + n == b for a, n, b in zip(self._offsets, counts, self._offsets[1:]))
+        self._full = self._map_rows(self._offsets[0], self.shape[0]) if contiguous else None
+
+    def gray(self) -> np.ndarray:
+        if self._full is not None:
+            return self._full
+        # Scattered strips: one mapped view per strip, copied into a single frame.
+        rps = self._rows_per_strip
+        parts = [
+            self._map_rows(offset, min(rps, self.shape[0] - strip * rps))
+            for strip, offset in enumerate(self._offsets)
+        ]
+        return np.concatenate(parts, axis=0)
+
+    def _map_rows(self, offset: int, rows: int) -> np.ndarray:
+        data = np.memmap(self.path, dtype=self._dtype, mode="r", offset=offset,
+                         shape=(rows, self.shape[1], self._samples))
+        return data[:, :, self._channel]
+
+
+def open_image_source(source: "str | ImageSource | np.ndarray") -> ImageSource:
+    """Picks the cheapest reader for a path; sources and arrays pass through."""
+    if isinstance(source, ImageSource):
+        return source
+    if isinstance(source, np.ndarray):
+        return ArraySource(source)
+    if not os.path.exists(source):
+        raise ValueError(f"Fotograf okunamadi: {source}")
+    ext = os.path.splitext(source)[1].lower()
+    if ext in (".fits", ".fit", ".fts"):
+        return FitsSource(source)
+    if ext in (".tif", ".tiff", ".dng"):
+        try:
+            return TiffSource(source)
+        except (ValueError, KeyError, struct.error):
+            pass
+    return DecodedSource(source)
+
+
+def jpeg_size(path: str) -> Tuple[int, int]:
+    """(height, width) after EXIF orientation, read from the header only."""
+    from PIL import Image
+
+    with Image.open(path) as img:
+        w, h = img.size
+        orientation = img.getexif().get(_EXIF_ORIENTATION, 1)
+    return (w, h) if orientation in (5, 6, 7, 8) else (h, w)
+
+
+def reduced_decode_scale(
+    image_h: int,
+    vertical_fov_deg: float,
+    star_size_arcmin: float,
+    min_star_diameter_px: float,
+) -> int:
+    """Largest JPEG DCT scale (8, 4, 2) that still leaves stars `min_star_diameter_px` wide."""
+    if image_h <= 0 or vertical_fov_deg <= 0:
+        return 1
+    star_px = star_size_arcmin / (vertical_fov_deg * 60.0 / image_h)
+    for scale in REDUCED_SCALES:
+        if star_px / scale >= min_star_diameter_px:
+            return scale
+    return 1
+
+
+def read_reduced_gray(path: str, scale: int) -> np.ndarray:
+    """Grayscale decode at 1/scale using the JPEG decoder's DCT scaling."""
+    image = cv2.imread(path, _REDUCED_FLAGS[scale]) if scale > 1 else cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        raise ValueError(f"Fotograf okunamadi: {path}")
+    return image
+
+
+def to_full_resolution(coord: float, scale: int) -> float:
+    """Pixel-center mapping from a 1/scale decode back to full-resolution pixels."""
+    return (coord + 0.5) * scale - 0.5
+
+
+def to_display_8bit(gray: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Stretch a high bit-depth (or big-endian, memory-mapped) frame to 8 bit for detection:
+    sky median -> 0, frame maximum -> 255 with a square-root curve, which keeps faint stars
+    above the quantisation step like a gamma-encoded JPEG. 8-bit input is returned unchanged.
+    Works in row blocks, so a mapped frame is never fully copied at its native depth.
+    `out` is an optional preallocated uint8 destination.
+    """
+    if gray.dtype == np.uint8:
+        return gray
+    h, w = gray.shape[:2]
+    step = max(1, int(np.sqrt(h * w / _STRETCH_SAMPLES)))
+    black = float(np.median(gray[::step, ::step]))
+    white = max(float(gray[y : y + _STRETCH_ROWS].max()) for y in range(0, h, _STRETCH_ROWS))
+    span = max(white - black, 1e-6)
+
+    if out is None:
+        out = np.empty((h, w), dtype=np.uint8)
+    if gray.dtype.kind in "ui" and gray.dtype.itemsize <= 2:
+        info = np.iinfo(gray.dtype)
+        levels = np.arange(info.min, info.max + 1, dtype=np.float64)
+        lut = np.rint(255.0 * np.sqrt(np.clip((levels - black) / span, 0.0, 1.0))).astype(np.uint8)
+        for y in range(0, h, _STRETCH_ROWS):
+            out[y : y + _STRETCH_ROWS] = lut[gray[y : y + _STRETCH_ROWS].astype(np.int32) - info.min]
+        return out
+    for y in range(0, h, _STRETCH_ROWS):
+        block = (gray[y : y + _STRETCH_ROWS].astype(np.float64) - black) / span
+        out[y : y + _STRETCH_ROWS] = np.rint(255.0 * np.sqrt(np.clip(block, 0.0, 1.0)))
+    return out
+
+
+def _read_fits_header(path: str) -> Tuple[Dict[str, object], int]:
+    header: Dict[str, object] = {}
+    offset = 0
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(_FITS_BLOCK)
+            if len(block) < _FITS_BLOCK:
+                raise ValueError(f"FITS basligi eksik: {path}")
+            offset += _FITS_BLOCK
+            for i in range(0, _FITS_BLOCK, 80):
+                card = block[i : i + 80].decode("ascii", errors="replace")
+                key = card[:8].strip()
+                if key == "END":
+                    if header.get("SIMPLE") is not True:
+                        raise ValueError(f"Gecerli bir FITS dosyasi degil: {path}")
+                    return header, offset
+                if card[8:10] != "= ":
+                    continue
+                header[key] = _fits_value(card[10:])
+
+
+def _fits_value(text: str) -> object:
+    text = text.strip()
+    if text.startswith("'"):
+        return text[1:].split("'", 1)[0].strip()
+    text = text.split("/", 1)[0].strip()
+    if text in ("T", "F"):
+        return text == "T"
+    try:
+        return int(text)
+    except ValueError:
+        try:
+            return float(text)
+        except ValueError:
+            return text
+
+
+def _pick_tiff_image(path: str) -> Optional[Tuple[str, Dict[int, List[int]]]]:
+    """Largest uncompressed strip image among IFD0 and its SubIFDs (DNG raw data lives there)."""
+    with open(path, "rb") as f:
+        order = f.read(2)
+        if order not in (b"II", b"MM"):
+            return None
+        endian = "<" if order == b"II" else ">"
+        magic, first = struct.unpack(endian + "HI", f.read(6))
+        if magic != 42:
+            return None
+        ifd0 = _read_ifd(f, endian, first)
+        candidates = [ifd0] + [_read_ifd(f, endian, int(o)) for o in ifd0.get(_TAG_SUB_IFDS, [])]
+
+    usable = [
+        tags
+        for tags in candidates
+        if int(tags.get(_TAG_COMPRESSION, [1])[0]) == 1
+        and _TAG_TILE_WIDTH not in tags
+        and _TAG_STRIP_OFFSETS in tags
+        and int(tags.get(_TAG_PLANAR, [1])[0]) == 1
+        and int(tags.get(_TAG_SUBFILE_TYPE, [0])[0]) & 1 == 0
+        and int(tags[_TAG_BITS][0]) in (8, 16, 32)
+    ]
+    if not usable:
+        return None
+    return endian, max(usable, key=lambda t: int(t[_TAG_WIDTH][0]) * int(t[_TAG_HEIGHT][0]))
+
+
+def _read_ifd(f, endian: str, offset: int) -> Dict[int, List[int]]:
+    f.seek(offset)
+    (count,) = struct.unpack(endian + "H", f.read(2))
+    entries = [struct.unpack(endian + "HHI4s", f.read(12)) for _ in range(count)]
+    tags: Dict[int, List[int]] = {}
+    for tag, typ, n, raw in entries:
+        if typ == 13:
+            typ = 4  # IFD pointers are plain LONGs
+        if typ not in _TIFF_TYPES:
+            continue
+        size = _TIFF_TYPE_SIZES[typ] * n
+        if size <= 4:
+            data = raw[:size]
+        else:
+            f.seek(struct.unpack(endian + "I", raw)[0])
+            data = f.read(size)
+        tags[tag] = list(struct.unpack(f"{endian}{n}{_TIFF_TYPES[typ]}", data))
+    return tags
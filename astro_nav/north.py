@@ -1,25 +1,41 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from typing import List, Optional
 
+import numpy as np
+from scipy.spatial import cKDTree
+
+from .anytime import Deadline, anytime_search, pool_schedule, prior_order
+from .catalog import hemisphere_matcher
 from .config import NorthConfig
-from .geometry import dist, weighted_centroid
+from .geometry import weighted_centroid
 from .types import DetectedStar, PatternDetection
 
 
+# Above this many candidates isolation uses a KD-tree instead of the dense distance matrix.
+_PAIRWISE_LIMIT = 2048
+
+
 @dataclass(frozen=True)
 class NorthSolution:
     polaris_xy: tuple[float, float]
     confidence: float
     patterns: List[PatternDetection]
     warnings: List[str]
+    # RMS pixel residual of the catalog fit; None for the heuristic.
+    residual_px: Optional[float] = None
+    # Anytime mode: the deadline expired before the largest candidate pool was searched.
+    truncated: bool = False
 
 
 class NorthPoleFinder:
     """
     Polaris finder with conservative confidence.
-    Strategy:
+    Primary method: catalog identification. Quads of the brightest detections are looked up in
+    a quad-hash index of the north polar asterisms (Little Dipper and neighbours) and verified
+    against the rest of the catalog; Polaris is projected through the fitted similarity.
+    Fallback heuristic:
     - Select brightest stars.
     - Favor upper-half stars (common framing for north-sky shots).
     - Prefer stars with medium isolation (avoid clustered noise and hot pixels).
@@ -29,29 +45,119 @@ class NorthPoleFinder:
         self.config = config
 
     def solve(self, stars: List[DetectedStar], image_w: int, image_h: int) -> Optional[NorthSolution]:
-        warnings: List[str] = []
+        cfg = self.config
+        if cfg.deadline_ms is None:
+            return self._solve(stars, image_w, image_h)
+        # Anytime mode: likeliest candidates first (bright, high in the frame), growing pools.
+        ordered = prior_order(stars, image_w, image_h, vertical_weight=0.3)
+        cap = max(cfg.candidate_limit, 4 * cfg.catalog_candidates)
+        best, truncated = anytime_search(
+            lambda pool: self._solve(list(pool), image_w, image_h),
+            ordered,
+            pool_schedule(len(ordered), max(cfg.min_candidates, 8), cap),
+            Deadline(cfg.deadline_ms),
+            # a catalog identification beats any heuristic guess
+            rank=lambda s: (s.residual_px is not None, s.confidence),
+            cap=cap,
+        )
+        return replace(best, truncated=True) if best is not None and truncated else best
+
+    def _solve(self, stars: List[DetectedStar], image_w: int, image_h: int) -> Optional[NorthSolution]:
         if len(stars) < self.config.min_candidates:
+            return None
+        missing = False
+        if self.config.catalog_match:
+            try:
+                solution = self.solve_catalog(stars, image_w, image_h)
+            except FileNotFoundError:
+                # The default catalog ships with the app assets, not the package; an explicitly
+                # configured path must exist.
+                if self.config.catalog_path is not None:
+                    raise
+                missing = True
+                solution = None
+            if solution is not None:
+                return solution
+        top = stars[: self.config.candidate_limit]
+        xy = np.array([(s.x, s.y) for s in top], dtype=np.float64)
+        brightness = np.array([s.brightness for s in top], dtype=np.float64)
+        solution = self.solve_arrays(xy, brightness, image_w, image_h)
+        if solution is not None and missing:
+            solution.warnings.append("Polar yildiz katalogu bulunamadi; Polaris sezgisel olarak secildi.")
+        return solution
+
+    def solve_catalog(self, stars: List[DetectedStar], image_w: int, image_h: int) -> Optional[NorthSolution]:
+        """Catalog identification only; None when no hashed quad verifies."""
+        cfg = self.config
+        matcher = hemisphere_matcher("north", cfg.catalog_path, cfg.catalog_tolerance)
+        # Catalog stars are bright, so verification only looks at the brighter detections.
+        pool = stars[: 4 * cfg.catalog_candidates]
+        xy = np.array([(s.x, s.y) for s in pool], dtype=np.float64).reshape(-1, 2)
+        radius = max(3.0, 0.006 * max(image_w, image_h))
+        match = matcher.match(
+            xy,
+            image_w,
+            image_h,
+            candidates=cfg.catalog_candidates,
+            radius_px=radius,
+            min_inliers=cfg.catalog_min_inliers,
+        )
+        if match is None:
+            return None
+        polaris = next((s for s in matcher.stars if s.name == "Polaris"), None)
+        if polaris is None:
+            return None
+
+        conf = min(1.0, len(match.pairs) / match.visible) * max(0.0, 1.0 - match.residual_px / radius)
+        if conf < cfg.min_confidence:
+            return None
+        pattern = PatternDetection(
+            name="little_dipper",
+            confidence=float(conf),
+            points=[(pool[p].x, pool[p].y) for _, p in match.pairs],
+            metadata={
+                "residual_px": match.residual_px,
+                "inliers": float(len(match.pairs)),
+                "visible": float(match.visible),
+            },
+        )
+        return NorthSolution(
+            polaris_xy=match.project(polaris.ra_deg, polaris.dec_deg),
+            confidence=float(conf),
+            patterns=[pattern],
+            warnings=[],
+            residual_px=match.residual_px,
+        )
+
+    def solve_arrays(
+        self,
+        xy: np.ndarray,
+        brightness: np.ndarray,
+        image_w: int,
+        image_h: int,
+    ) -> Optional[NorthSolution]:
+        """
+        Heuristic scoring of `solve` on contiguous arrays (candidates in brightness order, already
+        limited). Vertical, brightness and isolation scores are computed in one vectorized pass
+        and the top 3 are picked with argpartition.
+        """
+        warnings: List[str] = []
+        if len(xy) < self.config.min_candidates:
             warnings.append("Kuzey cozumunde yetersiz yildiz adayi.")
             return None
 
-        top = stars[: min(25, len(stars))]
-        scored: List[tuple[DetectedStar, float]] = []
-        for s in top:
-            y_norm = s.y / max(1.0, float(image_h))
-            vertical = max(0.0, min(1.0, 1.0 - y_norm))
-            bright = max(0.0, min(1.0, s.brightness / 255.0))
-            dists = sorted(dist((s.x, s.y), (o.x, o.y)) for o in top if o is not s)
-            neigh = dists[:4] if len(dists) >= 4 else dists
-            isolation = 0.0
-            if neigh:
-                avg_d = sum(neigh) / len(neigh)
-                isolation = max(0.0, min(1.0, avg_d / max(25.0, 0.08 * image_h)))
-            score = 0.42 * vertical + 0.33 * bright + 0.25 * isolation
-            scored.append((s, score))
-
-        scored.sort(key=lambda x: x[1], reverse=True)
-        top_scored = scored[:3]
-        centroid = weighted_centroid([((s.x, s.y), sc) for s, sc in top_scored])
+        vertical = np.clip(1.0 - xy[:, 1] / max(1.0, float(image_h)), 0.0, 1.0)
+        bright = np.clip(brightness / 255.0, 0.0, 1.0)
+        avg_d = _mean_neighbour_distance(xy, 4)
+        isolation = np.clip(avg_d / max(25.0, 0.08 * image_h), 0.0, 1.0)
+        score = 0.42 * vertical + 0.33 * bright + 0.25 * isolation
+
+        k = min(3, len(score))
+        best = np.argpartition(-score, k - 1)[:k] if len(score) > k else np.arange(len(score))
+        # Highest score first; ties keep candidate order, as the stable sort did.
+        best = best[np.lexsort((best, -score[best]))]
+        top_scored = [((float(xy[i, 0]), float(xy[i, 1])), float(score[i])) for i in best]
+        centroid = weighted_centroid(top_scored)
         if centroid is None:
             return None
 
@@ -63,7 +169,7 @@ class NorthPoleFinder:
         pattern = PatternDetection(
             name="north_polar_region",
             confidence=float(conf),
-            points=[(s.x, s.y) for s, _ in top_scored],
+            points=[p for p, _ in top_scored],
             metadata={"candidate_count": float(len(top_scored))},
         )
         return NorthSolution(
@@ -73,3 +179,18 @@ class NorthPoleFinder:
             warnings=warnings,
         )
 
+
+def _mean_neighbour_distance(xy: np.ndarray, k: int) -> np.ndarray:
+    """Mean distance to the k nearest other candidates (fewer if there are fewer; 0 if alone)."""
+    n = len(xy)
+    if n < 2:
+        return np.zeros(n)
+    k = min(k, n - 1)
+    if n <= _PAIRWISE_LIMIT:
+        d = np.hypot(xy[:, None, 0] - xy[None, :, 0], xy[:, None, 1] - xy[None, :, 1])
+        np.fill_diagonal(d, np.inf)
+        nearest = np.sort(np.partition(d, k - 1, axis=1)[:, :k], axis=1)
+    else:
+        # k-NN keeps memory linear for very large candidate pools.
+        nearest = cKDTree(xy).query(xy, k=k + 1)[0][:, 1:]
+    return nearest.sum(axis=1) / k
@@ -1,52 +1,154 @@
 from __future__ import annotations
 
-from typing import List
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
 
-import cv2
 import numpy as np
 
+from .batch import process_many
 from .config import ProcessingConfig
-from .detection import StarDetector
+from .backends import DetectorBackend, create_detector
+from .image_source import (
+    JPEG_EXTENSIONS,
+    ImageSource,
+    jpeg_size,
+    open_image_source,
+    read_reduced_gray,
+    reduced_decode_scale,
+    to_full_resolution,
+)
 from .latitude import LatitudeSolver
 from .north import NorthPoleFinder
+from .plate_solver import CentroidPlateSolver
+from .sky_patterns import SkyPatternMatcher
 from .south import SouthPoleFinder
-from .types import LatitudeEstimate, PatternDetection, PoleEstimate, ProcessingResult
+from .stacking import stack_frames
+from .types import DetectedStar, LatitudeEstimate, PatternDetection, PoleEstimate, ProcessingResult
+
+_POOL_LOCK = threading.Lock()
 
 
 class LatitudeEstimator:
-    def __init__(self, config: ProcessingConfig | None = None) -> None:
+    def __init__(self, config: ProcessingConfig | None = None, plate_solver: CentroidPlateSolver | None = None) -> None:
+        """
+        `plate_solver`: optional solver fed with the detector's centroids (no second decode or
+        extraction); its result is returned in `ProcessingResult.plate_solve`.
+        """
         self.config = config or ProcessingConfig()
-        self.detector = StarDetector(self.config.detection)
+        self.plate_solver = plate_solver
+        self.detector = create_detector(self.config.detection.backend, self.config.detection)
+        self._reduced_detectors: Dict[int, DetectorBackend] = {}
         self.north_solver = NorthPoleFinder(self.config.north)
         self.south_solver = SouthPoleFinder(self.config.south)
         self.lat_solver = LatitudeSolver(self.config.solver)
+        # Helper thread for the south search in auto mode, created on first use; see close().
+        self._hemisphere_pool: ThreadPoolExecutor | None = None
+        pat = self.config.patterns
+        self.pattern_matcher = SkyPatternMatcher.from_json(pat.path, tolerance=pat.tolerance) if pat.enabled else None
+
+    def process_file(
+        self,
+        image_path: str | ImageSource,
+        hemisphere_mode: str,
+        day_of_year: float | None = None,
+    ) -> ProcessingResult:
+        """
+        Process a path or an ImageSource; FITS and uncompressed TIFF/DNG are memory-mapped.
+        `day_of_year` (capture date) narrows the sky-pattern prior to in-season templates.
+        """
+        try:
+            image, scale, full_size = self._decode(image_path)
+        except (ValueError, OSError):
+            return self._unreadable(image_path, hemisphere_mode)
+        return self._process(image, hemisphere_mode, scale, full_size, day_of_year)
 
-    def process_file(self, image_path: str, hemisphere_mode: str) -> ProcessingResult:
-        image = cv2.imread(image_path, cv2.IMREAD_COLOR)
-        if image is None:
+    def process_burst(
+        self,
+        frames: Sequence[np.ndarray | str | ImageSource],
+        hemisphere_mode: str,
+        day_of_year: float | None = None,
+    ) -> ProcessingResult:
+        """Align and co-add a burst of short exposures, then process the stacked frame."""
+        try:
+            stacked, stacker = stack_frames(frames, self.config.stacking, self.config.detection)
+        except ValueError as exc:
             return ProcessingResult(
                 success=False,
                 hemisphere_mode=hemisphere_mode,
                 stars=[],
                 detected_patterns=[],
-                warnings=[f"Fotograf okunamadi: {image_path}"],
+                warnings=[str(exc)],
             )
-        return self.process_image(image, hemisphere_mode)
+        result = self.process_image(stacked, hemisphere_mode, day_of_year)
+        if stacker.rejected:
+            result.warnings.append(f"{stacker.rejected} kare hizalanamadi ve yigina eklenmedi.")
+        return result
+
+    def process_image(
+        self,
+        image_bgr: np.ndarray,
+        hemisphere_mode: str,
+        day_of_year: float | None = None,
+    ) -> ProcessingResult:
+        return self._process(image_bgr, hemisphere_mode, day_of_year=day_of_year)
+
+    def process_many(
+        self,
+        image_paths: Iterable[str | os.PathLike],
+        hemisphere_mode: str,
+        workers: int | None = None,
+        ordered: bool = True,
+        max_in_flight: int | None = None,
+        day_of_year: float | None = None,
+    ) -> Iterator[ProcessingResult]:
+        """
+        Stream results for many frames from a process pool of estimators built from this
+        config (see astro_nav.batch.process_many); `result.source` names the input. Inputs are
+        paths (use process_file for an ImageSource). `day_of_year` applies to every frame. The
+        plate solver, if any, is not shipped to the workers.
+        """
+        return process_many(
+            image_paths, hemisphere_mode, self.config, workers, ordered, max_in_flight, day_of_year=day_of_year
+        )
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Stops the auto-mode helper thread, by default after a running south search finishes.
+        The estimator stays usable; a later auto call starts a new helper.
+        """
+        with _POOL_LOCK:
+            pool, self._hemisphere_pool = self._hemisphere_pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
 
-    def process_image(self, image_bgr: np.ndarray, hemisphere_mode: str) -> ProcessingResult:
+    def __enter__(self) -> "LatitudeEstimator":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _process(
+        self,
+        image_bgr: np.ndarray,
+        hemisphere_mode: str,
+        scale: int = 1,
+        full_size: tuple[int, int] | None = None,
+        day_of_year: float | None = None,
+    ) -> ProcessingResult:
         mode = hemisphere_mode.lower().strip()
-        if mode not in {"north", "south"}:
+        if mode not in {"north", "south", "auto"}:
             return ProcessingResult(
                 success=False,
                 hemisphere_mode=hemisphere_mode,
                 stars=[],
                 detected_patterns=[],
-                warnings=["Hemisphere mode north veya south olmalidir."],
+                warnings=["Hemisphere mode north, south veya auto olmalidir."],
             )
 
-        stars = self.detector.detect(image_bgr)
-        patterns: List[PatternDetection] = []
-        warnings: List[str] = []
+        stars = self._detect(image_bgr, scale)
         if len(stars) < 4:
             return ProcessingResult(
                 success=False,
@@ -56,7 +158,107 @@ class LatitudeEstimator:
                 warnings=["Yeterli yildiz tespit edilemedi."],
             )
 
-        h, w = image_bgr.shape[:2]
+        # Stars are in full-resolution pixels, so the finders and the camera model see full dimensions.
+        h, w = full_size or image_bgr.shape[:2]
+        if mode == "auto":
+            result = self._solve_auto(stars, w, h, day_of_year)
+        else:
+            result = self._solve_hemisphere(stars, mode, w, h, day_of_year)
+        if self.plate_solver is not None:
+            result.plate_solve = self._plate_solve(stars, w, h, result.warnings)
+        return result
+
+    def _solve_hemisphere(
+        self, stars: List[DetectedStar], mode: str, w: int, h: int, day_of_year: float | None
+    ) -> ProcessingResult:
+        prior = None
+        if self.pattern_matcher is not None:
+            # Cheap seasonal/geometric prior before the expensive pole searches.
+            prior = self._pattern_prior(stars, mode, day_of_year)
+            if prior is not None and prior.confidence < self.config.patterns.min_prior:
+                return ProcessingResult(
+                    success=False,
+                    hemisphere_mode=mode,
+                    stars=stars,
+                    detected_patterns=[prior],
+                    warnings=[f"Gokyuzu deseni onseli dusuk ({prior.confidence:.2f}); kutup aramasi atlandi."],
+                )
+        result = self._locate_pole(stars, mode, w, h)
+        if prior is not None:
+            result.detected_patterns.insert(0, prior)
+        return result
+
+    def _solve_auto(
+        self, stars: List[DetectedStar], w: int, h: int, day_of_year: float | None
+    ) -> ProcessingResult:
+        """
+        Both hemispheres on the one detected star list: the south search runs on a helper thread
+        while the north search runs here. A catalog-identified pole outranks a heuristic one (the
+        heuristic finders also score well on the wrong sky); otherwise the more confident
+        solution wins, north on a tie, with a warning when both solved heuristically within
+        `solver.auto_margin` of each other. Both confidences are kept in `hemisphere_scores`.
+        """
+        with _POOL_LOCK:
+            if self._hemisphere_pool is None:
+                self._hemisphere_pool = ThreadPoolExecutor(thread_name_prefix="astro-hemisphere")
+            south_future = self._hemisphere_pool.submit(self._solve_hemisphere, stars, "south", w, h, day_of_year)
+        north = self._solve_hemisphere(stars, "north", w, h, day_of_year)
+        south = south_future.result()
+        scores = {r.hemisphere_mode: r.latitude.confidence if r.success else 0.0 for r in (north, south)}
+        if not north.success and not south.success:
+            return ProcessingResult(
+                success=False,
+                hemisphere_mode="auto",
+                stars=stars,
+                detected_patterns=north.detected_patterns + south.detected_patterns,
+                warnings=north.warnings + south.warnings,
+                hemisphere_scores=scores,
+            )
+        result = max((north, south), key=lambda r: (r.success and _catalog_identified(r), scores[r.hemisphere_mode]))
+        result.hemisphere_scores = scores
+        if (
+            north.success
+            and south.success
+            and not _catalog_identified(north)
+            and not _catalog_identified(south)
+            and abs(scores["north"] - scores["south"]) < self.config.solver.auto_margin
+        ):
+            result.warnings.append(
+                "Yarimkure belirsiz: kuzey ve guney cozumlerinin guveni birbirine yakin "
+                f"({scores['north']:.2f} / {scores['south']:.2f}); modu elle secin."
+            )
+        return result
+
+    def _pattern_prior(self, stars: List[DetectedStar], mode: str, day_of_year: float | None) -> PatternDetection | None:
+        match = self.pattern_matcher.match_stars(stars, mode, day_of_year)
+        if match is None:
+            return None
+        return PatternDetection(
+            name=f"sky_pattern:{match.name}",
+            confidence=match.confidence,
+            points=[],
+            metadata={
+                "shape_score": match.shape_score,
+                "geometric_score": match.geometric_score,
+                "seasonal_score": match.seasonal_score,
+                "candidates": float(match.candidates),
+            },
+        )
+
+    def _plate_solve(self, stars: List[DetectedStar], image_w: int, image_h: int, warnings: List[str]) -> Any:
+        ordered = sorted(stars, key=lambda s: s.brightness, reverse=True)
+        xy = np.array([(s.x, s.y) for s in ordered], dtype=np.float64).reshape(-1, 2)
+        try:
+            return self.plate_solver.solve_centroids(
+                xy, (image_h, image_w), fov_estimate_deg=self.config.solver.horizontal_fov_deg
+            )
+        except Exception as exc:  # the latitude result stands on its own
+            warnings.append(f"Plate solve basarisiz: {exc}")
+            return None
+
+    def _locate_pole(self, stars: List[DetectedStar], mode: str, w: int, h: int) -> ProcessingResult:
+        patterns: List[PatternDetection] = []
+        warnings: List[str] = []
         if mode == "north":
             north = self.north_solver.solve(stars, w, h)
             if north is None:
@@ -69,6 +271,8 @@ class LatitudeEstimator:
                 )
             patterns.extend(north.patterns)
             warnings.extend(north.warnings)
+            if north.truncated:
+                warnings.append("Polaris aramasi zaman siniri nedeniyle erken kesildi.")
             alt = self.lat_solver.pole_altitude_from_pixel(north.polaris_xy[0], north.polaris_xy[1], w, h)
             lat = self.lat_solver.latitude_from_altitude(alt, mode)
             confidence = max(0.0, min(1.0, north.confidence))
@@ -82,7 +286,7 @@ class LatitudeEstimator:
                     y=north.polaris_xy[1],
                     altitude_deg=alt,
                     confidence=confidence,
-                    method="polaris",
+                    method="polaris" if north.residual_px is None else "polaris_catalog",
                 ),
                 latitude=LatitudeEstimate(
                     latitude_deg=lat,
@@ -103,6 +307,8 @@ class LatitudeEstimator:
             )
         patterns.extend(south.patterns)
         warnings.extend(south.warnings)
+        if south.truncated:
+            warnings.append("Crux aramasi zaman siniri nedeniyle erken kesildi.")
         if south.sigma_octantis_check is not None and south.sigma_octantis_check < 0.12:
             warnings.append("Sigma Octantis yardimci kontrolu cozumle uyumlu degil.")
 
@@ -146,6 +352,64 @@ class LatitudeEstimator:
             warnings=warnings,
         )
 
+    @staticmethod
+    def _unreadable(image_path: str | ImageSource, hemisphere_mode: str) -> ProcessingResult:
+        return ProcessingResult(
+            success=False,
+            hemisphere_mode=hemisphere_mode,
+            stars=[],
+            detected_patterns=[],
+            warnings=[f"Fotograf okunamadi: {getattr(image_path, 'path', image_path)}"],
+        )
+
+    def _decode(self, image_path: str | ImageSource) -> tuple[np.ndarray, int, tuple[int, int] | None]:
+        """
+        Returns (image, scale, full-resolution (h, w)). JPEGs are decoded straight to grayscale at
+        a reduced DCT scale when the expected star size allows; everything else at full size.
+        """
+        det = self.config.detection
+        if (
+            isinstance(image_path, str)
+            and image_path.lower().endswith(JPEG_EXTENSIONS)
+            and det.reduced_decode
+            and det.calibration_path is None  # the hot-pixel map is full resolution
+        ):
+            full_size = jpeg_size(image_path)
+            scale = reduced_decode_scale(
+                full_size[0],
+                self.config.solver.vertical_fov_deg,
+                det.expected_star_size_arcmin,
+                det.min_star_diameter_px,
+            )
+            if scale > 1:
+                return read_reduced_gray(image_path, scale), scale, full_size
+        return open_image_source(image_path).gray(), 1, None
+
+    def _detect(self, image_bgr: np.ndarray, scale: int = 1) -> List[DetectedStar]:
+        detector = self.detector if scale == 1 else self._reduced_detector(scale)
+        stars = detector.detect(image_bgr)
+        if scale == 1:
+            return stars
+        return [
+            DetectedStar(
+                x=to_full_resolution(s.x, scale),
+                y=to_full_resolution(s.y, scale),
+                brightness=s.brightness,
+                radius_px=s.radius_px * scale,
+            )
+            for s in stars
+        ]
+
+    def _reduced_detector(self, scale: int) -> DetectorBackend:
+        detector = self._reduced_detectors.get(scale)
+        if detector is None:
+            det = self.config.detection
+            # Blob areas shrink by scale^2; the lower bound stays, it is set by the 2x2 opening.
+            max_area = max(det.min_blob_area_px, det.max_blob_area_px // (scale * scale))
+            detector = create_detector(det.backend, replace(det, max_blob_area_px=max_area))
+            self._reduced_detectors[scale] = detector
+        return detector
+
     def _crux_center_point(self, patterns: List[PatternDetection]) -> tuple[float, float] | None:
         crux_pattern = next((p for p in patterns if p.name == "crux"), None)
         if crux_pattern is None or not crux_pattern.points:
@@ -159,3 +423,8 @@ class LatitudeEstimator:
         if center is None:
             return None
         return self.lat_solver.pole_altitude_from_pixel(center[0], center[1], image_w, image_h)
+
+
+def _catalog_identified(result: ProcessingResult) -> bool:
+    pole = result.north_polaris or result.south_scp
+    return pole is not None and pole.method.endswith("_catalog")
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Optional, Protocol, Sequence
+
+import numpy as np
+
+from .catalog import CatalogMatch, hemisphere_matcher, inverse_gnomonic
+from .types import DetectedStar
+
+HEMISPHERES = ("north", "south")
+
+
+@dataclass(frozen=True)
+class PolarPlateSolution:
+    hemisphere: str
+    # Pixel of the celestial pole; None when it lies more than 80 degrees off the axis.
+    pole_xy: Optional[tuple[float, float]]
+    # Direction of celestial north at the image center, degrees from image up towards +x.
+    roll_deg: float
+    # Pixels per degree at the image center, and the vertical field of view it implies.
+    scale_px_per_deg: float
+    vertical_fov_deg: float
+    # Sky position of the image center.
+    ra_deg: float
+    dec_deg: float
+    confidence: float
+    residual_px: float
+    inliers: int
+    visible: int
+    solve_time_ms: float
+
+
+class CentroidPlateSolver(Protocol):
+    """
+    Plate solver fed with detections the pipeline already has: (N, 2) (x, y) centroids,
+    brightest first, full-resolution (height, width), horizontal FOV estimate in degrees.
+    """
+
+    def solve_centroids(
+        self,
+        centroids: np.ndarray,
+        image_size: tuple[int, int],
+        fov_estimate_deg: Optional[float] = None,
+        fov_max_error_deg: Optional[float] = None,
+    ) -> Any: ...
+
+
+class PolarPlateSolver:
+    """
+    Plate solver for frames around either celestial pole, using only the bundled
+    polar_star_catalog.json (no tetra3 database). Detections are identified with the quad-hash
+    `AsterismMatcher`; the pole, roll and scale follow from the fitted similarity.
+    """
+
+    def __init__(
+        self,
+        catalog_path: str | None = None,
+        tolerance: float = 0.02,
+        candidates: int = 16,
+        min_inliers: int = 5,
+    ) -> None:
+        self.catalog_path = catalog_path
+        self.tolerance = tolerance
+        self.candidates = candidates
+        self.min_inliers = min_inliers
+
+    def warm_up(self, hemispheres: Sequence[str] = HEMISPHERES) -> None:
+        """Builds the hash indexes up front so the first solve is as fast as the rest."""
+        for hemisphere in hemispheres:
+            hemisphere_matcher(hemisphere, self.catalog_path, self.tolerance)
+
+    def solve_stars(
+        self,
+        stars: Sequence[DetectedStar],
+        image_w: int,
+        image_h: int,
+        hemisphere: str | None = None,
+        vertical_fov_deg: float | None = None,
+    ) -> Optional[PolarPlateSolution]:
+        ordered = sorted(stars, key=lambda s: s.brightness, reverse=True)
+        xy = np.array([(s.x, s.y) for s in ordered], dtype=np.float64).reshape(-1, 2)
+        return self.solve(xy, image_w, image_h, hemisphere, vertical_fov_deg)
+
+    def solve_centroids(
+        self,
+        centroids: np.ndarray,
+        image_size: tuple[int, int],
+        fov_estimate_deg: Optional[float] = None,
+        fov_max_error_deg: Optional[float] = None,
+    ) -> Optional[PolarPlateSolution]:
+        """`CentroidPlateSolver` entry point; the horizontal FOV estimate becomes a scale prior."""
+        image_h, image_w = image_size
+        vfov = vertical_fov_from_horizontal(fov_estimate_deg, image_w, image_h)
+        tolerance = focal_tolerance(fov_estimate_deg, fov_max_error_deg)
+        return self.solve(centroids, image_w, image_h, vertical_fov_deg=vfov, focal_tolerance=tolerance)
+
+    def solve(
+        self,
+        xy: np.ndarray,
+        image_w: int,
+        image_h: int,
+        hemisphere: str | None = None,
+        vertical_fov_deg: float | None = None,
+        focal_tolerance: float = 0.35,
+    ) -> Optional[PolarPlateSolution]:
+        """
+        `xy`: detections brightest first. `hemisphere` None tries both and keeps the match
+        with more verified stars. A `vertical_fov_deg` estimate prunes hypotheses whose scale
+        is off by more than `focal_tolerance` (relative).
+        """
+        t0 = time.perf_counter()
+        xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+        # Catalog stars are bright, so verification only looks at the brighter detections.
+        xy = xy[: 4 * self.candidates]
+        radius = max(3.0, 0.006 * max(image_w, image_h))
+        focal = None
+        if vertical_fov_deg is not None:
+            focal = (image_h / 2.0) / math.tan(math.radians(vertical_fov_deg / 2.0))
+
+        best: Optional[tuple[str, CatalogMatch]] = None
+        for name in [hemisphere] if hemisphere is not None else list(HEMISPHERES):
+            matcher = hemisphere_matcher(name, self.catalog_path, self.tolerance)
+            match = matcher.match(
+                xy,
+                image_w,
+                image_h,
+                candidates=self.candidates,
+                radius_px=radius,
+                min_inliers=self.min_inliers,
+                focal_px=focal,
+                focal_tolerance=focal_tolerance,
+            )
+            if match is not None and (
+                best is None or (len(match.pairs), -match.residual_px) > (len(best[1].pairs), -best[1].residual_px)
+            ):
+                best = (name, match)
+        if best is None:
+            return None
+        name, match = best
+        return _solution(name, match, image_w, image_h, radius, (time.perf_counter() - t0) * 1000.0)
+
+
+def vertical_fov_from_horizontal(horizontal_fov_deg: Optional[float], image_w: int, image_h: int) -> Optional[float]:
+    """Rectilinear conversion of a horizontal FOV (tetra3's convention) to the vertical one."""
+    if horizontal_fov_deg is None:
+        return None
+    half = math.tan(math.radians(horizontal_fov_deg / 2.0)) * image_h / image_w
+    return 2.0 * math.degrees(math.atan(half))
+
+
+def focal_tolerance(fov_deg: Optional[float], fov_error_deg: Optional[float], default: float = 0.35) -> float:
+    """Relative focal-length tolerance equivalent to a FOV estimate of `fov_deg` +- `fov_error_deg`."""
+    if fov_deg is None or fov_error_deg is None:
+        return default
+    t = math.tan(math.radians(fov_deg / 2.0))
+    lo = math.tan(math.radians(max(0.1, fov_deg - fov_error_deg) / 2.0))
+    hi = math.tan(math.radians(min(179.0, fov_deg + fov_error_deg) / 2.0))
+    # focal ~ 1 / tan(fov / 2)
+    return max(t / lo - 1.0, 1.0 - t / hi)
+
+
+def _solution(
+    hemisphere: str,
+    match: CatalogMatch,
+    image_w: int,
+    image_h: int,
+    radius: float,
+    solve_time_ms: float,
+) -> PolarPlateSolution:
+    a = match.scale_rotation
+    # Tangent-plane point under the image center, and the sky direction it stands for.
+    tan = (complex(image_w / 2.0, image_h / 2.0) - match.offset) / a
+    axis = inverse_gnomonic(tan.real, tan.imag, match.center)
+    ra = math.degrees(math.atan2(axis[1], axis[0])) % 360.0
+    dec = math.degrees(math.asin(max(-1.0, min(1.0, float(axis[2])))))
+
+    pole = match.project(0.0, 90.0 if hemisphere == "north" else -90.0)
+    north = a * 1j  # pixel direction of +eta
+    focal = abs(a)
+    conf = min(1.0, len(match.pairs) / match.visible) * max(0.0, 1.0 - match.residual_px / radius)
+    return PolarPlateSolution(
+        hemisphere=hemisphere,
+        pole_xy=pole if all(math.isfinite(v) for v in pole) else None,
+        roll_deg=math.degrees(math.atan2(north.real, -north.imag)) % 360.0,
+        scale_px_per_deg=focal * math.pi / 180.0,
+        vertical_fov_deg=2.0 * math.degrees(math.atan((image_h / 2.0) / focal)),
+        ra_deg=ra,
+        dec_deg=dec,
+        confidence=float(conf),
+        residual_px=match.residual_px,
+        inliers=len(match.pairs),
+        visible=match.visible,
+        solve_time_ms=solve_time_ms,
+    )
+
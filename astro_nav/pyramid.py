@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import numpy as np
+
+# Must match StarDetector._enhance.
+CLAHE_CLIP_LIMIT = 2.0
+CLAHE_GRID = 8
+_SAMPLES_PER_TILE = 16384
+
+
+def block_max(gray: np.ndarray, factor: int) -> np.ndarray:
+    """Max-pool by `factor` without copying the full frame; partial edge blocks are kept."""
+    if factor <= 1:
+        return gray
+    rows = gray[0::factor].copy()
+    for k in range(1, factor):
+        part = gray[k::factor]
+        np.maximum(rows[: len(part)], part, out=rows[: len(part)])
+    pooled = rows[:, 0::factor].copy()
+    for k in range(1, factor):
+        part = rows[:, k::factor]
+        np.maximum(pooled[:, : part.shape[1]], part, out=pooled[:, : part.shape[1]])
+    return pooled
+
+
+def blurred_samples(gray: np.ndarray, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """
+    3x3 Gaussian-blurred values (as cv2.GaussianBlur(gray, (3, 3), 0)) on the grid
+    rows x cols, computed separably from gathers instead of blurring the whole frame.
+    """
+    h, w = gray.shape[:2]
+    # [1, 2, 1] / 4 along each axis; uint16 sums cannot overflow for 8-bit input.
+    vertical = (
+        np.take(gray, _reflect101(rows - 1, h), axis=0).astype(np.uint16)
+        + 2 * np.take(gray, rows, axis=0).astype(np.uint16)
+        + np.take(gray, _reflect101(rows + 1, h), axis=0)
+    )
+    both = (
+        np.take(vertical, _reflect101(cols - 1, w), axis=1)
+        + 2 * np.take(vertical, cols, axis=1)
+        + np.take(vertical, _reflect101(cols + 1, w), axis=1)
+    )
+    return ((both + 8) // 16).astype(gray.dtype)
+
+
+def _reflect101(idx: np.ndarray, size: int) -> np.ndarray:
+    if size == 1:
+        return np.zeros_like(idx)
+    idx = np.abs(idx)
+    return np.where(idx >= size, 2 * (size - 1) - idx, idx)
+
+
+class ClaheModel:
+    """
+    Approximates cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8)) lookup tables from a
+    subsampled histogram of the blurred frame, so that small full-resolution regions can be
+    enhanced as the full-frame pass would without materialising the enhanced frame. Tables are
+    exact while a tile holds at most 16384 pixels (sample step 1); above that the histogram is
+    sampled on a `step` grid and table entries may differ by about one gray level, so pixels
+    within a level of `min_threshold` can segment differently from `StarDetector.detect`.
+    """
+
+    def __init__(self, gray: np.ndarray, sample_step: int | None = None) -> None:
+        h, w = gray.shape[:2]
+        self.shape = (h, w)
+        if h % CLAHE_GRID == 0 and w % CLAHE_GRID == 0:
+            self.tile_h, self.tile_w = h // CLAHE_GRID, w // CLAHE_GRID
+        else:
+            # OpenCV then pads both axes by (grid - size % grid), even an evenly divisible one.
+            self.tile_h = (h + CLAHE_GRID - h % CLAHE_GRID) // CLAHE_GRID
+            self.tile_w = (w + CLAHE_GRID - w % CLAHE_GRID) // CLAHE_GRID
+        area = float(self.tile_h * self.tile_w)
+        clip = max(int(CLAHE_CLIP_LIMIT * area / 256.0), 1)
+
+        # About 16k histogram samples per tile keeps the tables within one gray level.
+        step = sample_step or int(np.sqrt(area / _SAMPLES_PER_TILE))
+        step = max(1, step)
+        # Padding rows/columns are BORDER_REFLECT_101 copies.
+        pad_rows = np.arange(0, self.tile_h * CLAHE_GRID, step)
+        pad_cols = np.arange(0, self.tile_w * CLAHE_GRID, step)
+        sample = blurred_samples(gray, _reflect101(pad_rows, h), _reflect101(pad_cols, w))
+        sy = pad_rows // self.tile_h
+        sx = pad_cols // self.tile_w
+        tile_index = sy[:, None] * CLAHE_GRID + sx[None, :]
+        flat = tile_index.ravel() * 256 + sample.ravel().astype(np.int64)
+        hist = np.bincount(flat, minlength=CLAHE_GRID * CLAHE_GRID * 256).reshape(-1, 256).astype(np.float64)
+        counts = hist.sum(axis=1, keepdims=True)
+        hist *= area / np.maximum(counts, 1.0)
+
+        # Clip and redistribute the excess exactly like OpenCV (batch + strided residual).
+        excess = np.rint(np.maximum(hist - clip, 0.0).sum(axis=1)).astype(np.int64)
+        hist = np.minimum(hist, clip) + (excess // 256)[:, None]
+        for tile, residual in enumerate(excess % 256):
+            if residual:
+                hist[tile, :: max(256 // residual, 1)][:residual] += 1.0
+        self.luts = np.clip(np.rint(np.cumsum(hist, axis=1) * 255.0 / area), 0, 255).reshape(
+            CLAHE_GRID, CLAHE_GRID, 256
+        )
+        self._cols = _interpolation_axis(np.arange(w), self.tile_w)
+        self._rows = _interpolation_axis(np.arange(h), self.tile_h)
+
+    def enhance(self, values: np.ndarray, x0: int, y0: int) -> np.ndarray:
+        """Enhanced values for a region whose top-left pixel sits at (x0, y0) in the full frame."""
+        rh, rw = values.shape[:2]
+        cols = tuple(a[x0 : x0 + rw] for a in self._cols)
+        rows = tuple(a[y0 : y0 + rh] for a in self._rows)
+        return self._interpolate(values, cols, rows)
+
+    def above_threshold(self, values: np.ndarray, cols: np.ndarray, rows: np.ndarray, threshold: int) -> np.ndarray:
+        """
+        Mask of grid samples whose enhanced value exceeds `threshold` (cv2.THRESH_BINARY).
+        The interpolation is a convex mix of monotone tables, so only samples at or above the
+        smallest per-tile passing gray level need to be enhanced.
+        """
+        passing = self.luts > threshold
+        first_pass = np.where(passing.any(axis=2), passing.argmax(axis=2), 256)
+        mask = np.zeros(values.shape[:2], dtype=bool)
+        ys, xs = np.nonzero(values >= first_pass.min())
+        if ys.size == 0:
+            return mask
+        tx1, tx2, xa = _interpolation_axis(cols[xs], self.tile_w)
+        ty1, ty2, ya = _interpolation_axis(rows[ys], self.tile_h)
+        v = values[ys, xs]
+        lut = self.luts
+        top = lut[ty1, tx1, v] * (1.0 - xa) + lut[ty1, tx2, v] * xa
+        bottom = lut[ty2, tx1, v] * (1.0 - xa) + lut[ty2, tx2, v] * xa
+        enhanced = np.rint(top * (1.0 - ya) + bottom * ya)
+        hit = enhanced > threshold
+        mask[ys[hit], xs[hit]] = True
+        return mask
+
+    def _interpolate(
+        self,
+        values: np.ndarray,
+        cols: tuple[np.ndarray, np.ndarray, np.ndarray],
+        rows: tuple[np.ndarray, np.ndarray, np.ndarray],
+    ) -> np.ndarray:
+        tx1, tx2, xa = (a[None, :] for a in cols)
+        ty1, ty2, ya = (a[:, None] for a in rows)
+        lut = self.luts
+        top = lut[ty1, tx1, values] * (1.0 - xa) + lut[ty1, tx2, values] * xa
+        bottom = lut[ty2, tx1, values] * (1.0 - xa) + lut[ty2, tx2, values] * xa
+        return np.rint(top * (1.0 - ya) + bottom * ya).astype(np.uint8)
+
+
+def _interpolation_axis(coords: np.ndarray, tile: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Same neighbour tiles and weights as OpenCV's CLAHE interpolation along one axis.
+    pos = coords / tile - 0.5
+    first = np.floor(pos).astype(np.int64)
+    weight = pos - first
+    second = np.minimum(first + 1, CLAHE_GRID - 1)
+    return np.maximum(first, 0), second, weight
+
+
+def pooled_mask(clahe: ClaheModel, coarse: np.ndarray, factor: int, threshold: int) -> np.ndarray:
+    """
+    Threshold a block-max image using the lookup tables at each block's center. Pixels away
+    from the center interpolate slightly different tables, so a block whose maximum sits right
+    at the threshold can be missed; this is an approximation, not a bound.
+    """
+    ch, cw = coarse.shape[:2]
+    cols = np.minimum(np.arange(cw) * factor + factor // 2, clahe.shape[1] - 1)
+    rows = np.minimum(np.arange(ch) * factor + factor // 2, clahe.shape[0] - 1)
+    return clahe.above_threshold(coarse, cols, rows, threshold)
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .catalog import _PAIRS, QuadHashIndex, _quad_combinations
+from .types import DetectedStar
+
+# Same templates the Android SkyPatternMatcher reads.
+DEFAULT_PATTERNS_PATH = Path(__file__).resolve().parent.parent / "src" / "main" / "assets" / "sky_patterns.json"
+
+_DAYS = 366
+# Month of each day of a leap year (index 0 = day 1); the app's Calendar lookup does the same.
+_MONTH_OF_DAY = np.repeat(np.arange(1, 13), [31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+
+@dataclass(frozen=True)
+class SkyPatternTemplate:
+    name: str
+    hemisphere: str
+    triangle_ratios: tuple[float, ...]
+    quad_ratios: tuple[float, ...]
+    quad_hashes: tuple[tuple[float, ...], ...]
+    visible_months: frozenset[int]
+    peak_day: Optional[int]
+    day_spread: int
+
+
+@dataclass(frozen=True)
+class SkyPatternMatch:
+    name: str
+    confidence: float
+    shape_score: float
+    geometric_score: float
+    seasonal_score: float
+    # Templates left after the seasonal prefilter.
+    candidates: int
+
+
+def load_sky_patterns(path: str | Path | None = None) -> List[SkyPatternTemplate]:
+    with open(path or DEFAULT_PATTERNS_PATH, encoding="utf-8") as f:
+        raw = json.load(f)
+    return [
+        SkyPatternTemplate(
+            name=t["name"],
+            hemisphere=t["hemisphere"].lower(),
+            triangle_ratios=tuple(float(v) for v in t["triangleRatios"]),
+            quad_ratios=tuple(float(v) for v in t["quadRatios"]),
+            quad_hashes=tuple(tuple(float(v) for v in h) for h in t.get("quadHashes", []) if h),
+            visible_months=frozenset(int(m) for m in t.get("visibleMonths", [])),
+            peak_day=int(t["peakDay"]) if "peakDay" in t else None,
+            day_spread=int(t.get("daySpread", 45)),
+        )
+        for t in raw
+    ]
+
+
+def day_of_year(when: datetime) -> float:
+    """Fractional day of year (1 = Jan 1 00:00) for the seasonal prefilter."""
+    start = datetime(when.year, 1, 1, tzinfo=when.tzinfo)
+    return 1.0 + (when - start).total_seconds() / 86400.0
+
+
+def season_scores(template: SkyPatternTemplate, days: np.ndarray) -> np.ndarray:
+    """Seasonal score of `template` on each day (1..366), as in the Android matcher."""
+    if template.peak_day is not None:
+        raw = np.abs(days - template.peak_day)
+        distance = np.minimum(raw, _DAYS - raw)
+        return np.clip(1.0 - distance / max(15, template.day_spread), 0.0, 1.0)
+    months = _MONTH_OF_DAY[np.clip(days.astype(int), 1, _DAYS) - 1]
+    return np.where(np.isin(months, list(template.visible_months)), 1.0, 0.2)
+
+
+def quad_distances(xy: np.ndarray, quads: np.ndarray) -> np.ndarray:
+    """Sorted six pairwise distances of each (M, 4) index quad, gathered from one distance matrix."""
+    dmat = np.hypot(xy[:, None, 0] - xy[None, :, 0], xy[:, None, 1] - xy[None, :, 1])
+    return np.sort(dmat[quads[:, _PAIRS[:, 0]], quads[:, _PAIRS[:, 1]]], axis=1)
+
+
+def distance_hashes(ds: np.ndarray) -> np.ndarray:
+    """
+    Quad hashes from sorted quad distances: the four shortest of the six over the longest,
+    ascending (the templates' `quadHashes` convention).
+    """
+    return np.clip(ds[:, :4] / np.maximum(ds[:, -1:], 1e-9), 0.0, 1.0)
+
+
+class SkyPatternMatcher:
+    """
+    Python counterpart of the app's SkyPatternMatcher. Templates are precompiled once:
+    - a day-of-year table lists, per hemisphere, the templates with a nonzero seasonal score,
+      so out-of-season templates are dropped before any geometry is compared;
+    - every template quad hash goes into a quantized `QuadHashIndex`, so each observed quad
+      costs one table lookup instead of a scan over all template hashes.
+    The score blends shape ratios, hashed quad hits and season (0.45 / 0.35 / 0.20). Like the
+    app, only the first `max_quads` non-degenerate quads (brightness order) are hashed: with
+    all C(20, 4) quads nearly any field hits every template by chance.
+    """
+
+    def __init__(
+        self,
+        templates: Sequence[SkyPatternTemplate],
+        tolerance: float = 0.03,
+        top_stars: int = 20,
+        max_quads: int = 30,
+    ) -> None:
+        self.templates = list(templates)
+        self.tolerance = tolerance
+        self.top_stars = top_stars
+        self.max_quads = max_quads
+        days = np.arange(1, _DAYS + 1, dtype=np.float64)
+        self._season = np.array([season_scores(t, days) for t in self.templates]).reshape(len(self.templates), _DAYS)
+        self._by_day: Dict[str, List[np.ndarray]] = {}
+        for hemisphere in {t.hemisphere for t in self.templates}:
+            mine = np.array([t.hemisphere == hemisphere for t in self.templates])
+            self._by_day[hemisphere] = [np.flatnonzero(mine & (self._season[:, d] > 0.0)) for d in range(_DAYS)]
+        self.index = QuadHashIndex(tolerance)
+        for tid, t in enumerate(self.templates):
+            for hid, h in enumerate(t.quad_hashes):
+                self.index.add(np.asarray(h, dtype=np.float64), (tid, hid))
+        # Occupied cells as sorted scalars: observed quads in empty cells are dropped in one pass.
+        self._occupied = np.unique(_pack(np.array(self.index.cell_keys(), dtype=np.int64).reshape(-1, 4)))
+
+    @classmethod
+    def from_json(cls, path: str | Path | None = None, **kwargs) -> "SkyPatternMatcher":
+        return cls(load_sky_patterns(path), **kwargs)
+
+    def candidates(self, hemisphere: str, day: float | None) -> np.ndarray:
+        """Template ids of `hemisphere` in season on `day` (all of them when the date is unknown)."""
+        hemisphere = hemisphere.lower()
+        if day is None:
+            return np.array([i for i, t in enumerate(self.templates) if t.hemisphere == hemisphere], dtype=np.intp)
+        table = self._by_day.get(hemisphere)
+        if table is None:
+            return np.zeros(0, dtype=np.intp)
+        return table[(int(day) - 1) % _DAYS]
+
+    def match_stars(self, stars: Sequence[DetectedStar], hemisphere: str, day: float | None = None) -> Optional[SkyPatternMatch]:
+        ordered = sorted(stars, key=lambda s: s.brightness, reverse=True)
+        xy = np.array([(s.x, s.y) for s in ordered], dtype=np.float64).reshape(-1, 2)
+        return self.match(xy, hemisphere, day)
+
+    def match(self, xy: np.ndarray, hemisphere: str, day: float | None = None) -> Optional[SkyPatternMatch]:
+        """`xy`: detections brightest first. None when fewer than 4 stars or no candidate template."""
+        xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)[: self.top_stars]
+        candidates = self.candidates(hemisphere, day)
+        if len(xy) < 4 or len(candidates) == 0:
+            return None
+
+        ds = quad_distances(xy, _quad_combinations(len(xy)))
+        tri, quad = _observed_ratios(xy, ds)
+        # The app skips quads whose longest side is under a pixel and stops at 30.
+        hashes = distance_hashes(ds[ds[:, -1] >= 1.0][: self.max_quads])
+        # Best hit error per (template, hash); unique cells first, so repeated cells cost nothing.
+        best: Dict[tuple[int, int], float] = {}
+        allowed = set(candidates.tolist())
+        keys = np.floor(hashes / self.index.bin_width).astype(np.int64)
+        occupied = np.isin(_pack(keys), self._occupied)
+        hashes, keys = hashes[occupied], keys[occupied]
+        if len(keys):
+            cells, inverse = np.unique(keys, axis=0, return_inverse=True)
+            inverse = inverse.ravel()
+            for c, key in enumerate(map(tuple, cells.tolist())):
+                entries = [e for e in self.index.cell(key) if self.index.members[e][0] in allowed]
+                if not entries:
+                    continue
+                observed = hashes[inverse == c]
+                for entry in entries:
+                    err = float(np.abs(observed - self.index.codes[entry]).max(axis=1).min())
+                    hit = self.index.members[entry]
+                    if err <= self.tolerance and err < best.get(hit, np.inf):
+                        best[hit] = err
+
+        season_day = None if day is None else (int(day) - 1) % _DAYS
+        winner: Optional[SkyPatternMatch] = None
+        for tid in candidates.tolist():
+            t = self.templates[tid]
+            shape = min(1.0, max(0.0, 0.72 * _ratio_score(tri, t.triangle_ratios) + 0.28 * _ratio_score(quad, t.quad_ratios)))
+            hits = [1.0 - best[(tid, hid)] / self.tolerance for hid in range(len(t.quad_hashes)) if (tid, hid) in best]
+            geometric = sum(hits) / len(t.quad_hashes) if t.quad_hashes else 0.0
+            seasonal = 1.0 if season_day is None else float(self._season[tid, season_day])
+            score = min(1.0, max(0.0, 0.45 * shape + 0.35 * geometric + 0.20 * seasonal))
+            if winner is None or score > winner.confidence:
+                winner = SkyPatternMatch(t.name, score, shape, geometric, seasonal, len(candidates))
+        return winner
+
+
+def _pack(keys: np.ndarray) -> np.ndarray:
+    """(M, 4) cell keys as scalars; components are small (codes lie in [0, 1])."""
+    k = keys + 8
+    return ((k[:, 0] * 256 + k[:, 1]) * 256 + k[:, 2]) * 256 + k[:, 3]
+
+
+def _observed_ratios(xy: np.ndarray, quad_ds: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sorted observed ratios as the app builds them: short/long and mid/long edges of the first
+    12 triangles, min/max and third/max distances of the first 8 quads (brightness order).
+    """
+    n = len(xy)
+    tri_idx = np.array([(i, j, k) for i in range(n) for j in range(i + 1, n) for k in range(j + 1, n)][:12], dtype=np.intp)
+    tri_pts = xy[tri_idx]
+    edges = np.sort(np.linalg.norm(tri_pts - np.roll(tri_pts, -1, axis=1), axis=-1), axis=1)
+    tri = (edges[:, :2] / np.maximum(edges[:, 2:], 1e-9)).ravel()
+
+    ds = quad_ds[:8]  # combinations are lexicographic, as the app's nested loops
+    longest = np.maximum(ds[:, -1], 1e-9)
+    quad = np.column_stack([ds[:, 0] / longest, ds[:, 2] / longest]).ravel()
+    return np.sort(np.clip(tri, 0.0, 1.0)), np.sort(np.clip(quad, 0.0, 1.0))
+
+
+def _ratio_score(observed: np.ndarray, expected: Sequence[float]) -> float:
+    """Mean over expected ratios of 1 - distance to the nearest observed one (binary search)."""
+    if len(observed) == 0 or not expected:
+        return 0.0
+    e = np.asarray(expected, dtype=np.float64)
+    pos = np.clip(np.searchsorted(observed, e), 1, len(observed) - 1) if len(observed) > 1 else np.zeros(len(e), int)
+    nearest = np.minimum(np.abs(observed[pos] - e), np.abs(observed[np.maximum(pos - 1, 0)] - e))
+    return float(np.clip(1.0 - np.minimum(nearest, 1.0), 0.0, 1.0).mean())
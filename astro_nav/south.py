@@ -1,13 +1,15 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from itertools import combinations
+from dataclasses import dataclass, replace
 from typing import List, Optional
 
+import numpy as np
+from scipy.spatial import cKDTree
+
+from .anytime import Deadline, anytime_search, pool_schedule, prior_order
 from .config import SouthConfig
 from .geometry import (
     add,
-    angle_between,
     dist,
     midpoint,
     mul,
@@ -26,6 +28,8 @@ class SouthSolution:
     patterns: List[PatternDetection]
     warnings: List[str]
     sigma_octantis_check: Optional[float]
+    # Anytime mode: the deadline expired before the largest candidate pool was searched.
+    truncated: bool = False
 
 
 @dataclass(frozen=True)
@@ -56,58 +60,55 @@ class SouthPoleFinder:
         self.config = config
 
     def solve(self, stars: List[DetectedStar], image_w: int, image_h: int) -> Optional[SouthSolution]:
+        cfg = self.config
+        if cfg.deadline_ms is None:
+            return self._solve(stars, image_w, image_h)
+        # Anytime mode: brightest, most central candidates first, growing pools. The quad
+        # search grows roughly cubically with the pool, hence growth=3 for the stage estimate.
+        ordered = prior_order(stars, image_w, image_h, central_weight=0.1)
+        best, truncated = anytime_search(
+            lambda pool: self._solve(list(pool), image_w, image_h),
+            ordered,
+            pool_schedule(len(ordered), 12, cfg.bright_pool),
+            Deadline(cfg.deadline_ms),
+            rank=lambda s: s.confidence,
+            growth=3.0,
+            cap=cfg.bright_pool,
+        )
+        return replace(best, truncated=True) if best is not None and truncated else best
+
+    def _solve(self, stars: List[DetectedStar], image_w: int, image_h: int) -> Optional[SouthSolution]:
         warnings: List[str] = []
         if len(stars) < 8:
             warnings.append("Guney cozumunde yetersiz yildiz adayi.")
             return None
 
-        bright = stars[: min(40, len(stars))]
-        crux = self._find_best_crux(bright, image_h)
-        if crux is None or crux.score < self.config.min_crux_score:
+        bright = stars[: self.config.bright_pool]
+        cruxes = [
+            c
+            for c in self._find_crux_hypotheses(bright, image_h, self.config.crux_hypotheses)
+            if c.score >= self.config.min_crux_score
+        ]
+        if not cruxes:
             warnings.append("Crux guvenilir tespit edilemedi.")
             return None
 
-        axis = normalize(sub((crux.acrux.x, crux.acrux.y), (crux.gacrux.x, crux.gacrux.y)))
-        axis_len = crux.long_axis_len
-        initial_scp = add(
-            (crux.gacrux.x, crux.gacrux.y),
-            mul(axis, self.config.axis_extension_factor * axis_len),
-        )
-
-        pointers = self._find_pointer_pair(bright, crux, initial_scp, image_h)
-        if pointers is None:
+        initial_scps = [self._initial_scp(c) for c in cruxes]
+        # Pointer pairs for every Crux hypothesis in one pass; the jointly best combination wins.
+        pointer_sets = self._pointer_pairs(bright, cruxes, initial_scps, image_h)
+        best = None
+        for crux, initial_scp, pointers in zip(cruxes, initial_scps, pointer_sets):
+            if pointers is None:
+                continue
+            refined, confidence = self._combine(crux, initial_scp, pointers, image_w, image_h)
+            if best is None or confidence > best[4]:
+                best = (crux, initial_scp, pointers, refined, confidence)
+        if best is None:
             warnings.append("Alpha/Beta Centauri pointer cift guveni dusuk.")
             return None
 
-        p1, p2, pointer_score = pointers
-        pointer_mid = midpoint((p1.x, p1.y), (p2.x, p2.y))
-        pvec = normalize(sub((p2.x, p2.y), (p1.x, p1.y)))
+        crux, _, (p1, p2, pointer_score), refined, confidence = best
         p_dist = dist((p1.x, p1.y), (p2.x, p2.y))
-
-        pointer_cand_a = add((p1.x, p1.y), mul(pvec, self.config.pointer_extension_factor * p_dist))
-        pointer_cand_b = add((p2.x, p2.y), mul(mul(pvec, -1.0), self.config.pointer_extension_factor * p_dist))
-        pointer_target = pointer_cand_a if dist(pointer_cand_a, initial_scp) < dist(pointer_cand_b, initial_scp) else pointer_cand_b
-
-        axis_projection = project_point_on_line(initial_scp, (crux.gacrux.x, crux.gacrux.y), (crux.acrux.x, crux.acrux.y))
-        refined = (
-            0.60 * initial_scp[0] + 0.25 * pointer_target[0] + 0.15 * axis_projection[0],
-            0.60 * initial_scp[1] + 0.25 * pointer_target[1] + 0.15 * axis_projection[1],
-        )
-
-        false_positive_penalty = self._false_positive_penalty(
-            crux=crux,
-            pointer_pair=(p1, p2),
-            scp=refined,
-            image_w=image_w,
-            image_h=image_h,
-        )
-        confidence = max(
-            0.0,
-            min(
-                1.0,
-                (0.55 * crux.score + 0.35 * pointer_score + 0.10 * (1.0 - false_positive_penalty)),
-            ),
-        )
         if confidence < self.config.min_confidence:
             warnings.append("Guney cozum guveni dusuk, sonuc uydurulmadi.")
             return None
@@ -144,61 +145,80 @@ class SouthPoleFinder:
             sigma_octantis_check=sigma_check,
         )
 
-    def _find_best_crux(self, stars: List[DetectedStar], image_h: int) -> Optional[CruxCandidate]:
-        best: Optional[CruxCandidate] = None
-        for combo in combinations(stars, 4):
-            pts = [(s.x, s.y) for s in combo]
-            pairs = list(combinations(range(4), 2))
-            pair_lengths = sorted(
-                [(dist(pts[i], pts[j]), i, j) for i, j in pairs],
-                key=lambda t: t[0],
-                reverse=True,
-            )
-            long_len, a, b = pair_lengths[0]
-            short_candidates = [
-                (d, i, j)
-                for d, i, j in pair_lengths[1:]
-                if len({a, b, i, j}) == 4
-            ]
-            if not short_candidates:
-                continue
-            short_len, c, d = short_candidates[0]
-            if short_len <= 1e-6:
-                continue
+    def _initial_scp(self, crux: CruxCandidate) -> tuple[float, float]:
+        axis = normalize(sub((crux.acrux.x, crux.acrux.y), (crux.gacrux.x, crux.gacrux.y)))
+        return add(
+            (crux.gacrux.x, crux.gacrux.y),
+            mul(axis, self.config.axis_extension_factor * crux.long_axis_len),
+        )
 
-            ratio = long_len / short_len
-            ratio_err = abs(ratio - self.config.crux_long_short_ratio)
-            if ratio_err > self.config.crux_ratio_tolerance:
-                continue
+    def _combine(
+        self,
+        crux: CruxCandidate,
+        initial_scp: tuple[float, float],
+        pointers: tuple[DetectedStar, DetectedStar, float],
+        image_w: int,
+        image_h: int,
+    ) -> tuple[tuple[float, float], float]:
+        """Refined SCP and overall confidence of one Crux + pointer combination."""
+        p1, p2, pointer_score = pointers
+        pvec = normalize(sub((p2.x, p2.y), (p1.x, p1.y)))
+        p_dist = dist((p1.x, p1.y), (p2.x, p2.y))
+
+        pointer_cand_a = add((p1.x, p1.y), mul(pvec, self.config.pointer_extension_factor * p_dist))
+        pointer_cand_b = add((p2.x, p2.y), mul(mul(pvec, -1.0), self.config.pointer_extension_factor * p_dist))
+        pointer_target = pointer_cand_a if dist(pointer_cand_a, initial_scp) < dist(pointer_cand_b, initial_scp) else pointer_cand_b
 
-            long_vec = sub(pts[b], pts[a])
-            short_vec = sub(pts[d], pts[c])
-            angle = angle_between(long_vec, short_vec)
-            angle_score = max(0.0, 1.0 - abs(angle - 90.0) / 35.0)
-            ratio_score = max(0.0, 1.0 - ratio_err / max(1e-6, self.config.crux_ratio_tolerance))
-
-            mid_long = midpoint(pts[a], pts[b])
-            mid_short = midpoint(pts[c], pts[d])
-            center_dist = dist(mid_long, mid_short)
-            center_score = max(0.0, 1.0 - center_dist / max(8.0, 0.12 * image_h))
-
-            brightness_score = min(1.0, sum(s.brightness for s in combo) / (4.0 * 220.0))
-            score = 0.35 * ratio_score + 0.35 * angle_score + 0.20 * center_score + 0.10 * brightness_score
-            if best is None or score > best.score:
-                s_a = combo[a]
-                s_b = combo[b]
-                # Heuristic: Gacrux is usually visually higher than Acrux in common framed photos.
-                gacrux, acrux = (s_a, s_b) if s_a.y <= s_b.y else (s_b, s_a)
-                best = CruxCandidate(
+        axis_projection = project_point_on_line(initial_scp, (crux.gacrux.x, crux.gacrux.y), (crux.acrux.x, crux.acrux.y))
+        refined = (
+            0.60 * initial_scp[0] + 0.25 * pointer_target[0] + 0.15 * axis_projection[0],
+            0.60 * initial_scp[1] + 0.25 * pointer_target[1] + 0.15 * axis_projection[1],
+        )
+
+        false_positive_penalty = self._false_positive_penalty(
+            crux=crux,
+            pointer_pair=(p1, p2),
+            scp=refined,
+            image_w=image_w,
+            image_h=image_h,
+        )
+        confidence = max(
+            0.0,
+            min(
+                1.0,
+                (0.55 * crux.score + 0.35 * pointer_score + 0.10 * (1.0 - false_positive_penalty)),
+            ),
+        )
+        return refined, confidence
+
+    def _find_best_crux(self, stars: List[DetectedStar], image_h: int) -> Optional[CruxCandidate]:
+        hypotheses = self._find_crux_hypotheses(stars, image_h, 1)
+        return hypotheses[0] if hypotheses else None
+
+    def _find_crux_hypotheses(self, stars: List[DetectedStar], image_h: int, top_k: int) -> List[CruxCandidate]:
+        """The `top_k` best-scoring Crux quads, best first."""
+        if len(stars) < 4:
+            return []
+        xy = np.array([(s.x, s.y) for s in stars], dtype=np.float64)
+        brightness = np.array([s.brightness for s in stars], dtype=np.float64)
+        hypotheses: List[CruxCandidate] = []
+        for (a, b, c, d), score, long_len, short_len in crux_quads(xy, brightness, self.config, image_h, top_k):
+            s_a = stars[a]
+            s_b = stars[b]
+            # Heuristic: Gacrux is usually visually higher than Acrux in common framed photos.
+            gacrux, acrux = (s_a, s_b) if s_a.y <= s_b.y else (s_b, s_a)
+            hypotheses.append(
+                CruxCandidate(
                     gacrux=gacrux,
                     acrux=acrux,
-                    side1=combo[c],
-                    side2=combo[d],
+                    side1=stars[c],
+                    side2=stars[d],
                     score=score,
                     long_axis_len=long_len,
                     short_axis_len=short_len,
                 )
-        return best
+            )
+        return hypotheses
 
     def _find_pointer_pair(
         self,
@@ -207,31 +227,70 @@ class SouthPoleFinder:
         initial_scp: tuple[float, float],
         image_h: int,
     ) -> Optional[tuple[DetectedStar, DetectedStar, float]]:
-        crux_members = {id(crux.gacrux), id(crux.acrux), id(crux.side1), id(crux.side2)}
-        candidates = [s for s in stars if id(s) not in crux_members][:20]
+        return self._pointer_pairs(stars, [crux], [initial_scp], image_h)[0]
 
-        best: Optional[tuple[DetectedStar, DetectedStar, float]] = None
-        for s1, s2 in combinations(candidates, 2):
-            pair_dist = dist((s1.x, s1.y), (s2.x, s2.y))
-            if pair_dist < 0.04 * image_h or pair_dist > 0.45 * image_h:
-                continue
-            line_to_scp = point_line_distance(initial_scp, (s1.x, s1.y), (s2.x, s2.y))
-            line_score = max(0.0, 1.0 - line_to_scp / max(10.0, 0.16 * image_h))
-
-            brightness = min(1.0, (s1.brightness + s2.brightness) / (2.0 * 240.0))
-            cross_to_crux = point_line_distance(
-                midpoint((crux.gacrux.x, crux.gacrux.y), (crux.acrux.x, crux.acrux.y)),
-                (s1.x, s1.y),
-                (s2.x, s2.y),
-            )
-            separation_score = min(1.0, cross_to_crux / max(6.0, 0.05 * image_h))
-            score = 0.45 * line_score + 0.30 * brightness + 0.25 * separation_score
-            if best is None or score > best[2]:
-                best = (s1, s2, score)
-
-        if best is None or best[2] < self.config.min_pointer_score:
-            return None
-        return best
+    def _pointer_pairs(
+        self,
+        stars: List[DetectedStar],
+        cruxes: List[CruxCandidate],
+        initial_scps: List[tuple[float, float]],
+        image_h: int,
+    ) -> List[Optional[tuple[DetectedStar, DetectedStar, float]]]:
+        """
+        Best Alpha/Beta Centauri pair for each Crux hypothesis. Every pair of the candidate pool
+        is scored against every hypothesis as one (hypotheses x pairs) array: line-to-SCP
+        distance, brightness and separation from the Crux axis. Per hypothesis the candidates
+        are the first 20 stars that are not its Crux members; ties keep combination order.
+        """
+        k = len(cruxes)
+        if k == 0:
+            return []
+        pool = stars[: 20 + 4]
+        if len(pool) < 2:
+            return [None] * k
+        xy = np.array([(s.x, s.y) for s in pool], dtype=np.float64)
+        bright = np.array([s.brightness for s in pool], dtype=np.float64)
+        index = {id(s): n for n, s in enumerate(pool)}
+
+        allowed = np.ones((k, len(pool)), dtype=bool)
+        for row, crux in enumerate(cruxes):
+            for member in (crux.gacrux, crux.acrux, crux.side1, crux.side2):
+                if id(member) in index:
+                    allowed[row, index[id(member)]] = False
+        allowed &= np.cumsum(allowed, axis=1) <= 20
+
+        i, j = np.triu_indices(len(pool), 1)
+        dx = xy[j, 0] - xy[i, 0]
+        dy = xy[j, 1] - xy[i, 1]
+        pair_dist = np.hypot(dx, dy)
+        safe = np.maximum(pair_dist, 1e-12)
+        valid = allowed[:, i] & allowed[:, j] & (pair_dist >= 0.04 * image_h) & (pair_dist <= 0.45 * image_h)
+
+        def line_distance(points: np.ndarray) -> np.ndarray:
+            # (k, 2) points -> (k, pairs) distance to each pair's line
+            px = points[:, :1] - xy[i, 0]
+            py = points[:, 1:] - xy[i, 1]
+            return np.abs(dx * py - dy * px) / safe
+
+        scps = np.array(initial_scps, dtype=np.float64).reshape(k, 2)
+        crux_mid = np.array(
+            [midpoint((c.gacrux.x, c.gacrux.y), (c.acrux.x, c.acrux.y)) for c in cruxes], dtype=np.float64
+        ).reshape(k, 2)
+        line_score = np.maximum(0.0, 1.0 - line_distance(scps) / max(10.0, 0.16 * image_h))
+        brightness = np.minimum(1.0, (bright[i] + bright[j]) / (2.0 * 240.0))
+        separation_score = np.minimum(1.0, line_distance(crux_mid) / max(6.0, 0.05 * image_h))
+        score = 0.45 * line_score + 0.30 * brightness + 0.25 * separation_score
+        score = np.where(valid, score, -np.inf)
+
+        best = score.argmax(axis=1)
+        results: List[Optional[tuple[DetectedStar, DetectedStar, float]]] = []
+        for row, col in enumerate(best):
+            value = float(score[row, col])
+            if not np.isfinite(value) or value < self.config.min_pointer_score:
+                results.append(None)
+            else:
+                results.append((pool[i[col]], pool[j[col]], value))
+        return results
 
     def _false_positive_penalty(
         self,
@@ -270,3 +329,97 @@ class SouthPoleFinder:
         score = max(0.0, min(1.0, 1.0 - nearest / max(8.0, 0.10 * image_h)))
         return score
 
+
+
+def crux_quads(
+    xy: np.ndarray,
+    brightness: np.ndarray,
+    config: SouthConfig,
+    image_h: int,
+    top_k: int = 1,
+) -> List[tuple[tuple[int, int, int, int], float, float, float]]:
+    """
+    The `top_k` best Crux-shaped quads as ((long a, long b, short c, short d), score, long,
+    short), best first.
+
+    Every star pair is indexed once by its midpoint and log length (one shared distance
+    matrix). A Crux is a long axis crossed near its middle by a short axis shorter by
+    `crux_long_short_ratio`, so each long axis needs a single ball query to retrieve the short
+    axes with a nearby midpoint and the right length ratio, instead of enumerating all
+    4-combinations. Quads whose axes do not cross near the middle (zero center score) are never
+    retrieved; the rest are scored exactly as the per-quad search did (ties: first quad in
+    combination order).
+    """
+    n = len(xy)
+    if n < 4:
+        return []
+    diff = xy[:, None, :] - xy[None, :, :]
+    dmat = np.hypot(diff[..., 0], diff[..., 1])
+    pi, pj = np.triu_indices(n, 1)
+    length = dmat[pi, pj]
+    valid = length > 1e-6
+    pi, pj, length = pi[valid], pj[valid], length[valid]
+    if len(length) < 2:
+        return []
+    mid = (xy[pi] + xy[pj]) * 0.5
+    log_len = np.log(length)
+
+    center_radius = max(8.0, 0.12 * image_h)
+    ratio, tol = config.crux_long_short_ratio, config.crux_ratio_tolerance
+    # short in [long / (ratio + tol), long / (ratio - tol)] is a band in log length.
+    log_lo = np.log(ratio + tol)
+    log_hi = np.log(max(ratio - tol, 1.0))
+    half_band = max(1e-6, 0.5 * (log_lo - log_hi))
+    k = center_radius / half_band
+    pairs = cKDTree(np.column_stack([mid, k * (log_len - 0.5 * (log_lo + log_hi))])).sparse_distance_matrix(
+        cKDTree(np.column_stack([mid, k * log_len])),
+        center_radius,
+        p=np.inf,  # box: midpoint square x ratio band; exact checks follow
+        output_type="ndarray",
+    )
+    if len(pairs) == 0:
+        return []
+    lp = pairs["i"].astype(np.intp)
+    sp = pairs["j"].astype(np.intp)
+
+    # Cheapest checks first, compressing the candidate arrays after each.
+    ratio_err = np.abs(length[lp] / length[sp] - ratio)
+    keep = ratio_err <= tol
+    lp, sp, ratio_err = lp[keep], sp[keep], ratio_err[keep]
+    center_dist = np.hypot(mid[lp, 0] - mid[sp, 0], mid[lp, 1] - mid[sp, 1])
+    keep = center_dist < center_radius
+    lp, sp, ratio_err, center_dist = lp[keep], sp[keep], ratio_err[keep], center_dist[keep]
+
+    a, b, c, d = pi[lp], pj[lp], pi[sp], pj[sp]
+    long_len, short_len = length[lp], length[sp]
+    keep = (a != c) & (a != d) & (b != c) & (b != d)
+    # The long axis must be the longest of the six pairs.
+    cross = np.maximum(np.maximum(dmat[a, c], dmat[a, d]), np.maximum(dmat[b, c], dmat[b, d]))
+    keep &= cross <= long_len
+    if not keep.any():
+        return []
+    a, b, c, d = a[keep], b[keep], c[keep], d[keep]
+    long_len, short_len = long_len[keep], short_len[keep]
+    ratio_err, center_dist = ratio_err[keep], center_dist[keep]
+
+    cos = (
+        (xy[b, 0] - xy[a, 0]) * (xy[d, 0] - xy[c, 0]) + (xy[b, 1] - xy[a, 1]) * (xy[d, 1] - xy[c, 1])
+    ) / (long_len * short_len)
+    angle = np.degrees(np.arccos(np.clip(cos, -1.0, 1.0)))
+    angle_score = np.maximum(0.0, 1.0 - np.abs(angle - 90.0) / 35.0)
+    ratio_score = np.maximum(0.0, 1.0 - ratio_err / max(1e-6, tol))
+    center_score = np.maximum(0.0, 1.0 - center_dist / center_radius)
+    brightness_score = np.minimum(1.0, (brightness[a] + brightness[b] + brightness[c] + brightness[d]) / (4.0 * 220.0))
+    score = 0.35 * ratio_score + 0.35 * angle_score + 0.20 * center_score + 0.10 * brightness_score
+
+    if top_k < len(score):
+        cut = np.partition(score, len(score) - top_k)[len(score) - top_k]
+        sel = np.flatnonzero(score >= cut)
+    else:
+        sel = np.arange(len(score))
+    members = np.sort(np.column_stack([a[sel], b[sel], c[sel], d[sel]]), axis=1)
+    sel = sel[np.lexsort(tuple(members.T[::-1]) + (-score[sel],))][:top_k]
+    return [
+        ((int(a[n]), int(b[n]), int(c[n]), int(d[n])), float(score[n]), float(long_len[n]), float(short_len[n]))
+        for n in sel
+    ]
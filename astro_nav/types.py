@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 
 @dataclass(frozen=True)
@@ -46,4 +46,10 @@ class ProcessingResult:
     south_scp: Optional[PoleEstimate] = None
     latitude: Optional[LatitudeEstimate] = None
     warnings: List[str] = field(default_factory=list)
+    # Result of the optional plate solver fed with `stars` (LatitudeEstimator(plate_solver=...)).
+    plate_solve: Optional[Any] = None
 
+    # Input path, set by the batch API (astro_nav.batch) so streamed results can be matched up.
+    source: Optional[str] = None
+    # hemisphere_mode="auto": confidence of the north and south solutions (0 when one failed).
+    hemisphere_scores: Optional[Dict[str, float]] = None
@@ -0,0 +1,148 @@
+import asyncio
+import multiprocessing as mp
+import os
+import signal
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from astro_nav import ProcessingConfig
+from astro_nav.aio import AsyncLatitudeEstimator
+from astro_nav.config import DetectionConfig
+from test_centroid_plate_solve import _render
+from test_plate_solver import _frame
+
+CONFIG = ProcessingConfig(detection=DetectionConfig(backend="contour"))
+
+
+class AsyncEstimatorTest(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(9)
+        cls.paths = []
+        for i, ra in enumerate((40.0, 200.0)):
+            stars, _ = _frame(rng, "north", ra, 70.0, 0.0, 60.0, distractors=20)
+            path = Path(cls.tmp.name) / f"sky{i}.png"
+            cv2.imwrite(str(path), _render(stars))
+            cls.paths.append(str(path))
+        cls.broken = str(Path(cls.tmp.name) / "broken.jpg")
+        Path(cls.broken).write_bytes(b"not an image")
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.tmp.cleanup()
+
+    async def asyncSetUp(self) -> None:
+        self.aio = AsyncLatitudeEstimator(CONFIG, max_concurrency=2)
+
+    async def asyncTearDown(self) -> None:
+        self.aio.close()
+
+    async def test_matches_sync_and_keeps_loop_responsive(self) -> None:
+        ticks = 0
+
+        async def ticker() -> None:
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        tick_task = asyncio.ensure_future(ticker())
+        result = await self.aio.process_file(self.paths[0], "north")
+        tick_task.cancel()
+        expected = self.aio.estimator.process_file(self.paths[0], "north")
+        self.assertEqual(result.success, expected.success)
+        self.assertEqual(len(result.stars), len(expected.stars))
+        self.assertGreater(ticks, 5)
+
+    async def test_unreadable_file_fails_softly(self) -> None:
+        result = await self.aio.process_file(self.broken, "north")
+        self.assertFalse(result.success)
+        self.assertIn("okunamadi", result.warnings[0])
+
+    async def test_timeout_and_cancellation(self) -> None:
+        with self.assertRaises(TimeoutError):
+            await self.aio.process_file(self.paths[0], "north", timeout=1e-4)
+        task = asyncio.ensure_future(self.aio.process_file(self.paths[1], "north"))
+        await asyncio.sleep(0)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        # Slots are released: the next request still runs.
+        result = await self.aio.process_file(self.paths[1], "north", timeout=30.0)
+        self.assertTrue(result.stars)
+
+    async def test_slot_is_held_until_abandoned_stage_finishes(self) -> None:
+        aio = AsyncLatitudeEstimator(CONFIG, max_concurrency=1)
+        self.addCleanup(aio.close)
+        gate = threading.Event()
+        decoded = []
+        decode, process = aio.estimator._decode, aio.estimator._process
+
+        def tracked_decode(path):
+            decoded.append(path)
+            return decode(path)
+
+        def gated_process(*args):
+            gate.wait(30)
+            return process(*args)
+
+        aio.estimator._decode = tracked_decode
+        aio.estimator._process = gated_process
+        with self.assertRaises(TimeoutError):
+            await aio.process_file(self.paths[0], "north", timeout=0.2)
+        follower = asyncio.ensure_future(aio.process_file(self.paths[1], "north", timeout=30.0))
+        await asyncio.sleep(0.2)
+        # The timed-out request's compute stage is still running and keeps the only slot.
+        self.assertEqual(decoded, [self.paths[0]])
+        gate.set()
+        result = await follower
+        self.assertEqual(decoded, self.paths)
+        self.assertTrue(result.stars)
+
+    async def test_stream_isolates_items_and_bounds_concurrency(self) -> None:
+        active = peak = 0
+        lock = threading.Lock()
+        decode = self.aio.estimator._decode
+
+        def slow_decode(path):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.05)
+            with lock:
+                active -= 1
+            return decode(path)
+
+        self.aio.estimator._decode = slow_decode
+        inputs = self.paths * 3 + [self.broken]
+        results = [r async for r in self.aio.stream(inputs, "north", ordered=True)]
+        self.assertEqual([r.source for r in results], inputs)
+        self.assertFalse(results[-1].success)
+        self.assertTrue(all(r.stars for r in results[:-1]))
+        self.assertLessEqual(peak, 2)
+
+        timed_out = [r async for r in self.aio.stream(self.paths, "north", timeout=1e-4)]
+        self.assertEqual(len(timed_out), 2)
+        self.assertTrue(all("Zaman asimi" in r.warnings[0] for r in timed_out))
+
+    async def test_dead_worker_process_is_replaced(self) -> None:
+        async with AsyncLatitudeEstimator(CONFIG, max_concurrency=2, processes=1) as aio:
+            self.assertTrue((await aio.process_file(self.paths[0], "north")).stars)
+            for child in mp.active_children():
+                os.kill(child.pid, signal.SIGKILL)
+                child.join()
+            results = [r async for r in aio.stream(self.paths, "north", ordered=True)]
+            self.assertTrue(all(r.stars for r in results), [r.warnings for r in results])
+            self.assertTrue((await aio.process_file(self.paths[1], "north")).stars)
+
+
+if __name__ == "__main__":
+    unittest.main()
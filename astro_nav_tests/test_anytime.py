@@ -0,0 +1,94 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from astro_nav.anytime import Deadline, anytime_search, pool_schedule, prior_order
+from astro_nav.config import NorthConfig, SouthConfig
+from astro_nav.north import NorthPoleFinder
+from astro_nav.south import SouthPoleFinder
+from astro_nav.types import DetectedStar
+
+
+def _stars(rng, n, w=4000, h=3000):
+    return [
+        DetectedStar(x=float(x), y=float(y), brightness=float(b), radius_px=2.0)
+        for x, y, b in zip(rng.uniform(0, w, n), rng.uniform(0, h, n), np.sort(rng.uniform(100, 255, n))[::-1])
+    ]
+
+
+class _Clock:
+    """Manually advanced clock (seconds) for deadline tests."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class AnytimeSearchTest(unittest.TestCase):
+    def test_pool_schedule(self) -> None:
+        self.assertEqual(pool_schedule(80, 12, 40), [12, 24, 80])
+        self.assertEqual(pool_schedule(10, 12, 40), [10])
+
+    def test_prior_order_prefers_bright_then_high(self) -> None:
+        low = DetectedStar(x=0.0, y=900.0, brightness=200.0, radius_px=1.0)
+        high = DetectedStar(x=0.0, y=100.0, brightness=200.0, radius_px=1.0)
+        faint = DetectedStar(x=0.0, y=0.0, brightness=60.0, radius_px=1.0)
+        self.assertEqual(prior_order([low, faint, high], 1000, 1000, vertical_weight=0.3), [high, low, faint])
+
+    def test_deadline_stops_between_stages(self) -> None:
+        stars = _stars(np.random.default_rng(0), 64)
+        clock = _Clock()
+        sizes = []
+
+        def solve(pool):
+            sizes.append(len(pool))
+            clock.now += 0.02
+            return len(pool)
+
+        # 20 ms for 8 stars leaves 10 ms; 16 stars are estimated at 80 ms and skipped.
+        best, truncated = anytime_search(solve, stars, [8, 16, 32, 64], Deadline(30.0, clock), rank=lambda r: r)
+        self.assertEqual((best, truncated), (8, True))
+        self.assertEqual(sizes, [8])
+
+        sizes.clear()
+        best, truncated = anytime_search(solve, stars, [8, 16], Deadline(None, clock), rank=lambda r: r)
+        self.assertEqual((best, truncated), (16, False))
+        self.assertEqual(sizes, [8, 16])
+
+    def test_south_deadline_truncates_large_pool(self) -> None:
+        stars = _stars(np.random.default_rng(3), 150)
+        finder = SouthPoleFinder(SouthConfig(bright_pool=150, deadline_ms=20.0, crux_ratio_tolerance=0.8, min_confidence=0.0))
+        clock = _Clock()
+        pools = []
+        solve = finder._solve
+
+        def timed_solve(pool, w, h):
+            # Every stage "takes" 15 ms on the stubbed clock.
+            pools.append(len(pool))
+            clock.now += 0.015
+            return solve(pool, w, h)
+
+        finder._solve = timed_solve
+        with mock.patch("astro_nav.anytime._now", clock):
+            result = finder.solve(stars, 4000, 3000)
+        self.assertIsNotNone(result)
+        self.assertTrue(result.truncated)
+        self.assertEqual(pools, [12])
+
+        relaxed = SouthPoleFinder(SouthConfig(bright_pool=40, deadline_ms=60_000.0, crux_ratio_tolerance=0.8, min_confidence=0.0))
+        self.assertFalse(relaxed.solve(stars, 4000, 3000).truncated)
+
+    def test_north_generous_deadline_searches_every_pool(self) -> None:
+        stars = _stars(np.random.default_rng(5), 40)
+        plain = NorthPoleFinder(NorthConfig(catalog_match=False)).solve(stars, 4000, 3000)
+        anytime = NorthPoleFinder(NorthConfig(catalog_match=False, deadline_ms=60_000.0)).solve(stars, 4000, 3000)
+        self.assertFalse(plain.truncated)
+        self.assertIsNotNone(anytime)
+        self.assertFalse(anytime.truncated)
+
+
+if __name__ == "__main__":
+    unittest.main()
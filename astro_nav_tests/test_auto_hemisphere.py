@@ -0,0 +1,105 @@
+import unittest
+
+import numpy as np
+
+from astro_nav import LatitudeEstimator
+from astro_nav.types import DetectedStar, LatitudeEstimate, PoleEstimate, ProcessingResult
+from test_centroid_plate_solve import _render
+from test_plate_solver import _frame
+
+
+def _heuristic(mode: str, confidence: float) -> ProcessingResult:
+    pole = PoleEstimate(x=0.0, y=0.0, altitude_deg=30.0, confidence=confidence, method="heuristic")
+    return ProcessingResult(
+        success=True,
+        hemisphere_mode=mode,
+        stars=[],
+        detected_patterns=[],
+        north_polaris=pole if mode == "north" else None,
+        south_scp=pole if mode == "south" else None,
+        latitude=LatitudeEstimate(latitude_deg=30.0, error_margin_deg=2.0, confidence=confidence),
+        warnings=[],
+    )
+
+
+# Crux + pointers layout of test_south_geometry.
+CRUX_FRAME = [
+    DetectedStar(x=420, y=180, brightness=240, radius_px=2.0),
+    DetectedStar(x=450, y=300, brightness=245, radius_px=2.3),
+    DetectedStar(x=395, y=245, brightness=210, radius_px=2.0),
+    DetectedStar(x=485, y=240, brightness=205, radius_px=2.0),
+    DetectedStar(x=560, y=230, brightness=250, radius_px=2.2),
+    DetectedStar(x=610, y=270, brightness=235, radius_px=2.1),
+    DetectedStar(x=300, y=120, brightness=160, radius_px=1.2),
+    DetectedStar(x=700, y=100, brightness=150, radius_px=1.1),
+    DetectedStar(x=760, y=310, brightness=140, radius_px=1.0),
+]
+
+
+class AutoHemisphereTest(unittest.TestCase):
+    def test_detects_once_and_prefers_catalog_pole(self) -> None:
+        rng = np.random.default_rng(3)
+        stars, _ = _frame(rng, "north", 60.0, 70.0, 15.0, 60.0, distractors=60)
+        image = _render(stars)
+        estimator = LatitudeEstimator()
+        calls = []
+        detect = estimator.detector.detect
+        estimator.detector.detect = lambda img: calls.append(1) or detect(img)
+
+        result = estimator.process_image(image, "auto")
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(result.success)
+        self.assertEqual(result.hemisphere_mode, "north")
+        self.assertEqual(result.north_polaris.method, "polaris_catalog")
+        self.assertIsNone(result.south_scp)
+        self.assertEqual(set(result.hemisphere_scores), {"north", "south"})
+        self.assertEqual(result.hemisphere_scores["north"], result.latitude.confidence)
+        self.assertAlmostEqual(result.latitude.latitude_deg, estimator.process_image(image, "north").latitude.latitude_deg)
+
+    def test_falls_back_to_the_solving_hemisphere(self) -> None:
+        estimator = LatitudeEstimator()
+        estimator._detect = lambda image, scale=1: list(CRUX_FRAME)
+        estimator.north_solver.solve = lambda stars, w, h: None
+        result = estimator.process_image(np.zeros((500, 900, 3), np.uint8), "auto")
+        self.assertTrue(result.success)
+        self.assertEqual(result.hemisphere_mode, "south")
+        self.assertLess(result.latitude.latitude_deg, 0.0)
+        self.assertEqual(result.hemisphere_scores["north"], 0.0)
+        self.assertGreater(result.hemisphere_scores["south"], 0.4)
+
+        estimator.south_solver.solve = lambda stars, w, h: None
+        failed = estimator.process_image(np.zeros((500, 900, 3), np.uint8), "auto")
+        self.assertFalse(failed.success)
+        self.assertEqual(failed.hemisphere_mode, "auto")
+        self.assertEqual(failed.hemisphere_scores, {"north": 0.0, "south": 0.0})
+        self.assertEqual(len(failed.warnings), 2)
+
+    def test_close_heuristic_confidences_are_flagged(self) -> None:
+        with LatitudeEstimator() as estimator:
+            confidences = {"north": 0.62, "south": 0.58}
+            estimator._solve_hemisphere = lambda stars, mode, w, h, day: _heuristic(mode, confidences[mode])
+            ambiguous = estimator._solve_auto(list(CRUX_FRAME), 900, 500, None)
+            self.assertEqual(ambiguous.hemisphere_mode, "north")
+            self.assertIn("Yarimkure belirsiz", ambiguous.warnings[-1])
+
+            confidences["south"] = 0.3
+            clear = estimator._solve_auto(list(CRUX_FRAME), 900, 500, None)
+            self.assertEqual(clear.warnings, [])
+
+    def test_close_stops_the_helper_thread(self) -> None:
+        estimator = LatitudeEstimator()
+        estimator._detect = lambda image, scale=1: list(CRUX_FRAME)
+        with estimator:
+            estimator.process_image(np.zeros((500, 900, 3), np.uint8), "auto")
+            pool = estimator._hemisphere_pool
+            self.assertIsNotNone(pool)
+        self.assertIsNone(estimator._hemisphere_pool)
+        with self.assertRaises(RuntimeError):
+            pool.submit(int)
+        # still usable afterwards, with a fresh helper
+        self.assertTrue(estimator.process_image(np.zeros((500, 900, 3), np.uint8), "auto").success)
+        estimator.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+from typing import List
+
+import cv2
+import numpy as np
+
+from astro_nav import LatitudeEstimator, ProcessingConfig
+from astro_nav.backends import available_backends, create_detector, register_backend
+from astro_nav.config import DetectionConfig
+from astro_nav.harness import run_harness
+from astro_nav.types import DetectedStar
+
+
+def _sky() -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(2)
+    img = rng.normal(15.0, 4.0, size=(600, 800)).clip(0, 255).astype(np.uint8)
+    truth = np.array([(60 + 90 * (i % 8), 60 + 120 * (i // 8)) for i in range(32)], dtype=np.float64)
+    for x, y in truth:
+        cv2.circle(img, (int(x), int(y)), 3, 255, thickness=-1)
+    return cv2.cvtColor(img, cv2.COLOR_GRAY2BGR), truth
+
+
+class BackendRegistryTest(unittest.TestCase):
+    def test_builtin_backends_share_contract(self) -> None:
+        image, truth = _sky()
+        self.assertTrue({"auto", "clahe", "pyramid", "contour"} <= set(available_backends()))
+        with self.assertRaises(ValueError):
+            create_detector("missing")
+
+        builtin = ["auto", "clahe", "pyramid", "contour"]
+        reports = run_harness([(image, truth)], builtin, DetectionConfig(top_star_limit=100), repeats=1)
+        self.assertEqual([r.backend for r in reports], builtin)
+        for report in reports:
+            self.assertEqual(report.recall, 1.0, report.backend)
+            self.assertEqual(report.precision, 1.0, report.backend)
+
+        for name in ("clahe", "contour"):
+            stars = create_detector(name, DetectionConfig(top_star_limit=10)).detect(image)
+            self.assertEqual(len(stars), 10)
+            self.assertTrue(all(isinstance(s, DetectedStar) for s in stars))
+            self.assertEqual([s.brightness for s in stars], sorted((s.brightness for s in stars), reverse=True))
+
+    def test_pipeline_selects_backend_by_name(self) -> None:
+        calls: List[tuple] = []
+
+        class Recorder:
+            def __init__(self, config: DetectionConfig) -> None:
+                self.config = config
+
+            def detect(self, image: np.ndarray) -> List[DetectedStar]:
+                calls.append(image.shape)
+                return []
+
+        register_backend("test-recorder", Recorder)
+        image, _ = _sky()
+        estimator = LatitudeEstimator(ProcessingConfig(detection=DetectionConfig(backend="test-recorder")))
+        result = estimator.process_image(image, "north")
+        self.assertFalse(result.success)
+        self.assertEqual(calls, [image.shape])
+
+
+if __name__ == "__main__":
+    unittest.main()
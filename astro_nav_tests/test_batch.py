@@ -0,0 +1,167 @@
+import errno
+import multiprocessing as mp
+import os
+import signal
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+import cv2
+import numpy as np
+
+from astro_nav import LatitudeEstimator, ProcessingConfig
+from astro_nav.config import DetectionConfig, PatternConfig
+from astro_nav.image_source import open_image_source
+from test_centroid_plate_solve import _render
+from test_plate_solver import _frame
+
+
+class BatchProcessingTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(8)
+        cls.paths = []
+        for i, ra in enumerate((20.0, 140.0, 260.0)):
+            stars, _ = _frame(rng, "north", ra, 70.0, 10.0 * i, 60.0, distractors=20)
+            path = Path(cls.tmp.name) / f"sky{i}.png"
+            cv2.imwrite(str(path), _render(stars))
+            cls.paths.append(str(path))
+        broken = Path(cls.tmp.name) / "broken.jpg"
+        broken.write_bytes(b"not an image")
+        cls.paths.insert(1, str(broken))
+        cls.estimator = LatitudeEstimator(ProcessingConfig(detection=DetectionConfig(backend="contour")))
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.tmp.cleanup()
+
+    def test_ordered_stream_matches_single_process(self) -> None:
+        results = list(self.estimator.process_many(self.paths, "north", workers=2, max_in_flight=2))
+        self.assertEqual([r.source for r in results], self.paths)
+        for path, result in zip(self.paths, results):
+            single = self.estimator.process_file(path, "north")
+            self.assertEqual(result.success, single.success)
+            self.assertEqual(len(result.stars), len(single.stars))
+            self.assertEqual(result.warnings, single.warnings)
+
+    def test_bad_item_is_isolated(self) -> None:
+        results = {r.source: r for r in self.estimator.process_many(self.paths, "north", workers=2, ordered=False)}
+        self.assertEqual(set(results), set(self.paths))
+        broken = results[self.paths[1]]
+        self.assertFalse(broken.success)
+        self.assertIn("okunamadi", broken.warnings[0])
+        self.assertTrue(all(results[p].stars for p in self.paths if p != self.paths[1]))
+
+    def test_input_is_consumed_with_backpressure(self) -> None:
+        pulled = []
+
+        def source():
+            for path in self.paths * 5:
+                pulled.append(path)
+                yield path
+
+        stream = self.estimator.process_many(source(), "north", workers=1, max_in_flight=3)
+        next(stream)
+        self.assertLessEqual(len(pulled), 4)
+        self.assertEqual(sum(1 for _ in stream), len(self.paths) * 5 - 1)
+
+    def _kill_fifo_readers(self, name: str, rounds: int = 2, delay: float = 0.0):
+        """
+        A worker reading a FIFO with no writer blocks; opening it for write returns exactly
+        then, and every worker is killed `delay` seconds later, `rounds` times.
+        """
+        fifo = Path(self.tmp.name) / name
+        os.mkfifo(fifo)
+        kills = []
+
+        def kill_readers() -> None:
+            for _ in range(rounds):
+                fd = os.open(fifo, os.O_WRONLY)
+                time.sleep(delay)
+                for child in mp.active_children():
+                    os.kill(child.pid, signal.SIGKILL)
+                    kills.append(child.pid)
+                os.close(fd)
+                # Wait until the dead reader's descriptor is gone before arming again.
+                while True:
+                    try:
+                        os.close(os.open(fifo, os.O_WRONLY | os.O_NONBLOCK))
+                    except OSError as exc:
+                        if exc.errno == errno.ENXIO:
+                            break
+                    time.sleep(0.01)
+
+        killer = threading.Thread(target=kill_readers, daemon=True)
+        killer.start()
+        return str(fifo), kills, killer
+
+    def test_crashed_worker_retries_in_flight_frames_once(self) -> None:
+        fifo, kills, killer = self._kill_fifo_readers("stall.png")
+        sky = [p for p in self.paths if p.endswith(".png")]
+        paths = [sky[0], fifo] + sky[1:]
+        results = list(self.estimator.process_many(paths, "north", workers=1, max_in_flight=4))
+        killer.join(60)
+        self.assertEqual(len(kills), 2)
+        self.assertEqual([r.source for r in results], paths)
+        self.assertIn("coktu", results[1].warnings[0])
+        self.assertTrue(all(r.stars for i, r in enumerate(results) if i != 1))
+
+    def test_worker_killed_between_inputs_is_replaced(self) -> None:
+        sky = [p for p in self.paths if p.endswith(".png")]
+
+        def source():
+            yield sky[0]
+            # The idle worker dies while the next input is pulled; the pool notices before submit.
+            for child in mp.active_children():
+                os.kill(child.pid, signal.SIGKILL)
+                child.join()
+            time.sleep(1.0)
+            yield from sky[1:]
+
+        results = list(self.estimator.process_many(source(), "north", workers=1, max_in_flight=1))
+        self.assertEqual([r.source for r in results], sky)
+        self.assertTrue(all(r.stars for r in results))
+
+    def test_finished_frames_survive_a_crash(self) -> None:
+        fifo, kills, killer = self._kill_fifo_readers("stall_after.png", delay=3.0)
+        sky = [p for p in self.paths if p.endswith(".png")]
+        paths = [fifo] + sky
+        submitted = []
+        submit = ProcessPoolExecutor.submit
+
+        def counting_submit(pool, fn, *args):
+            submitted.append(args[0])
+            return submit(pool, fn, *args)
+
+        # The second worker finishes the sky frames before the FIFO reader's pool breaks.
+        with mock.patch.object(ProcessPoolExecutor, "submit", counting_submit):
+            results = list(self.estimator.process_many(paths, "north", workers=2, max_in_flight=4))
+        killer.join(60)
+        self.assertFalse(killer.is_alive())  # the retry crashed too
+        self.assertEqual(sorted(submitted), sorted(paths + [fifo]))
+        self.assertIn("coktu", results[0].warnings[0])
+        self.assertTrue(all(r.stars for r in results[1:]))
+
+    def test_day_of_year_reaches_the_workers(self) -> None:
+        config = ProcessingConfig(detection=DetectionConfig(backend="contour"), patterns=PatternConfig(enabled=True))
+        estimator = LatitudeEstimator(config)
+        path = [p for p in self.paths if p.endswith(".png")][0]
+        (batched,) = estimator.process_many([path], "north", workers=1, day_of_year=200.0)
+        single = estimator.process_file(path, "north", 200.0)
+        self.assertEqual(batched.detected_patterns[0].name, single.detected_patterns[0].name)
+        self.assertNotEqual(
+            batched.detected_patterns[0].name, estimator.process_file(path, "north").detected_patterns[0].name
+        )
+
+    def test_only_paths_are_accepted(self) -> None:
+        with self.assertRaises(TypeError):
+            list(self.estimator.process_many([open_image_source(self.paths[0])], "north", workers=1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+from astro_nav.calibration import DarkCalibration
+from astro_nav.config import DetectionConfig
+from astro_nav.detection import StarDetector
+
+
+class DarkCalibrationTest(unittest.TestCase):
+    def test_hot_pixels_removed_before_detection(self) -> None:
+        rng = np.random.default_rng(3)
+        shape = (240, 320)
+        # Warm 2x2 clusters survive the 2x2 opening and the area filter like real stars.
+        hot = [(40, 50), (120, 200), (200, 30), (10, 300)]
+
+        def dark() -> np.ndarray:
+            frame = rng.normal(12.0, 3.0, size=shape).clip(0, 255).astype(np.uint8)
+            for y, x in hot:
+                frame[y : y + 2, x : x + 2] = 250
+            return frame
+
+        calibration = DarkCalibration.build([dark() for _ in range(8)])
+        flagged = {tuple(p) for p in calibration.hot_pixels.tolist()}
+        expected = {(y + dy, x + dx) for y, x in hot for dy in (0, 1) for dx in (0, 1)}
+        self.assertEqual(flagged, expected)
+
+        sky = dark()
+        stars = [(80, 100), (160, 260), (60, 220)]
+        for y, x in stars:
+            cv2.circle(sky, (x, y), 3, 255, thickness=-1)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            calibration.save(tmp)
+            loaded = DarkCalibration.load(tmp)
+            self.assertIsInstance(loaded.hot_pixels, np.memmap)
+            self.assertIsInstance(loaded.master_dark, np.memmap)
+
+            raw = StarDetector(DetectionConfig()).detect(sky)
+            calibrated = StarDetector(DetectionConfig(calibration_path=tmp)).detect(sky)
+
+        self.assertEqual(len(raw), len(stars) + len(hot))
+        found = sorted((round(s.y), round(s.x)) for s in calibrated)
+        self.assertEqual(found, sorted(stars))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from astro_nav import catalog
+from astro_nav.catalog import AsterismMatcher, gnomonic, load_catalog, quad_codes, unit_vectors
+from astro_nav.config import NorthConfig
+from astro_nav.north import NorthPoleFinder
+from astro_nav.types import DetectedStar
+
+W, H = 4000, 3000
+
+
+def _sky(rng, catalog, center_ra, center_dec, roll, vfov=60.0, distractors=60):
+    """Rectilinear camera: pixels are a rotated, scaled gnomonic projection about the axis."""
+    vectors = unit_vectors([s.ra_deg for s in catalog], [s.dec_deg for s in catalog])
+    tan = gnomonic(vectors, unit_vectors(center_ra, center_dec))
+    f = (H / 2.0) / np.tan(np.radians(vfov / 2.0))
+    # East is left and north is up when looking at the sky.
+    z = -f * (tan[:, 0] + 1j * tan[:, 1]) * np.exp(1j * roll) + complex(W / 2.0, H / 2.0)
+    inside = np.isfinite(z) & (z.real >= 0) & (z.real < W) & (z.imag >= 0) & (z.imag < H)
+    stars = [
+        DetectedStar(x=p.real + rng.normal(0, 0.5), y=p.imag + rng.normal(0, 0.5), brightness=255.0 - 20.0 * s.mag, radius_px=2.0)
+        for p, s, ok in zip(z, catalog, inside)
+        if ok
+    ]
+    stars += [
+        DetectedStar(x=float(x), y=float(y), brightness=float(b), radius_px=1.5)
+        for x, y, b in zip(rng.uniform(0, W, distractors), rng.uniform(0, H, distractors), rng.uniform(60, 170, distractors))
+    ]
+    stars.sort(key=lambda s: s.brightness, reverse=True)
+    polaris = z[[s.name for s in catalog].index("Polaris")]
+    return stars, (polaris.real, polaris.imag)
+
+
+class QuadCodeTest(unittest.TestCase):
+    def test_codes_invariant_to_similarity_and_order(self) -> None:
+        rng = np.random.default_rng(0)
+        quad = rng.uniform(0, 100, size=(1, 4, 2))
+        code, order = quad_codes(quad)
+        z = (quad[0, :, 0] + 1j * quad[0, :, 1]) * (2.5 * np.exp(0.7j)) + (30 - 12j)
+        perm = [2, 0, 3, 1]
+        moved = np.stack([z.real, z.imag], axis=-1)[perm][None]
+        code2, order2 = quad_codes(moved)
+        np.testing.assert_allclose(code2, code, atol=1e-12)
+        self.assertEqual([perm[i] for i in order2[0]], list(order[0]))
+
+
+class CatalogMatchTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.catalog = load_catalog(hemisphere="north")
+        cls.matcher = AsterismMatcher(cls.catalog)
+
+    def test_identifies_polaris_in_wide_and_narrow_fields(self) -> None:
+        rng = np.random.default_rng(3)
+        polaris = next(s for s in self.catalog if s.name == "Polaris")
+        # (center RA, center Dec, vertical FOV): wide view of the pole, Little Dipper only.
+        for ra, dec, vfov in ((40.0, 70.0, 60.0), (200.0, 75.0, 60.0), (230.0, 80.0, 25.0)):
+            stars, truth = _sky(rng, self.catalog, ra, dec, rng.uniform(0, 2 * np.pi), vfov)
+            xy = np.array([(s.x, s.y) for s in stars])
+            match = self.matcher.match(xy, W, H)
+            self.assertIsNotNone(match)
+            self.assertGreaterEqual(len(match.pairs), 5)
+            self.assertLess(match.residual_px, 2.0)
+            px = match.project(polaris.ra_deg, polaris.dec_deg)
+            self.assertLess(np.hypot(px[0] - truth[0], px[1] - truth[1]), 2.0)
+
+    def test_random_fields_do_not_match(self) -> None:
+        rng = np.random.default_rng(7)
+        for _ in range(20):
+            xy = np.column_stack([rng.uniform(0, W, 80), rng.uniform(0, H, 80)])
+            self.assertIsNone(self.matcher.match(xy, W, H))
+
+    def test_finder_prefers_catalog_solution(self) -> None:
+        rng = np.random.default_rng(11)
+        stars, truth = _sky(rng, self.catalog, 120.0, 72.0, 0.4)
+        solution = NorthPoleFinder(NorthConfig()).solve(stars, W, H)
+        self.assertEqual(solution.patterns[0].name, "little_dipper")
+        self.assertIsNotNone(solution.residual_px)
+        self.assertLess(np.hypot(solution.polaris_xy[0] - truth[0], solution.polaris_xy[1] - truth[1]), 2.0)
+        self.assertGreater(solution.confidence, 0.8)
+
+    def test_missing_default_catalog_falls_back_to_heuristic(self) -> None:
+        stars, _ = _sky(np.random.default_rng(5), self.catalog, 40.0, 80.0, 0.3)
+        catalog.hemisphere_matcher.cache_clear()
+        self.addCleanup(catalog.hemisphere_matcher.cache_clear)
+        with mock.patch.object(catalog, "DEFAULT_CATALOG_PATH", catalog.DEFAULT_CATALOG_PATH.with_name("missing.json")):
+            solution = NorthPoleFinder(NorthConfig()).solve(stars, W, H)
+            self.assertIsNotNone(solution)
+            self.assertIsNone(solution.residual_px)
+            self.assertIn("katalogu bulunamadi", solution.warnings[-1])
+            with self.assertRaises(FileNotFoundError):
+                NorthPoleFinder(NorthConfig(catalog_path="missing.json")).solve(stars, W, H)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+
+import numpy as np
+
+from astro_nav.centroid import refine_centroids
+
+
+def _render(points, shape=(120, 160), sigma=1.3, peak=200.0, noise=2.0):
+    rng = np.random.default_rng(11)
+    yy, xx = np.mgrid[0 : shape[0], 0 : shape[1]]
+    img = np.full(shape, 20.0)
+    for x, y in points:
+        img += peak * np.exp(-((xx - x) ** 2 + (yy - y) ** 2) / (2.0 * sigma * sigma))
+    img += rng.normal(0.0, noise, size=shape)
+    return np.clip(img, 0, 255).astype(np.uint8)
+
+
+class CentroidTest(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(5)
+        self.truth = np.column_stack([rng.uniform(10, 150, 12), rng.uniform(10, 110, 12)])
+        self.image = _render(self.truth)
+        # Crude integer-ish start, like a bounding-box midpoint.
+        self.start = np.floor(self.truth) + 0.5
+
+    def test_moments_and_gaussian_beat_crude_centers(self) -> None:
+        crude = np.hypot(*(self.start - self.truth).T).mean()
+        for method, limit in (("moments", 0.15), ("gaussian", 0.08)):
+            xs, ys = refine_centroids(self.image, self.start[:, 0], self.start[:, 1], radius=3, method=method)
+            err = np.hypot(xs - self.truth[:, 0], ys - self.truth[:, 1])
+            self.assertLess(err.max(), limit, method)
+            self.assertLess(err.mean(), crude)
+
+    def test_none_keeps_input(self) -> None:
+        xs, ys = refine_centroids(self.image, self.start[:, 0], self.start[:, 1], method="none")
+        np.testing.assert_array_equal(xs, self.start[:, 0])
+        np.testing.assert_array_equal(ys, self.start[:, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+import cv2
+import numpy as np
+
+from astro_nav import LatitudeEstimator, ProcessingConfig
+from astro_nav.config import DetectionConfig, SolverConfig
+from astro_nav.plate_solver import PolarPlateSolver
+from offline_plate_solver import CatalogPlateSolver
+from star_detection import find_star_blobs
+from test_plate_solver import H, W, _frame
+
+
+def _render(stars) -> np.ndarray:
+    img = np.zeros((H, W), np.uint8)
+    for s in stars:
+        cv2.circle(img, (int(round(s.x)), int(round(s.y))), 4 if s.brightness > 180 else 3, 255, -1)
+    return cv2.cvtColor(cv2.GaussianBlur(img, (7, 7), 1.5), cv2.COLOR_GRAY2BGR)
+
+
+class _Recording:
+    def __init__(self) -> None:
+        self.calls = []
+
+    def solve_centroids(self, centroids, image_size, fov_estimate_deg=None, fov_max_error_deg=None):
+        self.calls.append((centroids, image_size, fov_estimate_deg))
+        return "solved"
+
+
+class CentroidPlateSolveTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        rng = np.random.default_rng(4)
+        stars, cls.pole = _frame(rng, "north", 60.0, 75.0, 20.0, 60.0, distractors=30)
+        cls.image = _render(stars)
+        cls.hfov = 2.0 * np.degrees(np.arctan(np.tan(np.radians(30.0)) * W / H))
+
+    def test_pipeline_routes_detector_output_to_solver(self) -> None:
+        solver = _Recording()
+        cfg = ProcessingConfig(detection=DetectionConfig(backend="contour"), solver=SolverConfig(horizontal_fov_deg=75.0))
+        result = LatitudeEstimator(cfg, plate_solver=solver).process_image(self.image, "north")
+        self.assertEqual(result.plate_solve, "solved")
+        centroids, size, fov = solver.calls[0]
+        self.assertEqual(size, (H, W))
+        self.assertEqual(fov, 75.0)
+        expected = sorted(result.stars, key=lambda s: s.brightness, reverse=True)
+        np.testing.assert_allclose(centroids, [(s.x, s.y) for s in expected])
+
+    def test_pipeline_with_catalog_solver(self) -> None:
+        cfg = ProcessingConfig(solver=SolverConfig(horizontal_fov_deg=self.hfov))
+        result = LatitudeEstimator(cfg, plate_solver=PolarPlateSolver()).process_image(self.image, "north")
+        self.assertIsNotNone(result.plate_solve)
+        pole = result.plate_solve.pole_xy
+        self.assertLess(np.hypot(pole[0] - self.pole[0], pole[1] - self.pole[1]), 3.0)
+
+    def test_array_and_centroid_entry_points_agree(self) -> None:
+        solver = CatalogPlateSolver(hemisphere="north")
+        from_array = solver.solve_array(self.image, fov_estimate_deg=self.hfov)
+        self.assertTrue(from_array.success)
+        self.assertAlmostEqual(from_array.dec_deg, 75.0, delta=0.2)
+        blobs = sorted(find_star_blobs(cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY)), key=lambda b: -b[2])
+        from_centroids = solver.solve_centroids(np.array([b[:2] for b in blobs]), (H, W), fov_estimate_deg=self.hfov)
+        self.assertTrue(from_centroids.success)
+        self.assertAlmostEqual(from_centroids.roll_deg, from_array.roll_deg, delta=0.05)
+        failed = solver.solve_centroids(np.zeros((0, 2)), (H, W))
+        self.assertFalse(failed.success)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from itertools import combinations
+
+import numpy as np
+
+from astro_nav.config import SouthConfig
+from astro_nav.geometry import angle_between, dist, midpoint, sub
+from astro_nav.south import crux_quads
+from astro_nav.types import DetectedStar
+
+
+def _brute_force(stars, config, image_h):
+    # Per-quad scoring over all 4-combinations, as _find_best_crux used to do it, restricted to
+    # quads with a non-zero center score.
+    best = None
+    for combo in combinations(range(len(stars)), 4):
+        pts = [(stars[k].x, stars[k].y) for k in combo]
+        lengths = sorted(
+            [(dist(pts[i], pts[j]), i, j) for i, j in combinations(range(4), 2)], key=lambda t: t[0], reverse=True
+        )
+        long_len, a, b = lengths[0]
+        short_len, c, d = next((t for t in lengths[1:] if len({a, b, t[1], t[2]}) == 4))
+        if short_len <= 1e-6:
+            continue
+        ratio_err = abs(long_len / short_len - config.crux_long_short_ratio)
+        if ratio_err > config.crux_ratio_tolerance:
+            continue
+        angle = angle_between(sub(pts[b], pts[a]), sub(pts[d], pts[c]))
+        angle_score = max(0.0, 1.0 - abs(angle - 90.0) / 35.0)
+        center_dist = dist(midpoint(pts[a], pts[b]), midpoint(pts[c], pts[d]))
+        center_score = max(0.0, 1.0 - center_dist / max(8.0, 0.12 * image_h))
+        if center_score <= 0.0:
+            continue
+        ratio_score = max(0.0, 1.0 - ratio_err / config.crux_ratio_tolerance)
+        brightness_score = min(1.0, sum(stars[k].brightness for k in combo) / (4.0 * 220.0))
+        score = 0.35 * ratio_score + 0.35 * angle_score + 0.20 * center_score + 0.10 * brightness_score
+        if best is None or score > best[1]:
+            best = ((combo[a], combo[b], combo[c], combo[d]), score)
+    return best
+
+
+def _stars(rng, n, w=900, h=500):
+    return [
+        DetectedStar(x=float(x), y=float(y), brightness=float(b), radius_px=2.0)
+        for x, y, b in zip(rng.uniform(0, w, n), rng.uniform(0, h, n), np.sort(rng.uniform(100, 255, n))[::-1])
+    ]
+
+
+class CruxIndexTest(unittest.TestCase):
+    def test_matches_per_quad_search(self) -> None:
+        rng = np.random.default_rng(14)
+        config = SouthConfig()
+        for n in (6, 12, 25):
+            for _ in range(3):
+                stars = _stars(rng, n)
+                xy = np.array([(s.x, s.y) for s in stars])
+                found = crux_quads(xy, np.array([s.brightness for s in stars]), config, 500)
+                expected = _brute_force(stars, config, 500)
+                if expected is None:
+                    self.assertEqual(found, [])
+                    continue
+                found = found[0]
+                self.assertEqual(found[0], expected[0])
+                self.assertAlmostEqual(found[1], expected[1], places=9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import multiprocessing as mp
+import os
+import queue
+import signal
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import cv2
+import numpy as np
+
+from astro_nav.plate_solver import focal_tolerance
+import fov_sweep
+from fov_sweep import fov_bins, recall_fov, remember_fov, sweep_fov
+from test_centroid_plate_solve import _render
+from test_plate_solver import H, W, _frame
+
+TRUE_HFOV = 2.0 * np.degrees(np.arctan(np.tan(np.radians(30.0)) * W / H))
+
+
+class _LateQueue:
+    """The first `get` times out only after the worker has put its result and exited."""
+
+    def __init__(self, inner) -> None:
+        self.inner = inner
+        self.late = True
+
+    def put(self, item) -> None:
+        self.inner.put(item)
+
+    def get(self, timeout=None):
+        if self.late:
+            self.late = False
+            while mp.active_children():
+                time.sleep(0.01)
+            raise queue.Empty
+        return self.inner.get(timeout=timeout)
+
+    def get_nowait(self):
+        return self.inner.get_nowait()
+
+
+class FovSweepTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.tmp = tempfile.TemporaryDirectory()
+        stars, _ = _frame(np.random.default_rng(4), "north", 60.0, 75.0, 20.0, 60.0, distractors=30)
+        cls.sky = str(Path(cls.tmp.name) / "sky.png")
+        cv2.imwrite(cls.sky, _render(stars))
+        cls.blank = str(Path(cls.tmp.name) / "blank.png")
+        cv2.imwrite(cls.blank, np.zeros((H, W), np.uint8))
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.tmp.cleanup()
+
+    def test_bins_cover_range_and_follow_hint(self) -> None:
+        bins = fov_bins(10.0, 90.0, 4, overlap=0.0)
+        self.assertEqual([b.fov_estimate_deg for b in bins], [20.0, 40.0, 60.0, 80.0])
+        self.assertTrue(all(b.fov_max_error_deg == 10.0 for b in bins))
+        self.assertEqual(fov_bins(10.0, 90.0, 4, fov_hint_deg=65.0)[0].fov_estimate_deg, 60.0)
+
+    def test_focal_tolerance_brackets_fov_error(self) -> None:
+        tol = focal_tolerance(60.0, 5.0)
+        f = 1.0 / np.tan(np.radians(30.0))
+        self.assertAlmostEqual(tol, 1.0 / np.tan(np.radians(27.5)) / f - 1.0, places=9)
+        self.assertEqual(focal_tolerance(None, 5.0), 0.35)
+
+    def test_sweep_finds_fov_and_stops_early(self) -> None:
+        sweep = sweep_fov(self.sky, 20.0, 100.0, bins=8, workers=2, solver="catalog", fov_hint_deg=70.0)
+        self.assertTrue(sweep.success)
+        self.assertAlmostEqual(sweep.fov_deg, TRUE_HFOV, delta=0.3)
+        self.assertLessEqual(abs(sweep.winning_bin.fov_estimate_deg - TRUE_HFOV), sweep.winning_bin.fov_max_error_deg)
+        self.assertLess(sweep.bins_tried, sweep.bins_total)
+
+    def test_sweep_without_solution_tries_every_bin(self) -> None:
+        sweep = sweep_fov(self.blank, 20.0, 100.0, bins=4, workers=2, solver="catalog")
+        self.assertFalse(sweep.success)
+        self.assertEqual(sweep.bins_tried, 4)
+        self.assertIsNone(sweep.fov_deg)
+
+    def test_dead_workers_end_the_sweep(self) -> None:
+        # Workers block reading a FIFO with no writer and are killed from outside.
+        fifo = Path(self.tmp.name) / "stall.png"
+        os.mkfifo(fifo)
+
+        def kill_workers() -> None:
+            deadline = time.monotonic() + 30
+            while not mp.active_children() and time.monotonic() < deadline:
+                time.sleep(0.05)
+            time.sleep(1.0)
+            for child in mp.active_children():
+                os.kill(child.pid, signal.SIGKILL)
+
+        killer = threading.Thread(target=kill_workers)
+        killer.start()
+        sweep = sweep_fov(str(fifo), 20.0, 100.0, bins=4, workers=2, solver="catalog", timeout_s=120)
+        killer.join()
+        self.assertFalse(sweep.success)
+        self.assertEqual(sweep.bins_tried, 0)
+        self.assertIn("coktu", sweep.result.warnings[0])
+
+    def test_result_of_a_just_exited_worker_is_kept(self) -> None:
+        ctx = mp.get_context("spawn")
+        late = mock.Mock(wraps=ctx)
+        late.Queue = lambda: _LateQueue(ctx.Queue())
+        with mock.patch.object(fov_sweep.mp, "get_context", return_value=late):
+            sweep = sweep_fov(self.sky, 20.0, 100.0, bins=1, workers=1, solver="catalog", fov_hint_deg=70.0)
+        self.assertTrue(sweep.success)
+        self.assertEqual(sweep.bins_tried, 1)
+
+    def test_remembered_fov_round_trip(self) -> None:
+        store = Path(self.tmp.name) / "fov.json"
+        self.assertIsNone(recall_fov("Acme X1 f=4.20", store))
+        remember_fov("Acme X1 f=4.20", 71.234567, store)
+        remember_fov("Other", 40.0, store)
+        self.assertAlmostEqual(recall_fov("Acme X1 f=4.20", store), 71.2346)
+
+
+if __name__ == "__main__":
+    unittest.main()
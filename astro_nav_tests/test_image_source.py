@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from astro_nav import LatitudeEstimator
+from astro_nav.config import DetectionConfig
+from astro_nav.detection import StarDetector
+from astro_nav.image_source import FitsSource, ImageSource, TiffSource, open_image_source
+
+_STARS = [(60, 40), (250, 90), (130, 170), (300, 200)]
+
+
+def _sky16(shape: tuple[int, int] = (240, 320)) -> np.ndarray:
+    rng = np.random.default_rng(11)
+    img = rng.normal(900.0, 40.0, size=shape)
+    for x, y in _STARS:
+        cv2.circle(img, (x, y), 3, 40000.0, thickness=-1)
+    return img.clip(0, 65535).astype(np.uint16)
+
+
+def _write_fits(path: str, data: np.ndarray, axes: bool = True) -> None:
+    h, w = data.shape
+    cards = [
+        "SIMPLE  =                    T",
+        "BITPIX  =                   16",
+        "NAXIS   =                    2",
+        f"NAXIS1  = {w:>20d}",
+        f"NAXIS2  = {h:>20d}",
+        "BZERO   =                32768",
+        "BSCALE  =                    1",
+        "END",
+    ]
+    if not axes:
+        cards = [c for c in cards if not c.startswith("NAXIS") or c.startswith("NAXIS ")]
+    header = "".join(c.ljust(80) for c in cards).encode("ascii")
+    header += b" " * (-len(header) % 2880)
+    # Bottom-up rows, unsigned data stored as signed with BZERO.
+    raw = (data[::-1].astype(np.int32) - 32768).astype(">i2").tobytes()
+    with open(path, "wb") as f:
+        f.write(header + raw + b"\0" * (-len(raw) % 2880))
+
+
+class ImageSourceTest(unittest.TestCase):
+    def test_mapped_sources_feed_detector(self) -> None:
+        sky = _sky16()
+        with tempfile.TemporaryDirectory() as tmp:
+            fits_path = os.path.join(tmp, "sky.fits")
+            tiff_path = os.path.join(tmp, "sky.tif")
+            _write_fits(fits_path, sky)
+            Image.fromarray(sky).save(tiff_path)
+
+            fits = open_image_source(fits_path)
+            tiff = open_image_source(tiff_path)
+            self.assertIsInstance(fits, FitsSource)
+            self.assertIsInstance(tiff, TiffSource)
+            self.assertIsInstance(fits.gray().base, np.memmap)
+            self.assertIsInstance(tiff.gray().base, np.memmap)
+            np.testing.assert_array_equal(tiff.gray(), sky)
+            np.testing.assert_array_equal(fits.gray().astype(np.int32) + 32768, sky)
+
+            detector = StarDetector(DetectionConfig())
+            for source in (fits, tiff):
+                found = sorted((round(s.x), round(s.y)) for s in detector.detect(source.gray()))
+                self.assertEqual(found, sorted(_STARS))
+            del fits, tiff
+
+    def test_fits_without_axis_sizes_is_unreadable(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bad.fits")
+            _write_fits(path, _sky16(), axes=False)
+            with self.assertRaises(ValueError):
+                open_image_source(path)
+            result = LatitudeEstimator().process_file(path, "north")
+            self.assertFalse(result.success)
+            self.assertIn("okunamadi", result.warnings[0])
+
+    def test_base_source_is_abstract(self) -> None:
+        with self.assertRaises(TypeError):
+            ImageSource()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+import numpy as np
+
+from astro_nav.config import NorthConfig
+from astro_nav.geometry import dist, weighted_centroid
+from astro_nav.north import NorthPoleFinder
+from astro_nav.types import DetectedStar
+
+
+def _reference(finder, stars, image_h):
+    # Per-star scoring loop NorthPoleFinder.solve used before the array path.
+    top = stars[: finder.config.candidate_limit]
+    scored = []
+    for s in top:
+        vertical = max(0.0, min(1.0, 1.0 - s.y / max(1.0, float(image_h))))
+        bright = max(0.0, min(1.0, s.brightness / 255.0))
+        dists = sorted(dist((s.x, s.y), (o.x, o.y)) for o in top if o is not s)
+        neigh = dists[:4]
+        isolation = 0.0
+        if neigh:
+            isolation = max(0.0, min(1.0, sum(neigh) / len(neigh) / max(25.0, 0.08 * image_h)))
+        scored.append((s, 0.42 * vertical + 0.33 * bright + 0.25 * isolation))
+    scored.sort(key=lambda x: x[1], reverse=True)
+    top_scored = scored[:3]
+    centroid = weighted_centroid([((s.x, s.y), sc) for s, sc in top_scored])
+    conf = sum(sc for _, sc in top_scored) / len(top_scored)
+    if centroid is None or conf < finder.config.min_confidence:
+        return None
+    return centroid, conf, [(s.x, s.y) for s, _ in top_scored]
+
+
+def _stars(rng, n, w=4000, h=3000):
+    b = np.sort(rng.uniform(60, 255, n))[::-1]
+    return [
+        DetectedStar(x=float(x), y=float(y), brightness=float(v), radius_px=2.0)
+        for x, y, v in zip(rng.uniform(0, w, n), rng.uniform(0, h, n), b)
+    ]
+
+
+class NorthPoleFinderTest(unittest.TestCase):
+    def test_array_scoring_matches_per_star_loop(self) -> None:
+        rng = np.random.default_rng(12)
+        for n, limit in ((5, 25), (40, 25), (300, 300), (2500, 2500)):
+            finder = NorthPoleFinder(NorthConfig(catalog_match=False, candidate_limit=limit, min_confidence=0.0))
+            stars = _stars(rng, n)
+            sol = finder.solve(stars, 4000, 3000)
+            centroid, conf, points = _reference(finder, stars, 3000)
+            self.assertEqual(sol.patterns[0].points, points)
+            self.assertAlmostEqual(sol.confidence, conf, places=12)
+            np.testing.assert_allclose(sol.polaris_xy, centroid, rtol=0, atol=1e-9)
+
+    def test_ties_keep_candidate_order(self) -> None:
+        stars = [DetectedStar(x=100.0 * i, y=10.0, brightness=200.0, radius_px=2.0) for i in range(1, 7)]
+        stars += [DetectedStar(x=350.0, y=10.0, brightness=200.0, radius_px=2.0)]
+        finder = NorthPoleFinder(NorthConfig(catalog_match=False))
+        self.assertEqual(finder.solve(stars, 800, 600).patterns[0].points, _reference(finder, stars, 600)[2])
+
+    def test_too_few_candidates(self) -> None:
+        stars = _stars(np.random.default_rng(1), 4)
+        self.assertIsNone(NorthPoleFinder(NorthConfig()).solve(stars, 4000, 3000))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from astro_nav.catalog import DEFAULT_CATALOG_PATH
+from offline_plate_solver import CatalogPlateSolver, PlateSolveResult
+from plate_solve_cache import CachedPlateSolver, PlateSolveCache, file_digest
+
+
+class _CountingSolver:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def solve_image(self, image_path, fov_estimate_deg=None, fov_max_error_deg=None, extract_kwargs=None):
+        self.calls += 1
+        return PlateSolveResult(
+            success=True,
+            ra_deg=10.0,
+            dec_deg=80.0,
+            roll_deg=fov_estimate_deg,
+            fov_deg=70.0,
+            solve_time_ms=150.0,
+            warnings=[],
+            raw={"matched": np.arange(3), "prob": np.float64(1e-9)},
+        )
+
+
+class PlateSolveCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.images = []
+        for i in range(3):
+            path = self.dir / f"img{i}.png"
+            cv2.imwrite(str(path), np.full((8, 8), i, np.uint8))
+            self.images.append(str(path))
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_hits_misses_and_key_parameters(self) -> None:
+        solver = _CountingSolver()
+        with PlateSolveCache(self.dir / "cache.sqlite") as cache:
+            cached = CachedPlateSolver(solver, cache)
+            first = cached.solve_image(self.images[0], fov_estimate_deg=70.0, fov_max_error_deg=5.0)
+            again = cached.solve_image(self.images[0], fov_estimate_deg=70.0, fov_max_error_deg=5.0)
+            self.assertEqual(again.ra_deg, first.ra_deg)
+            self.assertEqual(again.raw["matched"], [0, 1, 2])
+            # every key component separates entries
+            cached.solve_image(self.images[0], fov_estimate_deg=60.0, fov_max_error_deg=5.0)
+            cached.solve_image(self.images[0], fov_estimate_deg=70.0, fov_max_error_deg=2.0)
+            cached.solve_image(self.images[0], fov_estimate_deg=70.0, fov_max_error_deg=5.0, extract_kwargs={"sigma": 3})
+            CachedPlateSolver(solver, cache, database_identity="other-db").solve_image(
+                self.images[0], fov_estimate_deg=70.0, fov_max_error_deg=5.0
+            )
+            self.assertEqual(solver.calls, 5)
+            self.assertEqual(cache.stats(), {"hits": 1, "misses": 5, "entries": 5})
+
+    def test_content_addressed_and_persistent(self) -> None:
+        solver = _CountingSolver()
+        with PlateSolveCache(self.dir / "cache.sqlite") as cache:
+            CachedPlateSolver(solver, cache).solve_image(self.images[1])
+        copy = self.dir / "copy.png"
+        copy.write_bytes(Path(self.images[1]).read_bytes())
+        with PlateSolveCache(self.dir / "cache.sqlite") as cache:
+            result = CachedPlateSolver(solver, cache).solve_image(str(copy))
+            self.assertTrue(result.success)
+            self.assertEqual(cache.hits, 1)
+        self.assertEqual(solver.calls, 1)
+
+    def test_lru_eviction(self) -> None:
+        solver = _CountingSolver()
+        with PlateSolveCache(self.dir / "cache.sqlite", max_entries=2) as cache:
+            cached = CachedPlateSolver(solver, cache)
+            cached.solve_image(self.images[0])
+            cached.solve_image(self.images[1])
+            cached.solve_image(self.images[0])  # refresh 0; 1 is now least recent
+            cached.solve_image(self.images[2])
+            self.assertEqual(len(cache), 2)
+            calls = solver.calls
+            cached.solve_image(self.images[0])
+            self.assertEqual(solver.calls, calls)
+            cached.solve_image(self.images[1])
+            self.assertEqual(solver.calls, calls + 1)
+
+    def test_lru_order_shared_between_instances(self) -> None:
+        solver = _CountingSolver()
+        path = self.dir / "cache.sqlite"
+        with PlateSolveCache(path, max_entries=2) as cache_a, PlateSolveCache(path, max_entries=2) as cache_b:
+            a, b = CachedPlateSolver(solver, cache_a), CachedPlateSolver(solver, cache_b)
+            a.solve_image(self.images[0])
+            a.solve_image(self.images[1])
+            a.solve_image(self.images[0])
+            b.solve_image(self.images[1])  # 1 is now most recent, despite b's own history
+            b.solve_image(self.images[2])  # evicts 0
+            calls = solver.calls
+            a.solve_image(self.images[1])
+            self.assertEqual(solver.calls, calls)
+            a.solve_image(self.images[0])
+            self.assertEqual(solver.calls, calls + 1)
+
+    def test_catalog_identity_follows_catalog_file(self) -> None:
+        with PlateSolveCache(self.dir / "cache.sqlite") as cache:
+            default = CachedPlateSolver(CatalogPlateSolver(hemisphere="north"), cache)
+            self.assertTrue(default.database_identity.endswith(file_digest(DEFAULT_CATALOG_PATH) + ":north"))
+
+            edited = self.dir / "catalog.json"
+            edited.write_text(json.dumps(json.loads(DEFAULT_CATALOG_PATH.read_text(encoding="utf-8")), indent=1))
+            other = CachedPlateSolver(CatalogPlateSolver(catalog_path=str(edited), hemisphere="north"), cache)
+            self.assertNotEqual(other.database_identity, default.database_identity)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+import numpy as np
+
+from astro_nav.catalog import gnomonic, load_catalog, unit_vectors
+from astro_nav.plate_solver import PolarPlateSolver
+from astro_nav.types import DetectedStar
+
+W, H = 4000, 3000
+
+
+def _frame(rng, hemisphere, center_ra, center_dec, roll_deg, vfov, distractors=50):
+    """Synthetic frame of one hemisphere's catalog; returns (stars, pole pixel)."""
+    catalog = load_catalog(hemisphere=hemisphere)
+    center = unit_vectors(center_ra, center_dec)
+    pole = np.array([[0.0, 0.0, 1.0 if hemisphere == "north" else -1.0]])
+    tan = gnomonic(np.vstack([unit_vectors([s.ra_deg for s in catalog], [s.dec_deg for s in catalog]), pole]), center)
+    f = (H / 2.0) / np.tan(np.radians(vfov / 2.0))
+    # East left, north up at roll 0; roll turns north towards +x.
+    z = -f * (tan[:, 0] + 1j * tan[:, 1]) * np.exp(1j * np.radians(roll_deg)) + complex(W / 2.0, H / 2.0)
+    stars = [
+        DetectedStar(x=p.real + rng.normal(0, 0.5), y=p.imag + rng.normal(0, 0.5), brightness=255.0 - 20.0 * s.mag, radius_px=2.0)
+        for p, s in zip(z[:-1], catalog)
+        if np.isfinite(p) and 0 <= p.real < W and 0 <= p.imag < H
+    ]
+    stars += [
+        DetectedStar(x=float(x), y=float(y), brightness=float(b), radius_px=1.5)
+        for x, y, b in zip(rng.uniform(0, W, distractors), rng.uniform(0, H, distractors), rng.uniform(60, 170, distractors))
+    ]
+    return stars, (z[-1].real, z[-1].imag)
+
+
+class PolarPlateSolverTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.solver = PolarPlateSolver()
+        cls.solver.warm_up()
+
+    def test_recovers_pole_roll_scale_and_hemisphere(self) -> None:
+        rng = np.random.default_rng(5)
+        cases = (("north", 40.0, 70.0, 60.0), ("north", 230.0, 80.0, 25.0), ("south", 190.0, -68.0, 60.0))
+        for hemisphere, ra, dec, vfov in cases:
+            roll = float(rng.uniform(0, 360))
+            stars, pole = _frame(rng, hemisphere, ra, dec, roll, vfov)
+            solution = self.solver.solve_stars(stars, W, H)
+            self.assertIsNotNone(solution, hemisphere)
+            self.assertEqual(solution.hemisphere, hemisphere)
+            self.assertLess(np.hypot(solution.pole_xy[0] - pole[0], solution.pole_xy[1] - pole[1]), 3.0)
+            self.assertLess(abs((solution.roll_deg - roll + 180.0) % 360.0 - 180.0), 0.5)
+            self.assertAlmostEqual(solution.vertical_fov_deg, vfov, delta=0.3)
+            self.assertAlmostEqual(solution.dec_deg, dec, delta=0.2)
+            self.assertLess(solution.residual_px, 2.0)
+
+    def test_random_field_has_no_solution(self) -> None:
+        rng = np.random.default_rng(9)
+        xy = np.column_stack([rng.uniform(0, W, 80), rng.uniform(0, H, 80)])
+        self.assertIsNone(self.solver.solve(xy, W, H))
+
+
+if __name__ == "__main__":
+    unittest.main()
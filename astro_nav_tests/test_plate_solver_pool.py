@@ -0,0 +1,105 @@
+import os
+import signal
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from plate_solver_pool import PlateSolverPool
+from test_plate_solver import H, W, _frame
+
+
+def _render(path: Path, stars) -> None:
+    img = np.zeros((H, W), np.uint8)
+    for s in stars:
+        cv2.circle(img, (int(round(s.x)), int(round(s.y))), 4 if s.brightness > 180 else 3, 255, -1)
+    cv2.imwrite(str(path), cv2.GaussianBlur(img, (7, 7), 1.5))
+
+
+class PlateSolverPoolTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(4)
+        cls.paths = []
+        for i, (ra, roll) in enumerate(((60.0, 20.0), (150.0, 200.0), (300.0, 95.0))):
+            stars, _ = _frame(rng, "north", ra, 75.0, roll, 60.0, distractors=30)
+            path = Path(cls.tmp.name) / f"sky{i}.png"
+            _render(path, stars)
+            cls.paths.append(path)
+        blank = Path(cls.tmp.name) / "blank.png"
+        cv2.imwrite(str(blank), np.zeros((H, W), np.uint8))
+        cls.blank = blank
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.tmp.cleanup()
+
+    def test_results_in_submission_order(self) -> None:
+        with PlateSolverPool(workers=2, solver="catalog") as pool:
+            self.assertTrue(pool.wait_ready(60))
+            self.assertEqual(pool.worker_errors, [])
+            self.assertEqual(len(pool.worker_pids), 2)
+            results = pool.map(self.paths + [self.blank] + self.paths)
+        self.assertEqual([r.success for r in results], [True, True, True, False, True, True, True])
+        for r in results[:3]:
+            self.assertAlmostEqual(r.dec_deg, 75.0, delta=0.2)
+        self.assertAlmostEqual(results[1].roll_deg, 200.0, delta=0.5)
+
+    def test_close_finishes_queued_work_and_rejects_new(self) -> None:
+        pool = PlateSolverPool(workers=1, solver="catalog")
+        futures = [pool.submit(p) for p in self.paths]
+        pool.close()
+        self.assertTrue(all(f.result().success for f in futures))
+        with self.assertRaises(RuntimeError):
+            pool.submit(self.paths[0])
+
+    def test_worker_init_failure_is_reported_per_request(self) -> None:
+        t0 = time.perf_counter()
+        with PlateSolverPool(workers=1, solver="catalog", database_path="/nonexistent/catalog.json") as pool:
+            pool.wait_ready(60)
+            self.assertEqual(len(pool.worker_errors), 1)
+            result = pool.solve(self.paths[0])
+        self.assertFalse(result.success)
+        self.assertIn("baslatilamadi", result.warnings[0])
+        self.assertLess(time.perf_counter() - t0, 60)
+
+    def _kill_worker_mid_request(self, pool: PlateSolverPool):
+        """
+        Reading a FIFO with no writer blocks the worker. Once ready, the worker is idle, so
+        submit hands it the request at once, and the worker is killed while holding it.
+        """
+        fifo = Path(self.tmp.name) / f"stall{len(os.listdir(self.tmp.name))}.png"
+        os.mkfifo(fifo)
+        self.assertTrue(pool.wait_ready(60))
+        future = pool.submit(fifo)
+        for pid in pool.worker_pids:
+            os.kill(pid, signal.SIGKILL)
+        return future
+
+    def test_dead_worker_fails_its_request_and_is_replaced(self) -> None:
+        with PlateSolverPool(workers=1, solver="catalog") as pool:
+            stalled = self._kill_worker_mid_request(pool)
+            after = pool.submit(self.paths[0])
+            stalled_result = stalled.result(timeout=60)
+            after_result = after.result(timeout=60)
+        self.assertFalse(stalled_result.success)
+        self.assertIn("coktu", stalled_result.warnings[0])
+        self.assertTrue(after_result.success)
+
+    def test_exhausted_restarts_break_pool_without_hanging_close(self) -> None:
+        pool = PlateSolverPool(workers=1, solver="catalog", max_restarts=0)
+        stalled = self._kill_worker_mid_request(pool)
+        queued = pool.submit(self.paths[0])
+        self.assertFalse(stalled.result(timeout=60).success)
+        self.assertIn("bozuk", queued.result(timeout=60).warnings[0])
+        with self.assertRaises(RuntimeError):
+            pool.submit(self.paths[1])
+        pool.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+from itertools import combinations
+
+import numpy as np
+
+from astro_nav.config import SouthConfig
+from astro_nav.geometry import dist, midpoint, point_line_distance
+from astro_nav.south import SouthPoleFinder
+from astro_nav.types import DetectedStar
+
+
+def _pointer_reference(config, stars, crux, initial_scp, image_h):
+    # Per-pair scoring with the tuple helpers, as _find_pointer_pair used to do it.
+    members = {id(crux.gacrux), id(crux.acrux), id(crux.side1), id(crux.side2)}
+    candidates = [s for s in stars if id(s) not in members][:20]
+    best = None
+    for s1, s2 in combinations(candidates, 2):
+        pair_dist = dist((s1.x, s1.y), (s2.x, s2.y))
+        if pair_dist < 0.04 * image_h or pair_dist > 0.45 * image_h:
+            continue
+        line_score = max(0.0, 1.0 - point_line_distance(initial_scp, (s1.x, s1.y), (s2.x, s2.y)) / max(10.0, 0.16 * image_h))
+        brightness = min(1.0, (s1.brightness + s2.brightness) / (2.0 * 240.0))
+        cross = point_line_distance(midpoint((crux.gacrux.x, crux.gacrux.y), (crux.acrux.x, crux.acrux.y)), (s1.x, s1.y), (s2.x, s2.y))
+        separation_score = min(1.0, cross / max(6.0, 0.05 * image_h))
+        score = 0.45 * line_score + 0.30 * brightness + 0.25 * separation_score
+        if best is None or score > best[2]:
+            best = (s1, s2, score)
+    if best is None or best[2] < config.min_pointer_score:
+        return None
+    return best
+
+
+def _stars(rng, n, w=1600, h=1000):
+    return [
+        DetectedStar(x=float(x), y=float(y), brightness=float(b), radius_px=2.0)
+        for x, y, b in zip(rng.uniform(0, w, n), rng.uniform(0, h, n), np.sort(rng.uniform(120, 255, n))[::-1])
+    ]
+
+
+class PointerPairTest(unittest.TestCase):
+    def test_all_hypotheses_match_per_pair_loop(self) -> None:
+        rng = np.random.default_rng(15)
+        config = SouthConfig(crux_ratio_tolerance=0.8)
+        finder = SouthPoleFinder(config)
+        checked = 0
+        for _ in range(6):
+            stars = _stars(rng, 40)
+            cruxes = finder._find_crux_hypotheses(stars, 1000, 8)
+            scps = [finder._initial_scp(c) for c in cruxes]
+            for crux, scp, got in zip(cruxes, scps, finder._pointer_pairs(stars, cruxes, scps, 1000)):
+                expected = _pointer_reference(config, stars, crux, scp, 1000)
+                if expected is None:
+                    self.assertIsNone(got)
+                    continue
+                self.assertIs(got[0], expected[0])
+                self.assertIs(got[1], expected[1])
+                self.assertAlmostEqual(got[2], expected[2], places=12)
+                checked += 1
+        self.assertGreater(checked, 10)
+
+    def test_joint_choice_is_best_combination(self) -> None:
+        rng = np.random.default_rng(16)
+        for _ in range(6):
+            stars = _stars(rng, 40)
+            config = SouthConfig(crux_ratio_tolerance=0.8, min_confidence=0.0, crux_hypotheses=6)
+            finder = SouthPoleFinder(config)
+            single = SouthPoleFinder(SouthConfig(crux_ratio_tolerance=0.8, min_confidence=0.0, crux_hypotheses=1))
+
+            best = None
+            for crux in finder._find_crux_hypotheses(stars[: config.bright_pool], 1000, config.crux_hypotheses):
+                if crux.score < config.min_crux_score:
+                    continue
+                scp = finder._initial_scp(crux)
+                pointers = _pointer_reference(config, stars, crux, scp, 1000)
+                if pointers is not None:
+                    conf = finder._combine(crux, scp, pointers, 1600, 1000)[1]
+                    best = conf if best is None else max(best, conf)
+
+            joint = finder.solve(stars, 1600, 1000)
+            first = single.solve(stars, 1600, 1000)
+            if best is None:
+                self.assertIsNone(joint)
+                continue
+            self.assertAlmostEqual(joint.confidence, best, places=12)
+            if first is not None:
+                self.assertGreaterEqual(joint.confidence, first.confidence)
+
+
+if __name__ == "__main__":
+    unittest.main()
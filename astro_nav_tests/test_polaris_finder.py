@@ -0,0 +1,50 @@
+import unittest
+
+import numpy as np
+
+from polaris_finder import (
+    calculate_brightness_score,
+    calculate_height_score,
+    calculate_isolation_score,
+    find_polaris,
+)
+
+
+def _reference(stars, shape, top, hemisphere):
+    # Per-star scoring with the scalar helpers, as find_polaris used to do it.
+    key = (lambda s: -s[2]) if hemisphere == "north" else (lambda s: s[2])
+    candidates = sorted(stars, key=key)[:top] if len(stars) > top else stars
+    weights = (0.4, 0.3, 0.3) if hemisphere == "north" else (0.35, 0.25, 0.40)
+    brightnesses = [s[2] for s in candidates]
+    best, best_score = None, -1
+    for star in candidates:
+        score = (
+            weights[0] * calculate_height_score(star[1], shape[0], hemisphere)
+            + weights[1] * calculate_brightness_score(star[2], brightnesses, hemisphere)
+            + weights[2] * calculate_isolation_score(star, candidates, shape[0], shape[1])
+        )
+        if score > best_score:
+            best, best_score = star, score
+    return best, best_score
+
+
+class FindPolarisTest(unittest.TestCase):
+    def test_vectorized_scoring_matches_scalar_helpers(self) -> None:
+        rng = np.random.default_rng(8)
+        shape = (3000, 4000)
+        for n, top in ((1, 50), (4, 50), (60, 50), (400, 300)):
+            stars = [
+                (float(x), float(y), float(b))
+                for x, y, b in zip(rng.uniform(0, 4000, n), rng.uniform(0, 3000, n), rng.uniform(90, 255, n))
+            ]
+            for hemisphere in ("north", "south"):
+                best, score, debug = find_polaris(stars, shape, top, hemisphere)
+                ref_best, ref_score = _reference(stars, shape, top, hemisphere)
+                self.assertEqual(best, ref_best)
+                self.assertAlmostEqual(score, ref_score, places=12)
+                self.assertEqual(debug["total_candidates"], min(n, top))
+                self.assertEqual(len(debug["scores"]), min(n, top))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+import cv2
+import numpy as np
+from scipy.spatial import cKDTree
+
+from astro_nav.config import DetectionConfig
+from astro_nav.detection import StarDetector
+
+
+class PyramidDetectionTest(unittest.TestCase):
+    def test_coarse_to_fine_matches_full_resolution(self) -> None:
+        rng = np.random.default_rng(21)
+        gray = rng.normal(18.0, 6.0, size=(900, 1200)).clip(0, 255).astype(np.uint8)
+        for x, y, r, v in zip(
+            rng.integers(4, 1196, 150),
+            rng.integers(4, 896, 150),
+            rng.integers(1, 5, 150),
+            rng.integers(150, 256, 150),
+        ):
+            cv2.circle(gray, (int(x), int(y)), int(r), int(v), thickness=-1)
+        img = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+
+        for factor in (4, 8):
+            detector = StarDetector(DetectionConfig(top_star_limit=1000, pyramid_downscale=factor))
+            full = detector.detect(img)
+            coarse = detector.detect_coarse_to_fine(img)
+            self.assertGreater(len(full), 100)
+            self.assertEqual(len(full), len(coarse))
+            for a, b in zip(full, coarse):
+                self.assertAlmostEqual(a.x, b.x, places=6)
+                self.assertAlmostEqual(a.y, b.y, places=6)
+                self.assertEqual(a.brightness, b.brightness)
+
+    def test_large_frame_recall_with_sampled_tables(self) -> None:
+        # 6000x4000: tiles of 750x500 px, so the CLAHE histogram is sampled (step 4) and the
+        # result is only approximately that of the full-resolution pass.
+        rng = np.random.default_rng(5)
+        h, w = 4000, 6000
+        gray = rng.normal(18.0, 6.0, size=(h, w)).clip(0, 255).astype(np.uint8)
+        gray = cv2.add(gray, np.broadcast_to(np.linspace(0, 60, w).astype(np.uint8), (h, w)))
+        for x, y, r, v in zip(
+            rng.integers(4, w - 4, 3000),
+            rng.integers(4, h - 4, 3000),
+            rng.integers(1, 4, 3000),
+            rng.integers(90, 256, 3000),
+        ):
+            cv2.circle(gray, (int(x), int(y)), int(r), int(v), thickness=-1)
+
+        detector = StarDetector(DetectionConfig(top_star_limit=100_000, pyramid_downscale=4))
+        full = np.array([(s.x, s.y) for s in detector.detect(gray)])
+        coarse = np.array([(s.x, s.y) for s in detector.detect_coarse_to_fine(gray)])
+        self.assertGreater(len(full), 1000)
+        recall = (cKDTree(coarse).query(full)[0] < 1.0).mean()
+        precision = (cKDTree(full).query(coarse)[0] < 1.0).mean()
+        self.assertGreaterEqual(recall, 0.99)
+        self.assertGreaterEqual(precision, 0.99)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import os
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+from astro_nav import LatitudeEstimator, ProcessingConfig
+from astro_nav.config import DetectionConfig
+from astro_nav.image_source import reduced_decode_scale
+
+
+class ReducedDecodeTest(unittest.TestCase):
+    def test_scale_follows_star_size_and_fov(self) -> None:
+        # 6000 px over 60 deg -> 0.6'/px, a 6' star is 10 px wide.
+        self.assertEqual(reduced_decode_scale(6000, 60.0, 6.0, 4.0), 2)
+        self.assertEqual(reduced_decode_scale(6000, 60.0, 6.0, 1.2), 8)
+        self.assertEqual(reduced_decode_scale(1500, 60.0, 6.0, 4.0), 1)
+
+    def test_reduced_jpeg_maps_back_to_full_resolution(self) -> None:
+        rng = np.random.default_rng(9)
+        h, w = 1200, 1600
+        img = rng.normal(15.0, 4.0, size=(h, w)).clip(0, 255).astype(np.uint8)
+        points = [(int(x), int(y)) for x, y in zip(rng.integers(40, w - 40, 12), rng.integers(40, h - 40, 12))]
+        for x, y in points:
+            cv2.circle(img, (x, y), 5, 255, thickness=-1)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sky.jpg")
+            cv2.imwrite(path, img, [cv2.IMWRITE_JPEG_QUALITY, 95])
+            # 1200 px over 60 deg -> 3'/px: a 36' star is 12 px, the 1/2 decode keeps it 6 px wide.
+            reduced_cfg = DetectionConfig(reduced_decode=True, expected_star_size_arcmin=36.0)
+            reduced = LatitudeEstimator(ProcessingConfig(detection=reduced_cfg)).process_file(path, "north")
+            full_cfg = DetectionConfig()
+            full = LatitudeEstimator(ProcessingConfig(detection=full_cfg)).process_file(path, "north")
+
+        self.assertEqual(len(full.stars), len(points))
+        self.assertEqual(len(reduced.stars), len(points))
+        for star in reduced.stars:
+            nearest = min(np.hypot(star.x - x, star.y - y) for x, y in points)
+            self.assertLess(nearest, 1.0)
+            self.assertGreater(star.radius_px, 3.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
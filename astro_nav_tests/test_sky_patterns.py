@@ -0,0 +1,115 @@
+import unittest
+from dataclasses import replace
+from datetime import datetime
+
+import numpy as np
+from scipy.optimize import least_squares
+
+from astro_nav import LatitudeEstimator, ProcessingConfig
+from astro_nav.catalog import _quad_combinations
+from astro_nav.config import PatternConfig
+from astro_nav.sky_patterns import (
+    SkyPatternMatcher,
+    day_of_year,
+    distance_hashes,
+    load_sky_patterns,
+    quad_distances,
+)
+from astro_nav.types import DetectedStar
+
+
+def _rendered(template, rng, noise=16):
+    """Field whose four brightest stars reproduce the template's first quad hash, plus fainter noise."""
+
+    def residual(p):
+        quad = np.vstack([[0.0, 0.0], [1.0, 0.0], p.reshape(2, 2)])
+        return distance_hashes(quad_distances(quad, np.array([[0, 1, 2, 3]])))[0] - template.quad_hashes[0]
+
+    fit = least_squares(residual, [0.3, 0.8, 0.9, 0.4])
+    quad = np.vstack([[0.0, 0.0], [1.0, 0.0], fit.x.reshape(2, 2)])
+    return np.vstack([quad * 900.0 + (1500.0, 1000.0), rng.uniform(0, 4000, size=(noise, 2))])
+
+
+class SkyPatternMatcherTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.templates = load_sky_patterns()
+        cls.matcher = SkyPatternMatcher(cls.templates)
+
+    def test_seasonal_prefilter(self) -> None:
+        self.assertEqual(len(self.templates), 24)
+        names = {self.templates[i].name for i in self.matcher.candidates("south", 15)}
+        self.assertIn("Crux_Jan", names)
+        self.assertNotIn("Crux_Jul", names)
+        self.assertTrue(all(self.templates[i].hemisphere == "south" for i in self.matcher.candidates("south", 15)))
+        self.assertEqual(len(self.matcher.candidates("north", None)), 12)
+        self.assertAlmostEqual(day_of_year(datetime(2026, 2, 1, 12)), 32.5)
+
+    def test_hashed_hits_equal_linear_scan(self) -> None:
+        rng = np.random.default_rng(1)
+        xy = rng.uniform(0, 1000, size=(12, 2))
+        # Only the first `max_quads` quads are hashed, as in the app.
+        observed = distance_hashes(quad_distances(xy, _quad_combinations(12))[: self.matcher.max_quads])
+        # One template carries an observed quad's hash (slightly perturbed), the others random ones.
+        base = self.templates[0]
+        own = replace(base, name="own", quad_hashes=(tuple(observed[17] + 0.01), (0.9, 0.9, 0.9, 0.9)))
+        other = replace(base, name="other", quad_hashes=tuple(tuple(h) for h in rng.uniform(0, 1, (2, 4))))
+        for template in (own, other):
+            matcher = SkyPatternMatcher([template])
+            match = matcher.match(xy, "north")
+            expected = 0.0
+            for h in template.quad_hashes:
+                err = np.abs(observed - np.asarray(h)).max(axis=1).min()
+                if err <= matcher.tolerance:
+                    expected += 1.0 - err / matcher.tolerance
+            self.assertAlmostEqual(match.geometric_score, expected / len(template.quad_hashes), places=9)
+        self.assertGreater(SkyPatternMatcher([own]).match(xy, "north").geometric_score, 0.3)
+
+    def test_match_respects_hemisphere_and_season(self) -> None:
+        rng = np.random.default_rng(2)
+        crux = next(t for t in self.templates if t.name == "Crux_Jul")
+        xy = _rendered(crux, rng)
+        match = self.matcher.match(xy, "south", day=200)
+        self.assertIn(match.name, {"Crux_Jun", "Crux_Jul", "Crux_Aug"})
+        self.assertLess(match.candidates, 12)
+        # Noise only ever reports an in-season template of the requested hemisphere.
+        in_season = {self.templates[i].name for i in self.matcher.candidates("south", 200)}
+        self.assertIn(self.matcher.match(rng.uniform(0, 4000, size=(30, 2)), "south", day=200).name, in_season)
+        self.assertIsNone(self.matcher.match(xy[:3], "south", day=200))
+
+    def test_random_fields_score_below_rendered_templates(self) -> None:
+        rng = np.random.default_rng(5)
+        for name in ("UrsaMinor_Apr", "Cassiopeia_Oct", "Crux_Jul"):
+            template = next(t for t in self.templates if t.name == name)
+            rendered = self.matcher.match(_rendered(template, rng), template.hemisphere, day=template.peak_day)
+            noise = [
+                self.matcher.match(rng.uniform(0, 4000, size=(30, 2)), template.hemisphere, day=template.peak_day)
+                for _ in range(20)
+            ]
+            self.assertGreater(rendered.geometric_score, 0.5)
+            self.assertLess(max(m.geometric_score for m in noise), 0.3)
+            self.assertGreater(rendered.confidence, max(m.confidence for m in noise) + 0.1)
+
+
+class PatternPriorPipelineTest(unittest.TestCase):
+    def test_prior_is_reported_and_can_gate_the_search(self) -> None:
+        rng = np.random.default_rng(3)
+        stars = [
+            DetectedStar(x=float(x), y=float(y), brightness=float(b), radius_px=2.0)
+            for x, y, b in zip(rng.uniform(0, 900, 25), rng.uniform(0, 600, 25), rng.uniform(100, 250, 25))
+        ]
+        estimator = LatitudeEstimator(ProcessingConfig(patterns=PatternConfig(enabled=True)))
+        estimator._detect = lambda image, scale=1: stars
+        image = np.zeros((600, 900, 3), np.uint8)
+        result = estimator.process_image(image, "north", day_of_year=100)
+        self.assertTrue(result.detected_patterns[0].name.startswith("sky_pattern:UrsaMinor_"))
+
+        gated = LatitudeEstimator(ProcessingConfig(patterns=PatternConfig(enabled=True, min_prior=1.01)))
+        gated._detect = lambda image, scale=1: stars
+        result = gated.process_image(image, "north", day_of_year=100)
+        self.assertFalse(result.success)
+        self.assertIn("kutup aramasi atlandi", result.warnings[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+import numpy as np
+
+from astro_nav.config import DetectionConfig, StackingConfig
+from astro_nav.stacking import FrameStacker
+
+
+def _render(stars: np.ndarray, shape: tuple[int, int], rng: np.random.Generator) -> np.ndarray:
+    h, w = shape
+    img = rng.normal(20.0, 8.0, size=(h, w)).astype(np.float32)
+    yy, xx = np.mgrid[0:h, 0:w]
+    for x, y, peak in stars:
+        x0, y0 = int(x), int(y)
+        ys, xs = slice(max(y0 - 6, 0), y0 + 7), slice(max(x0 - 6, 0), x0 + 7)
+        img[ys, xs] += peak * np.exp(-((xx[ys, xs] - x) ** 2 + (yy[ys, xs] - y) ** 2) / 5.0)
+    return img.clip(0, 255).astype(np.uint8)
+
+
+class FrameStackerTest(unittest.TestCase):
+    def test_recovers_burst_drift_and_lifts_faint_star(self) -> None:
+        rng = np.random.default_rng(5)
+        shape = (480, 640)
+        bright = np.column_stack(
+            [rng.uniform(30, 610, 30), rng.uniform(30, 450, 30), rng.uniform(200, 235, 30)]
+        )
+        faint = np.array([[320.0, 240.0, 14.0]])
+        sky = np.vstack([bright, faint])
+
+        stacker = FrameStacker(StackingConfig(), DetectionConfig(min_threshold=150))
+        center = np.array([320.0, 240.0])
+        expected = []
+        for k in range(12):
+            angle = np.deg2rad(0.15 * k)
+            shift = np.array([2.3 * k, -1.7 * k])
+            rot = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+            moved = sky.copy()
+            moved[:, :2] = (sky[:, :2] - center) @ rot.T + center + shift
+            expected.append((rot, shift))
+            self.assertIsNotNone(stacker.add(_render(moved, shape, rng)))
+
+        self.assertEqual(stacker.frame_count, 12)
+        self.assertEqual(stacker.rejected, 0)
+        for transform, (rot, shift) in zip(stacker.transforms, expected):
+            # frame -> reference is the inverse of the simulated motion.
+            probe = (center + np.array([150.0, 100.0]) - center) @ rot.T + center + shift
+            mapped = transform[:, :2] @ probe + transform[:, 2]
+            np.testing.assert_allclose(mapped, [470.0, 340.0], atol=0.3)
+
+        stacked = stacker.result().astype(np.float64)
+        background = stacked[200:220, 100:120]
+        signal = stacked[238:243, 318:323].max() - np.median(background)
+        self.assertGreater(signal / background.std(), 4.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+import cv2
+import numpy as np
+
+from star_detection import blob_brightness, get_star_brightness, label_contours
+
+
+def _full_mask_brightness(img, cnt):
+    mask = np.zeros(img.shape[:2], dtype=np.uint8)
+    cv2.drawContours(mask, [cnt], -1, 255, -1)
+    pixels = img[mask == 255]
+    return float(0.6 * np.max(pixels) + 0.4 * np.mean(pixels))
+
+
+class BlobBrightnessTest(unittest.TestCase):
+    def test_matches_full_image_contour_masks(self) -> None:
+        rng = np.random.default_rng(3)
+        img = rng.integers(0, 256, size=(240, 320), dtype=np.uint8)
+        thresh = np.where(cv2.GaussianBlur(img, (5, 5), 0) > 140, 255, 0).astype(np.uint8)
+        # A ring with a star inside it: RETR_EXTERNAL treats both as one filled region.
+        cv2.circle(thresh, (160, 120), 12, 255, thickness=2)
+        cv2.circle(thresh, (160, 120), 2, 255, thickness=-1)
+
+        contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        labels = label_contours(img.shape, contours)
+        brightness = blob_brightness(img, labels, len(contours))
+
+        self.assertGreater(len(contours), 20)
+        for label, cnt in enumerate(contours, start=1):
+            x, y, w, h = cv2.boundingRect(cnt)
+            expected = _full_mask_brightness(img, cnt)
+            self.assertAlmostEqual(brightness[label], expected, places=6)
+            self.assertAlmostEqual(get_star_brightness(img, cnt, x, y, w, h), expected, places=6)
+
+
+if __name__ == "__main__":
+    unittest.main()
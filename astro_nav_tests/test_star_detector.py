@@ -1,4 +1,5 @@
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
 import cv2
 import numpy as np
@@ -18,6 +19,28 @@ class StarDetectorTest(unittest.TestCase):
         stars = detector.detect(img)
         self.assertGreaterEqual(len(stars), 4)
 
+    def test_workspace_reused_and_thread_local(self) -> None:
+        rng = np.random.default_rng(4)
+        frames = []
+        for _ in range(6):
+            img = rng.integers(0, 30, size=(300, 400, 3), dtype=np.uint8)
+            for x, y in zip(rng.integers(5, 395, 25), rng.integers(5, 295, 25)):
+                cv2.circle(img, (int(x), int(y)), 2, (255, 255, 255), thickness=-1)
+            frames.append(img)
+
+        detector = StarDetector(DetectionConfig(min_threshold=120))
+        expected = [StarDetector(DetectionConfig(min_threshold=120)).detect(f) for f in frames]
+        detector.detect(frames[0])
+        enhanced = detector.workspace.buffer("enhanced", (300, 400))
+        self.assertEqual(detector.detect(frames[1]), expected[1])
+        self.assertIs(detector.workspace.buffer("enhanced", (300, 400)), enhanced)
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            results = list(pool.map(detector.detect, frames * 3))
+            workspaces = set(pool.map(lambda _: id(detector.workspace), range(12)))
+        self.assertEqual(results, expected * 3)
+        self.assertNotIn(id(detector.workspace), workspaces)
+
 
 if __name__ == "__main__":
     unittest.main()
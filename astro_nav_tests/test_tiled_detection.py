@@ -0,0 +1,35 @@
+import unittest
+from dataclasses import replace
+
+import cv2
+import numpy as np
+
+from astro_nav.config import DetectionConfig
+from astro_nav.detection import StarDetector
+
+
+class TiledDetectionTest(unittest.TestCase):
+    def test_tiled_matches_single_pass(self) -> None:
+        rng = np.random.default_rng(7)
+        img = rng.integers(0, 40, size=(700, 900, 3), dtype=np.uint8)
+        points = [(int(x), int(y)) for x, y in zip(rng.integers(5, 895, 120), rng.integers(5, 695, 120))]
+        # Stars straddling the 256 px seams.
+        points += [(256, 100), (255, 256), (512, 511), (768, 300), (300, 512)]
+        for i, (x, y) in enumerate(points):
+            cv2.circle(img, (x, y), 1 + i % 4, (255, 255, 255), thickness=-1)
+
+        base = DetectionConfig(min_threshold=120, top_star_limit=1000)
+        single = StarDetector(base).detect(img)
+        tiled = StarDetector(replace(base, tile_size_px=256, tile_workers=4)).detect(img)
+
+        self.assertGreater(len(single), 80)
+        self.assertEqual(len(single), len(tiled))
+        for a, b in zip(single, tiled):
+            self.assertAlmostEqual(a.x, b.x, places=6)
+            self.assertAlmostEqual(a.y, b.y, places=6)
+            self.assertEqual(a.brightness, b.brightness)
+            self.assertEqual(a.radius_px, b.radius_px)
+
+
+if __name__ == "__main__":
+    unittest.main()
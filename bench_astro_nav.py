@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+astro_nav performans olcumleri.
+
+Ornek:
+    python bench_astro_nav.py tiled --width 8000 --height 6000
+    python bench_astro_nav.py backends --frames 3
+    python bench_astro_nav.py north --candidates 500
+    python bench_astro_nav.py crux --pool 25 50 100 150
+    python bench_astro_nav.py plate-solve --frames 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+import tracemalloc
+from dataclasses import replace
+
+import cv2
+import numpy as np
+
+from astro_nav.backends import available_backends
+from astro_nav.catalog import gnomonic, load_catalog, unit_vectors
+from astro_nav.config import DetectionConfig, NorthConfig, SouthConfig
+from astro_nav.detection import StarDetector
+from astro_nav.geometry import dist
+from astro_nav.harness import run_harness
+from astro_nav.north import NorthPoleFinder
+from astro_nav.plate_solver import PolarPlateSolver
+from astro_nav.south import SouthPoleFinder
+from astro_nav.types import DetectedStar
+
+
+def synthetic_sky(width: int, height: int, star_count: int, seed: int = 0) -> np.ndarray:
+    return synthetic_sky_with_truth(width, height, star_count, seed)[0]
+
+
+def synthetic_sky_with_truth(width: int, height: int, star_count: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """BGR kare ve yildiz merkezleri (N, 2) x, y."""
+    rng = np.random.default_rng(seed)
+    img = rng.normal(18.0, 6.0, size=(height, width)).clip(0, 255).astype(np.uint8)
+    xs = rng.integers(4, width - 4, star_count)
+    ys = rng.integers(4, height - 4, star_count)
+    radii = rng.integers(1, 5, star_count)
+    levels = rng.integers(150, 256, star_count)
+    for x, y, r, v in zip(xs, ys, radii, levels):
+        cv2.circle(img, (int(x), int(y)), int(r), int(v), thickness=-1)
+    return cv2.cvtColor(img, cv2.COLOR_GRAY2BGR), np.column_stack([xs, ys]).astype(np.float64)
+
+
+def _load_cases(paths: list[str]) -> list[tuple[np.ndarray, np.ndarray]]:
+    # Her goruntunun yaninda `<goruntu>.stars.csv` (satir basina "x,y") beklenir.
+    cases = []
+    for path in paths:
+        image = cv2.imread(path, cv2.IMREAD_COLOR)
+        if image is None:
+            raise SystemExit(f"Fotograf okunamadi: {path}")
+        truth = np.loadtxt(path + ".stars.csv", delimiter=",", ndmin=2)
+        cases.append((image, truth))
+    return cases
+
+
+def _best_time(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _same_stars(a, b, tol: float = 1e-6) -> bool:
+    if len(a) != len(b):
+        return False
+    return all(
+        abs(p.x - q.x) <= tol and abs(p.y - q.y) <= tol and p.brightness == q.brightness for p, q in zip(a, b)
+    )
+
+
+def bench_tiled(args: argparse.Namespace) -> None:
+    image = synthetic_sky(args.width, args.height, args.stars)
+    base = DetectionConfig(top_star_limit=args.stars)
+    single = StarDetector(base)
+    reference = single.detect(image)
+    t_single = _best_time(lambda: single.detect(image), args.repeats)
+
+    print(f"Goruntu: {args.width}x{args.height} ({args.width * args.height / 1e6:.1f} MP), yildiz: {len(reference)}")
+    print(f"{'mod':>12s} {'is parcacigi':>13s} {'sure (ms)':>10s} {'hizlanma':>9s} {'esit':>5s}")
+    print(f"{'tek-gecis':>12s} {1:>13d} {t_single * 1000:>10.1f} {1.0:>9.2f} {'-':>5s}")
+
+    cores = os.cpu_count() or 1
+    workers = sorted({w for w in (1, 2, 4, 8, 16, 32, cores) if w <= cores})
+    for n in workers:
+        detector = StarDetector(replace(base, tile_size_px=args.tile, tile_workers=n))
+        same = _same_stars(detector.detect(image), reference)
+        t = _best_time(lambda: detector.detect(image), args.repeats)
+        print(f"{'tiled':>12s} {n:>13d} {t * 1000:>10.1f} {t_single / t:>9.2f} {str(same):>5s}")
+
+
+def bench_pyramid(args: argparse.Namespace) -> None:
+    image = synthetic_sky(args.width, args.height, args.stars)
+    detector = StarDetector(DetectionConfig(top_star_limit=args.stars, pyramid_downscale=args.factor))
+    rows = []
+    for name, fn in (("tek-gecis", detector.detect), ("piramit", detector.detect_coarse_to_fine)):
+        fn(image)
+        tracemalloc.start()
+        stars = fn(image)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        rows.append((name, _best_time(lambda: fn(image), args.repeats), peak, stars))
+
+    print(f"Goruntu: {args.width}x{args.height} ({args.width * args.height / 1e6:.1f} MP), kucultme: 1/{args.factor}")
+    print(f"{'mod':>10s} {'sure (ms)':>10s} {'tepe bellek (MB)':>17s} {'yildiz':>7s} {'esit':>5s}")
+    reference = rows[0][3]
+    for name, t, peak, stars in rows:
+        print(f"{name:>10s} {t * 1000:>10.1f} {peak / 2**20:>17.1f} {len(stars):>7d} {str(_same_stars(stars, reference)):>5s}")
+
+
+def bench_backends(args: argparse.Namespace) -> None:
+    if args.images:
+        cases = _load_cases(args.images)
+    else:
+        cases = [synthetic_sky_with_truth(args.width, args.height, args.stars, seed=i) for i in range(args.frames)]
+    config = DetectionConfig(top_star_limit=args.top)
+    reports = run_harness(cases, args.backend or None, config, args.radius, args.repeats)
+
+    truth = reports[0].truth if reports else 0
+    print(f"{len(cases)} kare, {truth} gercek yildiz, eslesme yaricapi {args.radius:.1f} px")
+    print(f"{'dedektor':>10s} {'sure (ms)':>10s} {'tepe bellek (MB)':>17s} {'recall':>7s} {'precision':>10s} {'tespit':>7s}")
+    for r in reports:
+        print(
+            f"{r.backend:>10s} {r.latency_ms:>10.1f} {r.peak_memory_mb:>17.1f} {r.recall:>7.3f} "
+            f"{r.precision:>10.3f} {r.detected:>7d}"
+        )
+
+
+def _north_loop_scores(stars: list[DetectedStar], image_h: int) -> list[float]:
+    # Onceki yildiz basina dongu (karsilastirma icin)
+    scores = []
+    for s in stars:
+        vertical = max(0.0, min(1.0, 1.0 - s.y / max(1.0, float(image_h))))
+        bright = max(0.0, min(1.0, s.brightness / 255.0))
+        neigh = sorted(dist((s.x, s.y), (o.x, o.y)) for o in stars if o is not s)[:4]
+        isolation = max(0.0, min(1.0, sum(neigh) / len(neigh) / max(25.0, 0.08 * image_h))) if neigh else 0.0
+        scores.append(0.42 * vertical + 0.33 * bright + 0.25 * isolation)
+    return sorted(scores, reverse=True)[:3]
+
+
+def bench_north(args: argparse.Namespace) -> None:
+    rng = np.random.default_rng(0)
+    w, h = 4000, 3000
+    brightness = np.sort(rng.uniform(60, 255, args.candidates))[::-1]
+    stars = [
+        DetectedStar(x=float(x), y=float(y), brightness=float(b), radius_px=2.0)
+        for x, y, b in zip(rng.uniform(0, w, args.candidates), rng.uniform(0, h, args.candidates), brightness)
+    ]
+    finder = NorthPoleFinder(NorthConfig(catalog_match=False, candidate_limit=args.candidates))
+    t_loop = _best_time(lambda: _north_loop_scores(stars, h), 1)
+    t_array = _best_time(lambda: finder.solve(stars, w, h), args.repeats)
+    print(f"{args.candidates} aday")
+    print(f"{'mod':>10s} {'sure (ms)':>10s} {'hizlanma':>9s}")
+    print(f"{'dongu':>10s} {t_loop * 1000:>10.2f} {1.0:>9.2f}")
+    print(f"{'dizi':>10s} {t_array * 1000:>10.2f} {t_loop / t_array:>9.2f}")
+
+
+def bench_crux(args: argparse.Namespace) -> None:
+    w, h = 4000, 3000
+    print(f"{'havuz':>6s} {'sure (ms)':>10s}")
+    for pool in args.pool:
+        rng = np.random.default_rng(2)
+        brightness = np.sort(rng.uniform(100, 255, pool))[::-1]
+        stars = [
+            DetectedStar(x=float(x), y=float(y), brightness=float(b), radius_px=2.0)
+            for x, y, b in zip(rng.uniform(0, w, pool), rng.uniform(0, h, pool), brightness)
+        ]
+        finder = SouthPoleFinder(SouthConfig(bright_pool=pool))
+        t = _best_time(lambda: finder.solve(stars, w, h), args.repeats)
+        print(f"{pool:>6d} {t * 1000:>10.2f}")
+
+
+def _polar_frame(rng: np.random.Generator, w: int, h: int, vfov: float, distractors: int) -> np.ndarray:
+    """Kuzey kutup katalogunun rastgele yonelimli gnomonik izdusumu + rastgele yildizlar (x, y)."""
+    catalog = load_catalog(hemisphere="north")
+    center = unit_vectors(rng.uniform(0, 360), rng.uniform(65, 85))
+    tan = gnomonic(unit_vectors([s.ra_deg for s in catalog], [s.dec_deg for s in catalog]), center)
+    f = (h / 2.0) / np.tan(np.radians(vfov / 2.0))
+    z = -f * (tan[:, 0] + 1j * tan[:, 1]) * np.exp(1j * rng.uniform(0, 2 * np.pi)) + complex(w / 2.0, h / 2.0)
+    z = z[np.isfinite(z) & (z.real >= 0) & (z.real < w) & (z.imag >= 0) & (z.imag < h)]
+    noise = np.column_stack([rng.uniform(0, w, distractors), rng.uniform(0, h, distractors)])
+    return np.vstack([np.column_stack([z.real, z.imag]), noise])
+
+
+def bench_plate_solve(args: argparse.Namespace) -> None:
+    w, h = 4000, 3000
+    solver = PolarPlateSolver()
+    solver.warm_up()
+    rng = np.random.default_rng(0)
+    frames = [_polar_frame(rng, w, h, args.vfov, args.distractors) for _ in range(args.frames)]
+    print(f"{'kare':>5s} {'sure (ms)':>10s} {'cozum':>6s}")
+    for i, xy in enumerate(frames):
+        t = _best_time(lambda: solver.solve(xy, w, h, hemisphere="north", vertical_fov_deg=args.vfov), args.repeats)
+        solution = solver.solve(xy, w, h, hemisphere="north", vertical_fov_deg=args.vfov)
+        print(f"{i:>5d} {t * 1000:>10.2f} {'evet' if solution is not None else 'hayir':>6s}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="astro_nav benchmarklari")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    tiled = sub.add_parser("tiled", help="Tek gecis vs tile-paralel StarDetector")
+    tiled.add_argument("--width", type=int, default=8000)
+    tiled.add_argument("--height", type=int, default=6000)
+    tiled.add_argument("--stars", type=int, default=2000)
+    tiled.add_argument("--tile", type=int, default=1024)
+    tiled.add_argument("--repeats", type=int, default=3)
+    tiled.set_defaults(func=bench_tiled)
+
+    pyramid = sub.add_parser("pyramid", help="Tek gecis vs kaba-ince piramit tespiti")
+    pyramid.add_argument("--width", type=int, default=8000)
+    pyramid.add_argument("--height", type=int, default=6000)
+    pyramid.add_argument("--stars", type=int, default=300)
+    pyramid.add_argument("--factor", type=int, default=4)
+    pyramid.add_argument("--repeats", type=int, default=3)
+    pyramid.set_defaults(func=bench_pyramid)
+
+    backends = sub.add_parser("backends", help="Kayitli tum dedektorler: sure, bellek, recall")
+    backends.add_argument("--backend", action="append", choices=available_backends(), help="Sadece bu dedektor(ler)")
+    backends.add_argument("--images", nargs="+", help="Gercek goruntuler (yaninda <goruntu>.stars.csv)")
+    backends.add_argument("--width", type=int, default=4000)
+    backends.add_argument("--height", type=int, default=3000)
+    backends.add_argument("--stars", type=int, default=300)
+    backends.add_argument("--frames", type=int, default=3)
+    backends.add_argument("--top", type=int, default=1000, help="top_star_limit")
+    backends.add_argument("--radius", type=float, default=2.0, help="Eslesme yaricapi (px)")
+    backends.add_argument("--repeats", type=int, default=3)
+    backends.set_defaults(func=bench_backends)
+
+    north = sub.add_parser("north", help="NorthPoleFinder: yildiz basina dongu vs dizi skorlama")
+    north.add_argument("--candidates", type=int, default=500)
+    north.add_argument("--repeats", type=int, default=5)
+    north.set_defaults(func=bench_north)
+
+    crux = sub.add_parser("crux", help="SouthPoleFinder: parlak yildiz havuzu boyutuna gore Crux aramasi")
+    crux.add_argument("--pool", type=int, nargs="+", default=[25, 50, 100, 150])
+    crux.add_argument("--repeats", type=int, default=3)
+    crux.set_defaults(func=bench_crux)
+
+    plate = sub.add_parser("plate-solve", help="PolarPlateSolver: sentetik kutup karelerinde cozum suresi")
+    plate.add_argument("--frames", type=int, default=5)
+    plate.add_argument("--vfov", type=float, default=60.0)
+    plate.add_argument("--distractors", type=int, default=50)
+    plate.add_argument("--repeats", type=int, default=3)
+    plate.set_defaults(func=bench_plate_solve)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
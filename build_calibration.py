@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lens kapali (dark) karelerden cihaz kalibrasyonu uretir.
+
+Ornek:
+    python build_calibration.py --out calib/pixel7 darks/*.jpg
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from astro_nav.calibration import DarkCalibration
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Hot-pixel haritasi ve master dark olustur")
+    parser.add_argument("frames", nargs="+", help="Ayni ISO/pozlama ile cekilmis dark kareler")
+    parser.add_argument("--out", required=True, help="Kalibrasyon klasoru")
+    parser.add_argument("--hot-sigma", type=float, default=6.0, help="Hot pixel esigi (robust sigma)")
+    parser.add_argument("--min-excess", type=float, default=24.0, help="Medyan ustu minimum gri seviye farki")
+    parser.add_argument("--no-dark", action="store_true", help="Master dark kaydetme, sadece hot-pixel haritasi")
+    args = parser.parse_args()
+
+    calibration = DarkCalibration.build(
+        args.frames,
+        hot_sigma=args.hot_sigma,
+        min_excess=args.min_excess,
+        keep_dark=not args.no_dark,
+    )
+    calibration.save(args.out)
+    h, w = calibration.shape
+    print(f"{len(args.frames)} kare, {w}x{h}: {len(calibration.hot_pixels)} hot pixel -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -107,3 +107,28 @@ def read_datetime_from_exif(image_path):
         return dt, offset
     except Exception:
         return None, None
+
+
+def read_camera_from_exif(image_path):
+    """
+    Kamera anahtari: "Marka Model f=odak_mm". Ayni kamera ve odak uzakligindaki kareler
+    ayni FOV'a sahiptir (FOV taramasi sonucunu tekrar kullanmak icin). EXIF yoksa None.
+    """
+    try:
+        img = Image.open(image_path)
+        exif_data = img._getexif()
+        if exif_data is None:
+            return None
+
+        make = str(exif_data.get(271, '')).strip(' \x00')
+        model = str(exif_data.get(272, '')).strip(' \x00')
+        if not make and not model:
+            return None
+        key = f"{make} {model}".strip()
+        focal = exif_data.get(37386)
+        if focal is not None:
+            focal = focal[0] / focal[1] if isinstance(focal, tuple) else float(focal)
+            key += f" f={focal:.2f}"
+        return key
+    except Exception:
+        return None
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import json
+import multiprocessing as mp
+import queue
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from offline_plate_solver import PlateSolveResult
+from plate_solver_pool import SOLVERS, create_solver, failed_result
+
+DEFAULT_FOV_STORE = Path.home() / ".cache" / "kutupp" / "camera_fov.json"
+
+# Sonuc kuyrugu bu aralikla yoklanir; bosken worker'larin yasayip yasamadigina bakilir.
+_POLL_S = 0.2
+
+
+@dataclass(frozen=True)
+class FovBin:
+    fov_estimate_deg: float
+    fov_max_error_deg: float
+
+
+@dataclass
+class FovSweepResult:
+    success: bool
+    # Cozumun olctugu FOV (yoksa kazanan aralik merkezi); sonraki kareler icin --hfov
+    fov_deg: Optional[float]
+    result: Optional[PlateSolveResult]
+    winning_bin: Optional[FovBin]
+    bins_tried: int
+    bins_total: int
+    elapsed_ms: float
+
+
+def fov_bins(
+    fov_min_deg: float,
+    fov_max_deg: float,
+    bins: int,
+    fov_hint_deg: Optional[float] = None,
+    overlap: float = 0.1,
+) -> List[FovBin]:
+    """
+    [fov_min, fov_max] araligini `bins` esit parcaya boler; her parca kendi merkezi ve yari
+    genisligi (+ `overlap` pay) ile tetra3'e `fov_estimate` / `fov_max_error` olur. Ipucu
+    verilirse aralik merkezleri ipucuna yakinliga gore siralanir.
+    """
+    if bins < 1 or fov_max_deg <= fov_min_deg:
+        raise ValueError("Gecersiz FOV araligi")
+    width = (fov_max_deg - fov_min_deg) / bins
+    out = [
+        FovBin(fov_min_deg + (i + 0.5) * width, 0.5 * width * (1.0 + overlap))
+        for i in range(bins)
+    ]
+    if fov_hint_deg is not None:
+        out.sort(key=lambda b: abs(b.fov_estimate_deg - fov_hint_deg))
+    return out
+
+
+def is_confident(result: PlateSolveResult, max_false_probability: float = 1e-5, min_confidence: float = 0.5) -> bool:
+    """Basarili ve guvenilir cozum: tetra3 `Prob` (yanlis eslesme olasiligi) veya katalog guveni."""
+    if not result.success:
+        return False
+    raw = result.raw or {}
+    prob = raw.get("Prob")
+    if prob is not None and float(prob) > max_false_probability:
+        return False
+    confidence = raw.get("confidence")
+    return confidence is None or float(confidence) >= min_confidence
+
+
+def _sweep_worker(
+    worker_id: int, solver: str, database_path: Optional[str], image_path: str, bins, extract_kwargs, results
+) -> None:
+    """Worker: cozucuyu bir kez kurar, kendine dusen FOV araliklarini sirayla dener."""
+    try:
+        instance = create_solver(solver, database_path)
+    except Exception as exc:
+        results.put(("error", worker_id, failed_result(f"Cozucu baslatilamadi: {exc}")))
+        return
+    for fov_bin in bins:
+        try:
+            result = instance.solve_image(
+                image_path,
+                fov_estimate_deg=fov_bin.fov_estimate_deg,
+                fov_max_error_deg=fov_bin.fov_max_error_deg,
+                extract_kwargs=extract_kwargs,
+            )
+        except Exception as exc:
+            result = failed_result(f"Plate solve hatasi: {exc}")
+        results.put(("result", worker_id, (fov_bin, result)))
+
+
+def sweep_fov(
+    image_path: str,
+    fov_min_deg: float = 10.0,
+    fov_max_deg: float = 100.0,
+    bins: int = 8,
+    workers: int = 4,
+    solver: str = "tetra3",
+    database_path: Optional[str] = None,
+    fov_hint_deg: Optional[float] = None,
+    extract_kwargs: Optional[Dict[str, Any]] = None,
+    max_false_probability: float = 1e-5,
+    min_confidence: float = 0.5,
+    timeout_s: Optional[float] = None,
+    start_method: str = "spawn",
+) -> FovSweepResult:
+    """
+    FOV bilinmiyorsa araligi `bins` parcaya bolup `workers` surecte paralel cozer. Ilk guvenilir
+    cozum geldiginde kalan worker'lar sonlandirilir (baslamamis araliklar hic denenmez).
+    Beklenmedik sekilde olen worker'in kalan araliklari kayip sayilir; tarama asili kalmaz.
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"Bilinmeyen cozucu: {solver}")
+    t0 = time.perf_counter()
+    plan = fov_bins(fov_min_deg, fov_max_deg, bins, fov_hint_deg)
+    workers = max(1, min(workers, len(plan)))
+    ctx = mp.get_context(start_method)
+    results = ctx.Queue()
+    # Araliklar worker'lara sirayla dagitilir: once her worker'in ilk araligi calisir.
+    processes = [
+        ctx.Process(
+            target=_sweep_worker,
+            args=(i, solver, database_path, str(image_path), plan[i::workers], extract_kwargs, results),
+            daemon=True,
+        )
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    tried = 0
+    expected = len(plan)
+    # Worker basina sonucu henuz gelmemis aralik sayisi.
+    remaining = [len(plan[i::workers]) for i in range(workers)]
+    winner: Optional[tuple[FovBin, PlateSolveResult]] = None
+    last_failure: Optional[PlateSolveResult] = None
+    deadline = None if timeout_s is None else time.monotonic() + timeout_s
+
+    def handle(kind: str, worker_id: int, payload: Any) -> None:
+        nonlocal tried, expected, winner, last_failure
+        if not remaining[worker_id]:
+            return  # coktugu varsayilan worker'dan gec gelen mesaj
+        if kind == "error":
+            # Bu worker'in araliklari hic denenmeyecek.
+            expected -= remaining[worker_id]
+            remaining[worker_id] = 0
+            last_failure = payload
+            return
+        remaining[worker_id] -= 1
+        fov_bin, result = payload
+        tried += 1
+        if is_confident(result, max_false_probability, min_confidence):
+            winner = (fov_bin, result)
+        else:
+            last_failure = result
+
+    try:
+        while winner is None and tried < expected:
+            wait = _POLL_S if deadline is None else min(_POLL_S, max(0.0, deadline - time.monotonic()))
+            try:
+                handle(*results.get(timeout=wait))
+                continue
+            except queue.Empty:
+                pass
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            dead = [i for i, process in enumerate(processes) if remaining[i] and process.exitcode is not None]
+            if not dead:
+                continue
+            # Worker son sonucunu yazip bekleme bittikten sonra cikmis olabilir: once kuyrugu bosalt.
+            while winner is None:
+                try:
+                    handle(*results.get_nowait())
+                except queue.Empty:
+                    break
+            # Hala sonucu eksik olan olu worker'in kalan araliklari hic gelmeyecek.
+            for i in dead:
+                if remaining[i]:
+                    expected -= remaining[i]
+                    remaining[i] = 0
+                    last_failure = failed_result(f"Tarama sureci coktu (cikis kodu {processes[i].exitcode})")
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+
+    elapsed = (time.perf_counter() - t0) * 1000.0
+    if winner is None:
+        return FovSweepResult(
+            success=False,
+            fov_deg=None,
+            result=last_failure,
+            winning_bin=None,
+            bins_tried=tried,
+            bins_total=len(plan),
+            elapsed_ms=elapsed,
+        )
+    fov_bin, result = winner
+    return FovSweepResult(
+        success=True,
+        fov_deg=result.fov_deg if result.fov_deg is not None else fov_bin.fov_estimate_deg,
+        result=result,
+        winning_bin=fov_bin,
+        bins_tried=tried,
+        bins_total=len(plan),
+        elapsed_ms=elapsed,
+    )
+
+
+def remember_fov(camera_key: str, fov_deg: float, store_path: str | Path | None = None) -> None:
+    """Bulunan FOV'u kamera anahtariyla (EXIF marka/model/odak) JSON dosyasina yazar."""
+    path = Path(store_path) if store_path is not None else DEFAULT_FOV_STORE
+    data = _read_store(path)
+    data[camera_key] = round(float(fov_deg), 4)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def recall_fov(camera_key: str, store_path: str | Path | None = None) -> Optional[float]:
+    path = Path(store_path) if store_path is not None else DEFAULT_FOV_STORE
+    value = _read_store(path).get(camera_key)
+    return None if value is None else float(value)
+
+
+def _read_store(path: Path) -> Dict[str, float]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
@@ -7,12 +7,21 @@ from datetime import timezone
 from pathlib import Path
 
 from star_detection import detect_stars
+from astro_nav.backends import available_backends
 from polaris_finder import find_polaris
 from latitude_solver import calculate_latitude_with_error_bounds
 from compass import CompassSensor
 from map_viewer import WorldMap, calculate_longitude_from_time
-from exif_reader import read_azimuth_from_exif, read_gps_location_from_exif, read_datetime_from_exif
-from offline_plate_solver import OfflinePlateSolver
+from exif_reader import (
+    read_azimuth_from_exif,
+    read_camera_from_exif,
+    read_datetime_from_exif,
+    read_gps_location_from_exif,
+)
+from fov_sweep import recall_fov, remember_fov, sweep_fov
+from offline_plate_solver import CatalogPlateSolver, OfflinePlateSolver
+from plate_solve_cache import DEFAULT_CACHE_PATH, CachedPlateSolver, PlateSolveCache
+from plate_solver_pool import failed_result
 from time_utils import gmst_degrees, parse_iso_utc, parse_tz_offset, wrap_longitude_deg
 
 
@@ -127,6 +136,24 @@ def main():
                         help='EXIF zamaninda timezone yoksa offset. Ornek: +03:00')
     parser.add_argument('--db', type=str, default=None,
                         help='tetra3 veritabani yolu (opsiyonel)')
+    parser.add_argument('--solver', type=str, default='tetra3', choices=['tetra3', 'catalog'],
+                        help='Offline cozucu: tetra3 veya paketli kutup katalogu (NumPy, veritabani gerektirmez)')
+    parser.add_argument('--fov-sweep', action='store_true',
+                        help='FOV bilinmiyorsa araligi paralel tara; ilk guvenilir cozumde dur')
+    parser.add_argument('--fov-min', type=float, default=10.0,
+                        help='FOV taramasi alt siniri (derece, yatay)')
+    parser.add_argument('--fov-max', type=float, default=100.0,
+                        help='FOV taramasi ust siniri (derece, yatay)')
+    parser.add_argument('--sweep-bins', type=int, default=8,
+                        help='FOV taramasindaki aralik sayisi')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='FOV taramasi icin worker surec sayisi')
+    parser.add_argument('--cache', type=str, nargs='?', const=str(DEFAULT_CACHE_PATH), default=None,
+                        help='Offline cozum sonuclarini SQLite onbellekte tut (yol opsiyonel)')
+    parser.add_argument('--detector', type=str, default='contour', choices=available_backends(),
+                        help='Yildiz dedektoru (astro_nav.backends). Default: contour')
+    parser.add_argument('--reduced-decode', action='store_true',
+                        help="JPEG'i kucultulmus olcekte hizli oku (soluk 1-3 px yildizlar kaybolabilir)")
 
     args = parser.parse_args()
 
@@ -144,13 +171,51 @@ def main():
 
     if args.offline:
         print("🌌 Offline plate solve modu aktif")
-        hfov = args.hfov if args.hfov is not None else vertical_fov
-        solver = OfflinePlateSolver(database_path=args.db)
-        result = solver.solve_image(
-            image_path,
-            fov_estimate_deg=hfov,
-            fov_max_error_deg=args.fov_error,
-        )
+        camera = read_camera_from_exif(image_path)
+        hfov = args.hfov
+        if hfov is None and camera and not args.fov_sweep:
+            hfov = recall_fov(camera)
+            if hfov is not None:
+                print(f"📐 Kayitli FOV kullaniliyor ({camera}): {hfov:.2f}°")
+        if hfov is None:
+            hfov = vertical_fov
+
+        if args.fov_sweep:
+            print(f"🔎 FOV taramasi: {args.fov_min}°-{args.fov_max}°, {args.sweep_bins} aralik, {args.workers} worker")
+            sweep = sweep_fov(
+                image_path,
+                fov_min_deg=args.fov_min,
+                fov_max_deg=args.fov_max,
+                bins=args.sweep_bins,
+                workers=args.workers,
+                solver=args.solver,
+                # --db yalnizca tetra3 veritabanidir; katalog cozucusu paketli katalogu kullanir.
+                database_path=args.db if args.solver == 'tetra3' else None,
+            )
+            print(f"   {sweep.bins_tried}/{sweep.bins_total} aralik denendi ({sweep.elapsed_ms:.0f} ms)")
+            if sweep.success:
+                print(f"   ✓ Bulunan FOV: {sweep.fov_deg:.2f}° — sonraki kareler icin: --hfov {sweep.fov_deg:.2f} --fov-error 1")
+                if camera:
+                    remember_fov(camera, sweep.fov_deg)
+                    print(f"   FOV kaydedildi: {camera}")
+            result = sweep.result or failed_result("FOV taramasinda cozum bulunamadi.")
+        else:
+            if args.solver == 'catalog':
+                solver = CatalogPlateSolver()
+            else:
+                solver = OfflinePlateSolver(database_path=args.db)
+            cache = None
+            if args.cache:
+                cache = PlateSolveCache(args.cache)
+                solver = CachedPlateSolver(solver, cache)
+            result = solver.solve_image(
+                image_path,
+                fov_estimate_deg=hfov,
+                fov_max_error_deg=args.fov_error,
+            )
+            if cache is not None:
+                stats = cache.stats()
+                print(f"Onbellek: {stats['hits']} isabet, {stats['misses']} iska, {stats['entries']} kayit")
 
         if not result.success:
             print("❌ Plate solve basarisiz.")
@@ -167,6 +232,9 @@ def main():
             print(f"FOV:  {result.fov_deg:.3f}°")
         if result.solve_time_ms is not None:
             print(f"Sure: {result.solve_time_ms:.1f} ms")
+        if result.raw and result.raw.get("pole_xy") is not None:
+            pole_x, pole_y = result.raw["pole_xy"]
+            print(f"Kutup pikseli: ({pole_x:.1f}, {pole_y:.1f})")
 
         if args.assume_zenith:
             latitude = result.dec_deg
@@ -242,7 +310,11 @@ def main():
 
     try:
         print("⭐ Yıldızlar tespit ediliyor...")
-        stars, image_shape = detect_stars(image_path)
+        stars, image_shape = detect_stars(
+            image_path,
+            vertical_fov=vertical_fov if args.reduced_decode else None,
+            backend=args.detector,
+        )
         print(f"   ✓ {len(stars)} yıldız tespit edildi\n")
 
         if len(stars) == 0:
@@ -1,10 +1,21 @@
 from __future__ import annotations
 
+import math
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
+import numpy as np
 from PIL import Image
 
+from astro_nav.catalog import DEFAULT_CATALOG_PATH
+from astro_nav.plate_solver import (
+    PolarPlateSolution,
+    PolarPlateSolver,
+    focal_tolerance,
+    vertical_fov_from_horizontal,
+)
+from star_detection import detect_stars, find_star_blobs
+
 
 @dataclass
 class PlateSolveResult:
@@ -37,6 +48,8 @@ class OfflinePlateSolver:
 
         self._tetra3 = tetra3
         self._solver = tetra3.Tetra3()
+        # Yuklenen veritabani dosyasi (None: tetra3 varsayilani); onbellek kimligi icin.
+        self.database_path = database_path
         if database_path:
             self._solver.load_database(database_path)
 
@@ -55,33 +68,183 @@ class OfflinePlateSolver:
             fov_max_error=fov_max_error_deg,
             **kwargs,
         )
+        return _tetra3_result(result)
 
-        warnings: list[str] = []
-        if result is None or result.get("ra") is None or result.get("dec") is None:
-            warnings.append("Cozum basarisiz. FOV tahmini, veritabanini ve yildiz kalitesini kontrol et.")
-            return PlateSolveResult(
-                success=False,
-                ra_deg=None,
-                dec_deg=None,
-                roll_deg=None,
-                fov_deg=None,
-                solve_time_ms=result.get("T_solve") if isinstance(result, dict) else None,
-                warnings=warnings,
-                raw=result if isinstance(result, dict) else None,
-            )
-
-        ra = _maybe_rad_to_deg(result.get("ra"), max_abs_rad=6.283185307179586)
-        dec = _maybe_rad_to_deg(result.get("dec"), max_abs_rad=1.5707963267948966)
-        roll = _maybe_rad_to_deg(result.get("roll"), max_abs_rad=3.141592653589793)
-        fov = _maybe_rad_to_deg(result.get("fov"), max_abs_rad=6.283185307179586)
+    def solve_array(
+        self,
+        image: np.ndarray,
+        fov_estimate_deg: Optional[float] = None,
+        fov_max_error_deg: Optional[float] = None,
+        extract_kwargs: Optional[Dict[str, Any]] = None,
+    ) -> PlateSolveResult:
+        """Zaten cozulmus (gri veya BGR) goruntuyu dosyayi tekrar acmadan cozer."""
+        if image.ndim == 3:
+            image = image[..., ::-1]  # OpenCV BGR -> PIL RGB
+        result: Dict[str, Any] = self._solver.solve_from_image(
+            Image.fromarray(np.ascontiguousarray(image)),
+            fov_estimate=fov_estimate_deg,
+            fov_max_error=fov_max_error_deg,
+            **(extract_kwargs or {}),
+        )
+        return _tetra3_result(result)
 
+    def solve_centroids(
+        self,
+        centroids: np.ndarray,
+        image_size: tuple[int, int],
+        fov_estimate_deg: Optional[float] = None,
+        fov_max_error_deg: Optional[float] = None,
+        solve_kwargs: Optional[Dict[str, Any]] = None,
+    ) -> PlateSolveResult:
+        """
+        Onceden bulunmus yildiz merkezlerinden cozum (tetra3 `solve_from_centroids`); goruntu
+        tekrar okunmaz ve yildiz cikarimi tekrarlanmaz.
+
+        Args:
+            centroids: (N, 2) dizisi, (x, y) piksel, en parlak once
+            image_size: (height, width)
+        """
+        xy = np.asarray(centroids, dtype=np.float64).reshape(-1, 2)
+        result: Dict[str, Any] = self._solver.solve_from_centroids(
+            xy[:, ::-1],  # tetra3 (y, x) sirasini bekler
+            size=image_size,
+            fov_estimate=fov_estimate_deg,
+            fov_max_error=fov_max_error_deg,
+            **(solve_kwargs or {}),
+        )
+        return _tetra3_result(result)
+
+
+def _tetra3_result(result: Optional[Dict[str, Any]]) -> PlateSolveResult:
+    warnings: list[str] = []
+    if result is None or result.get("ra") is None or result.get("dec") is None:
+        warnings.append("Cozum basarisiz. FOV tahmini, veritabanini ve yildiz kalitesini kontrol et.")
         return PlateSolveResult(
-            success=True,
-            ra_deg=ra,
-            dec_deg=dec,
-            roll_deg=roll,
-            fov_deg=fov,
-            solve_time_ms=result.get("T_solve"),
+            success=False,
+            ra_deg=None,
+            dec_deg=None,
+            roll_deg=None,
+            fov_deg=None,
+            solve_time_ms=result.get("T_solve") if isinstance(result, dict) else None,
             warnings=warnings,
-            raw=result,
+            raw=result if isinstance(result, dict) else None,
         )
+
+    ra = _maybe_rad_to_deg(result.get("ra"), max_abs_rad=6.283185307179586)
+    dec = _maybe_rad_to_deg(result.get("dec"), max_abs_rad=1.5707963267948966)
+    roll = _maybe_rad_to_deg(result.get("roll"), max_abs_rad=3.141592653589793)
+    fov = _maybe_rad_to_deg(result.get("fov"), max_abs_rad=6.283185307179586)
+
+    return PlateSolveResult(
+        success=True,
+        ra_deg=ra,
+        dec_deg=dec,
+        roll_deg=roll,
+        fov_deg=fov,
+        solve_time_ms=result.get("T_solve"),
+        warnings=warnings,
+        raw=result,
+    )
+
+
+class CatalogPlateSolver:
+    """
+    tetra3 gerektirmeyen `OfflinePlateSolver` karsiligi: yildizlari `detect_stars` ile bulur ve
+    paketlenmis polar_star_catalog.json uzerinden `PolarPlateSolver` ile cozer. Yalnizca kutup
+    cevresindeki kareler icin calisir; `raw` kutup pikselini ve eslesme ayrintilarini tasir.
+    """
+
+    def __init__(self, catalog_path: Optional[str] = None, hemisphere: Optional[str] = None) -> None:
+        self.hemisphere = hemisphere
+        # Gercekte okunan katalog dosyasi; onbellek kimligi icin.
+        self.database_path = str(catalog_path or DEFAULT_CATALOG_PATH)
+        self._solver = PolarPlateSolver(catalog_path=catalog_path)
+        self._solver.warm_up([hemisphere] if hemisphere else ("north", "south"))
+
+    def solve_image(
+        self,
+        image_path: str,
+        fov_estimate_deg: Optional[float] = None,
+        fov_max_error_deg: Optional[float] = None,
+        extract_kwargs: Optional[Dict[str, Any]] = None,
+    ) -> PlateSolveResult:
+        stars, (height, width) = detect_stars(image_path, **(extract_kwargs or {}))
+        return self._solve_stars(stars, (height, width), fov_estimate_deg, fov_max_error_deg)
+
+    def solve_array(
+        self,
+        image: np.ndarray,
+        fov_estimate_deg: Optional[float] = None,
+        fov_max_error_deg: Optional[float] = None,
+        extract_kwargs: Optional[Dict[str, Any]] = None,
+    ) -> PlateSolveResult:
+        """Zaten cozulmus goruntu (gri veya BGR) uzerinde yildiz bulma + katalog cozumu."""
+        if image.ndim == 3:
+            # load_luminance ile ayni agirliklar
+            image = np.dot(image[..., ::-1].astype(np.float32), [0.299, 0.587, 0.114]).astype(np.uint8)
+        kwargs = {k: v for k, v in (extract_kwargs or {}).items() if k in ("centroid_method", "centroid_radius")}
+        stars = [(x, y, b) for x, y, b, _ in find_star_blobs(image, **kwargs)]
+        return self._solve_stars(stars, image.shape[:2], fov_estimate_deg, fov_max_error_deg)
+
+    def solve_centroids(
+        self,
+        centroids: np.ndarray,
+        image_size: tuple[int, int],
+        fov_estimate_deg: Optional[float] = None,
+        fov_max_error_deg: Optional[float] = None,
+        solve_kwargs: Optional[Dict[str, Any]] = None,
+    ) -> PlateSolveResult:
+        """`OfflinePlateSolver.solve_centroids` karsiligi: (x, y) merkezler, en parlak once."""
+        height, width = image_size
+        xy = np.asarray(centroids, dtype=np.float64).reshape(-1, 2)
+        vfov = vertical_fov_from_horizontal(fov_estimate_deg, width, height)
+        tolerance = focal_tolerance(fov_estimate_deg, fov_max_error_deg)
+        solution = self._solver.solve(
+            xy, width, height, hemisphere=self.hemisphere, vertical_fov_deg=vfov, focal_tolerance=tolerance
+        )
+        return _catalog_result(solution, width)
+
+    def _solve_stars(
+        self,
+        stars,
+        image_size: tuple[int, int],
+        fov_estimate_deg: Optional[float],
+        fov_max_error_deg: Optional[float],
+    ) -> PlateSolveResult:
+        stars = sorted(stars, key=lambda s: s[2], reverse=True)
+        xy = np.array([(x, y) for x, y, _ in stars], dtype=np.float64).reshape(-1, 2)
+        return self.solve_centroids(xy, image_size, fov_estimate_deg, fov_max_error_deg)
+
+
+def _catalog_result(solution: Optional[PolarPlateSolution], width: int) -> PlateSolveResult:
+    if solution is None:
+        return PlateSolveResult(
+            success=False,
+            ra_deg=None,
+            dec_deg=None,
+            roll_deg=None,
+            fov_deg=None,
+            solve_time_ms=None,
+            warnings=["Katalog eslesmesi bulunamadi. Kutup cevresi kadrajda olmali (en az 5 katalog yildizi)."],
+            raw=None,
+        )
+
+    focal = solution.scale_px_per_deg * 180.0 / math.pi
+    return PlateSolveResult(
+        success=True,
+        ra_deg=solution.ra_deg,
+        dec_deg=solution.dec_deg,
+        roll_deg=solution.roll_deg,
+        fov_deg=2.0 * math.degrees(math.atan((width / 2.0) / focal)),
+        solve_time_ms=solution.solve_time_ms,
+        warnings=[],
+        raw={
+            "hemisphere": solution.hemisphere,
+            "pole_xy": solution.pole_xy,
+            "scale_px_per_deg": solution.scale_px_per_deg,
+            "confidence": solution.confidence,
+            "residual_px": solution.residual_px,
+            "inliers": solution.inliers,
+            "visible": solution.visible,
+        },
+    )
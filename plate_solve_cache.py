@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from offline_plate_solver import PlateSolveResult
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "kutupp" / "plate_solve.sqlite"
+
+_CHUNK = 1 << 20
+# LRU damgasi veritabaninda uretilir; ayni dosyayi paylasan surecler ortak siralama gorur.
+_NEXT_USED = "(SELECT COALESCE(MAX(used), 0) + 1 FROM results)"
+# (yol, boyut, mtime_ns) -> icerik ozeti
+_DIGESTS: Dict[Tuple[str, int, int], str] = {}
+
+
+def file_digest(path: str | Path) -> str:
+    """
+    Dosya iceriginin SHA-256 ozeti. Ayni surecte (yol, boyut, mtime) degismediyse tekrar
+    okunmaz; boylece ayni goruntunun tekrar cozumunde anahtar mikrosaniyede hazirdir.
+    """
+    st = os.stat(path)
+    stamp = (str(Path(path).resolve()), st.st_size, st.st_mtime_ns)
+    digest = _DIGESTS.get(stamp)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(_CHUNK), b""):
+                h.update(chunk)
+        digest = _DIGESTS[stamp] = h.hexdigest()
+    return digest
+
+
+def _json_default(value: Any) -> Any:
+    # tetra3 ham sonucu NumPy dizileri/sayilari icerebilir.
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+class PlateSolveCache:
+    """
+    Icerik adresli, kalici plate solve sonuc onbellegi (SQLite). Anahtar: goruntu icerik
+    ozeti + FOV tahmini + FOV hata payi + veritabani kimligi + cikarim parametreleri.
+    `max_entries` asilinca en uzun suredir kullanilmayan kayitlar silinir (LRU).
+    `hits` / `misses` sayaclari `stats()` ile okunur.
+    """
+
+    def __init__(self, path: str | Path | None = None, max_entries: int = 10_000) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries en az 1 olmali")
+        self.path = Path(path) if path is not None else DEFAULT_CACHE_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL, used INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+
+    @staticmethod
+    def make_key(
+        image_digest: str,
+        fov_estimate_deg: Optional[float],
+        fov_max_error_deg: Optional[float],
+        database_identity: str,
+        extract_kwargs: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        params = json.dumps(
+            [image_digest, fov_estimate_deg, fov_max_error_deg, database_identity, extract_kwargs or {}],
+            sort_keys=True,
+            default=_json_default,
+        )
+        return hashlib.sha256(params.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[PlateSolveResult]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute(f"UPDATE results SET used = {_NEXT_USED} WHERE key = ?", (key,))
+        return PlateSolveResult(**json.loads(row[0]))
+
+    def put(self, key: str, result: PlateSolveResult) -> None:
+        value = json.dumps(asdict(result), default=_json_default)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO results (key, value, used) VALUES (?, ?, {_NEXT_USED})", (key, value)
+            )
+            excess = len(self) - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY used LIMIT ?)", (excess,)
+                )
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self)}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __len__(self) -> int:
+        return int(self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0])
+
+    def __enter__(self) -> "PlateSolveCache":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class CachedPlateSolver:
+    """
+    `solve_image` arayuzunu (OfflinePlateSolver / CatalogPlateSolver) onbellekle saran cozucu.
+    `database_identity` verilmezse cozucu sinif adi + cozucunun gercekte yukledigi dosyanin
+    (`solver.database_path`; CatalogPlateSolver icin varsayilan katalog dahil) icerik
+    ozetinden turetilir. `database_path` bu dosyayi acikca gecersiz kilar.
+    """
+
+    def __init__(
+        self,
+        solver: Any,
+        cache: PlateSolveCache,
+        database_path: str | None = None,
+        database_identity: str | None = None,
+    ) -> None:
+        self.solver = solver
+        self.cache = cache
+        if database_identity is None:
+            database_identity = type(solver).__name__
+            database_path = database_path or getattr(solver, "database_path", None)
+            if database_path:
+                database_identity += ":" + file_digest(database_path)
+            hemisphere = getattr(solver, "hemisphere", None)
+            if hemisphere:
+                database_identity += ":" + hemisphere
+        self.database_identity = database_identity
+
+    def solve_image(
+        self,
+        image_path: str,
+        fov_estimate_deg: Optional[float] = None,
+        fov_max_error_deg: Optional[float] = None,
+        extract_kwargs: Optional[Dict[str, Any]] = None,
+    ) -> PlateSolveResult:
+        key = self.cache.make_key(
+            file_digest(image_path), fov_estimate_deg, fov_max_error_deg, self.database_identity, extract_kwargs
+        )
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        result = self.solver.solve_image(
+            image_path,
+            fov_estimate_deg=fov_estimate_deg,
+            fov_max_error_deg=fov_max_error_deg,
+            extract_kwargs=extract_kwargs,
+        )
+        self.cache.put(key, result)
+        return result
@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import itertools
+import multiprocessing as mp
+import threading
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing.connection import wait
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from offline_plate_solver import CatalogPlateSolver, OfflinePlateSolver, PlateSolveResult
+
+SOLVERS = ("tetra3", "catalog")
+
+
+def failed_result(message: str) -> PlateSolveResult:
+    return PlateSolveResult(
+        success=False,
+        ra_deg=None,
+        dec_deg=None,
+        roll_deg=None,
+        fov_deg=None,
+        solve_time_ms=None,
+        warnings=[message],
+        raw=None,
+    )
+
+
+def create_solver(solver: str, database_path: Optional[str]):
+    if solver == "catalog":
+        return CatalogPlateSolver(catalog_path=database_path)
+    return OfflinePlateSolver(database_path=database_path)
+
+
+def _worker_main(solver: str, database_path: Optional[str], tasks, results) -> None:
+    """
+    Worker sureci: cozucuyu (tetra3 veritabani dahil) bir kez kurar, kendi borusundan is alir.
+    Borular worker'a ozeldir; olen bir worker paylasilan kilit birakmaz.
+    """
+    try:
+        instance = create_solver(solver, database_path)
+        error = None
+    except Exception as exc:
+        instance, error = None, f"Cozucu baslatilamadi: {exc}"
+    results.send(("ready", error))
+
+    while True:
+        try:
+            task = tasks.recv()
+        except EOFError:  # havuz kapandi
+            break
+        if task is None:  # kapatma isareti
+            break
+        job_id, kwargs = task
+        if instance is None:
+            results.send(("result", (job_id, failed_result(error))))
+            continue
+        try:
+            result = instance.solve_image(**kwargs)
+        except Exception as exc:
+            result = failed_result(f"Plate solve hatasi: {exc}")
+        results.send(("result", (job_id, result)))
+
+
+class PlateSolverPool:
+    """
+    Sicak plate solver havuzu: her worker sureci cozucuyu ve veritabanini bir kez yukler,
+    istekler bos worker'a tek tek dagitilir ve sonuclar `PlateSolveResult` olarak doner.
+    Toplu ve servis kullaniminda veritabani yukleme maliyeti goruntu basina degil worker
+    basina bir kez odenir.
+
+    `solver="catalog"` tetra3 yerine `CatalogPlateSolver` kullanir (`database_path` o zaman
+    katalog JSON yoludur).
+
+    Beklenmedik sekilde olen worker'in elindeki istek basarisiz sonuc ile biter ve worker
+    yeniden baslatilir; `max_restarts` asilinca havuz bozuk sayilir, bekleyen istekler
+    basarisiz olur ve yeni istek kabul edilmez.
+
+    Kullanim:
+        with PlateSolverPool(workers=4, database_path="db.npz") as pool:
+            results = pool.map(paths, fov_estimate_deg=70)
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        database_path: Optional[str] = None,
+        solver: str = "tetra3",
+        start_method: str = "spawn",
+        max_restarts: int = 3,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers en az 1 olmali")
+        if solver not in SOLVERS:
+            raise ValueError(f"Bilinmeyen cozucu: {solver}")
+        self._ctx = mp.get_context(start_method)
+        self._solver = solver
+        self._database_path = database_path
+        self._size = workers
+        self._restarts_left = max_restarts
+        self._futures: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._worker_ids = itertools.count()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._closed = False
+        self._broken: Optional[str] = None
+        self.worker_errors: List[str] = []
+
+        # Is dagitimi ebeveynde: her worker'in tek isi `_running` icinde izlenir, boylece
+        # olen worker'in istegi bilinir.
+        self._pending: Deque[Tuple[int, Dict[str, Any]]] = deque()
+        self._idle: List[int] = []
+        self._running: Dict[int, int] = {}
+        self._starting: Set[int] = set()
+        # worker_id -> (surec, is borusu, sonuc borusu)
+        self._workers: Dict[int, Tuple[Any, Any, Any]] = {}
+        with self._lock:
+            for _ in range(workers):
+                self._spawn()
+        # Surecler baslatildiktan sonra: sonuc toplayici thread.
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+        self._collector.start()
+
+    @property
+    def workers(self) -> int:
+        return self._size
+
+    @property
+    def worker_pids(self) -> List[int]:
+        """Su an calisan worker sureclerinin PID'leri (izleme icin)."""
+        with self._lock:
+            return [process.pid for process, _, _ in self._workers.values() if process.exitcode is None]
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Tum worker'lar cozucuyu kurana (veya olene) kadar bekler; zaman asiminda False."""
+        return self._ready.wait(timeout)
+
+    def submit(
+        self,
+        image_path: str,
+        fov_estimate_deg: Optional[float] = None,
+        fov_max_error_deg: Optional[float] = None,
+        extract_kwargs: Optional[Dict[str, Any]] = None,
+    ) -> Future:
+        kwargs = {
+            "image_path": str(image_path),
+            "fov_estimate_deg": fov_estimate_deg,
+            "fov_max_error_deg": fov_max_error_deg,
+            "extract_kwargs": extract_kwargs,
+        }
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Havuz kapatildi")
+            if self._broken is not None:
+                raise RuntimeError(self._broken)
+            job_id = next(self._ids)
+            self._futures[job_id] = future
+            self._pending.append((job_id, kwargs))
+            self._dispatch()
+        return future
+
+    def solve(self, image_path: str, **kwargs: Any) -> PlateSolveResult:
+        return self.submit(image_path, **kwargs).result()
+
+    def map(self, image_paths: Iterable[str], **kwargs: Any) -> List[PlateSolveResult]:
+        """Sonuclar giris sirasiyla doner."""
+        futures = [self.submit(path, **kwargs) for path in image_paths]
+        return [f.result() for f in futures]
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Nazik kapatma: yeni istek alinmaz, kuyruktaki isler bitirilir, worker'lar cikar.
+        `timeout` icinde cikmayan surecler sonlandirilir ve bekleyen isler hata ile biter.
+        Kapanirken olen worker yeniden baslatilmaz; hic worker kalmazsa bekleyen isler hata
+        ile biter, bu yuzden `timeout=None` de olu worker yuzunden asili kalmaz.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            idle, self._idle = self._idle, []
+            for worker_id in idle:
+                self._release(worker_id)
+            processes = [process for process, _, _ in self._workers.values()]
+        for process in processes:
+            process.join(timeout)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self._stop.set()
+        self._collector.join()
+        with self._lock:
+            pending, self._futures = self._futures, {}
+            self._pending.clear()
+            for _, tasks, results in self._workers.values():
+                tasks.close()
+                results.close()
+        for future in pending.values():
+            future.set_exception(RuntimeError("Havuz kapatildi, istek tamamlanamadi"))
+
+    def __enter__(self) -> "PlateSolverPool":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    # Asagidaki yardimcilar `_lock` altinda cagrilir.
+
+    def _spawn(self) -> None:
+        worker_id = next(self._worker_ids)
+        task_reader, task_writer = self._ctx.Pipe(duplex=False)
+        result_reader, result_writer = self._ctx.Pipe(duplex=False)
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(self._solver, self._database_path, task_reader, result_writer),
+            daemon=True,
+        )
+        process.start()
+        task_reader.close()
+        result_writer.close()
+        self._workers[worker_id] = (process, task_writer, result_reader)
+        self._starting.add(worker_id)
+
+    def _send(self, worker_id: int, task: Any) -> None:
+        try:
+            self._workers[worker_id][1].send(task)
+        except OSError:
+            pass  # worker olmus; `_reap` elindeki isi basarisiz sayar
+
+    def _dispatch(self) -> None:
+        while self._idle and self._pending:
+            worker_id = self._idle.pop()
+            job_id, kwargs = self._pending.popleft()
+            self._running[worker_id] = job_id
+            self._send(worker_id, (job_id, kwargs))
+
+    def _release(self, worker_id: int) -> None:
+        """Isi biten (veya yeni hazir) worker'a siradaki isi verir; kapanista cikis isareti."""
+        if self._pending:
+            self._idle.append(worker_id)
+            self._dispatch()
+        elif self._closed:
+            self._send(worker_id, None)
+        else:
+            self._idle.append(worker_id)
+
+    def _mark_started(self, worker_id: int) -> None:
+        self._starting.discard(worker_id)
+        if not self._starting:
+            self._ready.set()
+
+    def _reap(self) -> List[Tuple[Future, PlateSolveResult]]:
+        """Olen worker'lari bulur; ellerindeki istekleri basarisiz sayar, yerlerine yenisini acar."""
+        failed: List[Tuple[Future, PlateSolveResult]] = []
+        for worker_id, (process, tasks, results) in list(self._workers.items()):
+            if process.exitcode is None:
+                continue
+            del self._workers[worker_id]
+            tasks.close()
+            results.close()
+            if worker_id in self._idle:
+                self._idle.remove(worker_id)
+            if worker_id in self._starting:
+                self.worker_errors.append(f"Worker sureci baslarken coktu (cikis kodu {process.exitcode})")
+                self._mark_started(worker_id)
+            job_id = self._running.pop(worker_id, None)
+            if job_id is not None:
+                future = self._futures.pop(job_id, None)
+                if future is not None:
+                    message = f"Worker sureci coktu (cikis kodu {process.exitcode}); istek tamamlanamadi"
+                    failed.append((future, failed_result(message)))
+            if self._closed or self._broken is not None or process.exitcode == 0:
+                continue
+            if self._restarts_left > 0:
+                self._restarts_left -= 1
+                self._spawn()
+            else:
+                self._broken = "Havuz bozuk: worker surecleri tekrar tekrar coktu"
+        if (self._broken is not None or self._closed) and not self._workers:
+            # Isi yapacak worker kalmadi: kuyruktakiler de basarisiz.
+            message = self._broken or "Havuz kapatildi, worker kalmadi"
+            while self._pending:
+                job_id, _ = self._pending.popleft()
+                future = self._futures.pop(job_id, None)
+                if future is not None:
+                    failed.append((future, failed_result(message)))
+        return failed
+
+    def _collect(self) -> None:
+        while not self._stop.is_set():
+            with self._lock:
+                readers = {results: worker_id for worker_id, (_, _, results) in self._workers.items()}
+                sentinels = [process.sentinel for process, _, _ in self._workers.values()]
+            if not readers:
+                self._stop.wait(0.2)
+            ready = set(wait(list(readers) + sentinels, timeout=0.2)) if readers else set()
+            done: List[Tuple[Future, PlateSolveResult]] = []
+            with self._lock:
+                for results, worker_id in readers.items():
+                    if results not in ready or worker_id not in self._workers:
+                        continue
+                    try:
+                        kind, payload = results.recv()
+                    except (EOFError, OSError):
+                        continue  # boru kapandi; surec `_reap` ile toplanir
+                    if kind == "ready":
+                        if payload is not None:
+                            self.worker_errors.append(payload)
+                        self._mark_started(worker_id)
+                        self._release(worker_id)
+                    elif kind == "result":
+                        job_id, result = payload
+                        self._running.pop(worker_id, None)
+                        future = self._futures.pop(job_id, None)
+                        if future is not None:
+                            done.append((future, result))
+                        self._release(worker_id)
+                done += self._reap()
+            # Future geri cagirimlari kilit disinda calissin.
+            for future, result in done:
+                future.set_result(result)
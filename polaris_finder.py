@@ -3,6 +3,7 @@
 
 import math
 import numpy as np
+from scipy.spatial import cKDTree
 
 # Güney yarımkürede kullanılan yıldız
 # Sigma Octantis: çok sönük (~mag 5.4) ama tek güney kutup yıldızı
@@ -73,11 +74,52 @@ def calculate_brightness_score(brightness, all_brightnesses, hemisphere='north')
         return min(south_score, 1.0)
 
 
+def isolation_scores(xy, image_height, image_width, neighbours=5):
+    """
+    calculate_isolation_score'un tüm yıldızlar için toplu hali: en yakın `neighbours`
+    komşuya ortalama uzaklık / görüntü köşegeni. Komşular cKDTree k-NN sorgusuyla bulunur
+    (O(N log N)); tam sıralı uzaklık listesi kurulmaz.
+    """
+    n = len(xy)
+    if n < 2:
+        return np.full(n, 0.5)
+    k = min(neighbours, n - 1)
+    dist, _ = cKDTree(xy).query(xy, k=k + 1)
+    # İlk sütun yıldızın kendisi (uzaklık 0)
+    avg_dist = dist[:, 1:].mean(axis=1)
+    return np.minimum(avg_dist / math.hypot(image_height, image_width), 1.0)
+
+
+def height_scores(ys, image_height, hemisphere='north'):
+    """calculate_height_score'un dizi hali (iki yarımkürede de üst %70)."""
+    relative_y = np.asarray(ys, dtype=np.float64) / image_height
+    return np.where(relative_y > 0.7, 0.0, 1.0 - relative_y / 0.7)
+
+
+def brightness_scores(brightnesses, hemisphere='north'):
+    """calculate_brightness_score'un dizi hali; max ve ortalama bir kez hesaplanır."""
+    b = np.asarray(brightnesses, dtype=np.float64)
+    norm = b / 255.0
+    if hemisphere != 'north':
+        return np.minimum(1.0 - norm, 1.0)
+    if b.size == 0:
+        return norm
+    max_b = b.max()
+    mean_b = b.mean()
+    # Aşırı parlaksa ceza (gezegen olabilir)
+    if max_b > 0 and max_b > mean_b * 2:
+        norm = np.where(b > 0.9 * max_b, norm * 0.5, norm)
+    return np.minimum(norm, 1.0)
+
+
 def find_polaris(stars, image_shape, top_candidates=50, hemisphere='north'):
     """
     Kuzey: Polaris ara
     Güney: Sigma Octantis ara
 
+    Skorlar dizilerle tek geçişte hesaplanır (izolasyon için cKDTree), bu yüzden
+    top_candidates binlerce olabilir.
+
     Args:
         stars: [(x, y, brightness), ...] listesi
         image_shape: (height, width)
@@ -90,63 +132,45 @@ def find_polaris(stars, image_shape, top_candidates=50, hemisphere='north'):
     height = image_shape[0]
     width = image_shape[1]
 
+    data = np.asarray(stars, dtype=np.float64).reshape(-1, 3)
+    if len(stars) > top_candidates:
+        # Kuzeyde en parlak, güneyde (Sigma Octantis çok sönük) en sönük adaylar
+        key = -data[:, 2] if hemisphere == 'north' else data[:, 2]
+        order = np.argsort(key, kind='stable')[:top_candidates]
+    else:
+        order = np.arange(len(stars))
+    candidates = data[order]
+
+    height_score = height_scores(candidates[:, 1], height, hemisphere)
+    brightness_score = brightness_scores(candidates[:, 2], hemisphere)
+    iso_score = isolation_scores(candidates[:, :2], height, width)
+
     if hemisphere == 'north':
-        # Kuzeyde: en parlak 50 adaya bak
-        if len(stars) > top_candidates:
-            sorted_stars = sorted(stars, key=lambda s: -s[2])[:top_candidates]
-        else:
-            sorted_stars = stars
+        # Kuzey ağırlıkları
+        total_score = 0.4 * height_score + 0.3 * brightness_score + 0.3 * iso_score
     else:
-        # Güneyde: Sigma Octantis çok sönük — en sönük 50 adaya bak
-        if len(stars) > top_candidates:
-            sorted_stars = sorted(stars, key=lambda s: s[2])[:top_candidates]
-        else:
-            sorted_stars = stars
-
-    all_brightnesses = [s[2] for s in sorted_stars]
-
-    best_star = None
-    best_score = -1
-    scores_debug = []
-
-    for star in sorted_stars:
-        x, y, brightness = star
-
-        height_score = calculate_height_score(y, height, hemisphere)
-        brightness_score = calculate_brightness_score(brightness, all_brightnesses, hemisphere)
-        iso_score = calculate_isolation_score(star, sorted_stars, height, width)
-
-        if hemisphere == 'north':
-            # Kuzey ağırlıkları
-            total_score = (
-                0.4 * height_score +
-                0.3 * brightness_score +
-                0.3 * iso_score
-            )
-        else:
-            # Güney: izolasyon daha kritik (Sigma Octantis çok izole)
-            total_score = (
-                0.35 * height_score +
-                0.25 * brightness_score +
-                0.40 * iso_score
-            )
-
-        scores_debug.append({
-            'star': star,
-            'height_score': round(height_score, 3),
-            'brightness_score': round(brightness_score, 3),
-            'iso_score': round(iso_score, 3),
-            'total_score': round(total_score, 3)
-        })
-
-        if total_score > best_score:
-            best_score = total_score
-            best_star = star
+        # Güney: izolasyon daha kritik (Sigma Octantis çok izole)
+        total_score = 0.35 * height_score + 0.25 * brightness_score + 0.40 * iso_score
+
+    best = int(np.argmax(total_score))
+    best_star = stars[int(order[best])]
+    best_score = float(total_score[best])
+
+    scores_debug = [
+        {
+            'star': stars[int(i)],
+            'height_score': round(float(h), 3),
+            'brightness_score': round(float(b), 3),
+            'iso_score': round(float(iso), 3),
+            'total_score': round(float(t), 3)
+        }
+        for i, h, b, iso, t in zip(order, height_score, brightness_score, iso_score, total_score)
+    ]
 
     debug_info = {
-        'total_candidates': len(sorted_stars),
+        'total_candidates': len(candidates),
         'scores': scores_debug,
         'best_score': round(best_score, 3)
     }
 
-    return best_star, best_score, debug_info
\ No newline at end of file
+    return best_star, best_score, debug_info
@@ -2,35 +2,129 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 from dataclasses import asdict
 
 from astro_nav import LatitudeEstimator, ProcessingConfig
-from astro_nav.config import SolverConfig
+from astro_nav.backends import available_backends
+from astro_nav.config import DetectionConfig, PatternConfig, SolverConfig
+from astro_nav.plate_solver import PolarPlateSolver
+from astro_nav.sky_patterns import day_of_year
+
+
+def _capture_day(utc: str | None, image_path: str) -> float | None:
+    """Day of year from --utc, else from the EXIF capture time (local date is close enough)."""
+    if utc:
+        from time_utils import parse_iso_utc
+
+        return day_of_year(parse_iso_utc(utc))
+    from exif_reader import read_datetime_from_exif
+
+    taken, _ = read_datetime_from_exif(image_path)
+    return None if taken is None else day_of_year(taken)
+
+
+_IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".tif", ".tiff", ".fits", ".fit", ".fts", ".dng")
+
+
+def _batch_paths(entries: list[str]):
+    """Files as given; directories expand (sorted, lazily) to the images they contain."""
+    for entry in entries:
+        if os.path.isdir(entry):
+            for name in sorted(os.listdir(entry)):
+                if name.lower().endswith(_IMAGE_EXTENSIONS):
+                    yield os.path.join(entry, name)
+        else:
+            yield entry
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Night-sky latitude estimation (north/south modes)")
-    parser.add_argument("--image", required=True, help="Path to night-sky image")
-    parser.add_argument("--mode", required=True, choices=["north", "south"], help="Hemisphere mode")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--image", help="Path to night-sky image")
+    source.add_argument("--burst", nargs="+", metavar="FRAME", help="Short-exposure frames to align and stack")
+    source.add_argument(
+        "--batch",
+        nargs="+",
+        metavar="PATH",
+        help="Process many images (files or directories) on a process pool; prints one JSON line per image",
+    )
+    parser.add_argument("--mode", required=True, choices=["north", "south", "auto"], help="Hemisphere mode (auto: solve both, keep the more confident)")
     parser.add_argument("--vfov", type=float, default=60.0, help="Vertical field-of-view in degrees")
     parser.add_argument("--hfov", type=float, default=70.0, help="Horizontal field-of-view in degrees")
     parser.add_argument("--pitch", type=float, default=0.0, help="Camera pitch in degrees")
     parser.add_argument("--roll", type=float, default=0.0, help="Camera roll in degrees")
     parser.add_argument("--expected-lat", type=float, default=None, help="Expected latitude hint for sanity checks")
+    parser.add_argument("--calibration", default=None, help="Device calibration directory (build_calibration.py)")
+    parser.add_argument("--detector", default="auto", choices=available_backends(), help="Star detector backend")
+    parser.add_argument(
+        "--reduced-decode",
+        action="store_true",
+        help="Decode JPEGs at reduced DCT scale (faster; faint 1-3 px stars may be lost)",
+    )
     parser.add_argument("--debug", action="store_true", help="Print debug outputs for SCP/Crux altitude")
+    parser.add_argument(
+        "--plate-solve",
+        default=None,
+        choices=["catalog", "tetra3"],
+        help="Also plate-solve the detected centroids (catalog: bundled polar catalog, tetra3: --db database)",
+    )
+    parser.add_argument("--db", default=None, help="tetra3 database path for --plate-solve tetra3")
+    parser.add_argument("--sky-patterns", action="store_true", help="Run the seasonal sky-pattern prior first")
+    parser.add_argument("--min-prior", type=float, default=0.0, help="Skip the pole search below this prior score")
+    parser.add_argument("--utc", default=None, help="Capture time (ISO 8601) for the seasonal prior; default: EXIF")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for --batch (default: all cores)")
+    parser.add_argument("--unordered", action="store_true", help="Emit --batch results as they complete")
+    parser.add_argument("--max-in-flight", type=int, default=None, help="Images queued at once for --batch")
     args = parser.parse_args()
 
-    cfg = ProcessingConfig(solver=SolverConfig(
-        vertical_fov_deg=args.vfov,
-        horizontal_fov_deg=args.hfov,
-        camera_pitch_deg=args.pitch,
-        camera_roll_deg=args.roll,
-        expected_latitude_deg=args.expected_lat,
-        debug=args.debug,
-    ))
-    estimator = LatitudeEstimator(cfg)
-    result = estimator.process_file(args.image, args.mode)
-    print(json.dumps(asdict(result), indent=2))
+    cfg = ProcessingConfig(
+        detection=DetectionConfig(
+            backend=args.detector,
+            calibration_path=args.calibration,
+            reduced_decode=args.reduced_decode,
+        ),
+        solver=SolverConfig(
+            vertical_fov_deg=args.vfov,
+            horizontal_fov_deg=args.hfov,
+            camera_pitch_deg=args.pitch,
+            camera_roll_deg=args.roll,
+            expected_latitude_deg=args.expected_lat,
+            debug=args.debug,
+        ),
+        patterns=PatternConfig(enabled=args.sky_patterns, min_prior=args.min_prior),
+    )
+    if args.batch:
+        # Workers rebuild the estimator from cfg; per-image capture dates are not looked up,
+        # but a --utc date applies to the whole batch.
+        day = None
+        if args.sky_patterns and args.utc:
+            from time_utils import parse_iso_utc
+
+            day = day_of_year(parse_iso_utc(args.utc))
+        estimator = LatitudeEstimator(cfg)
+        results = estimator.process_many(
+            _batch_paths(args.batch), args.mode, args.workers, not args.unordered, args.max_in_flight, day
+        )
+        for result in results:
+            print(json.dumps(asdict(result), default=str), flush=True)
+        return
+    day = None
+    if args.sky_patterns:
+        day = _capture_day(args.utc, args.image or args.burst[0])
+    plate_solver = None
+    if args.plate_solve == "catalog":
+        plate_solver = PolarPlateSolver()
+    elif args.plate_solve == "tetra3":
+        from offline_plate_solver import OfflinePlateSolver
+
+        plate_solver = OfflinePlateSolver(database_path=args.db)
+    estimator = LatitudeEstimator(cfg, plate_solver=plate_solver)
+    if args.burst:
+        result = estimator.process_burst(args.burst, args.mode, day)
+    else:
+        result = estimator.process_file(args.image, args.mode, day)
+    print(json.dumps(asdict(result), indent=2, default=str))
 
 
 if __name__ == "__main__":
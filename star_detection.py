@@ -1,83 +1,61 @@
 import cv2
 import numpy as np
 
-
-def adaptive_threshold(img_blur, base_threshold=180):
-    """
-    Görüntünün genel parlaklığına göre threshold otomatik ayarlanır.
-    
-    Eski kod: sabit 180 → karanlık gecelerde yıldız bulamaz,
-              aydınlık gecelerde gürültü dolar
-    Yeni kod: görüntü medyanına göre dinamik threshold
-    """
-    median_brightness = np.median(img_blur)
-
-    # Gece gökyüzü çok karanlıksa (medyan < 30) eşiği düşür
-    # Aydınlık geceyse (medyan > 60) eşiği yükselt
-    if median_brightness < 30:
-        # Çok karanlık gece — medyanın 4-5 katı
-        threshold = max(base_threshold * 0.6, median_brightness * 5)
-    elif median_brightness > 80:
-        # Şehir ışığı var — daha yüksek eşik
-        threshold = min(base_threshold * 1.3, 240)
-    else:
-        threshold = base_threshold
-
-    return int(threshold)
+from astro_nav.backends import create_detector
+from astro_nav.config import DetectionConfig
+# Kontur dedektoru astro_nav.contour'a tasindi; eski isimler buradan da kullanilabilir.
+from astro_nav.contour import (  # noqa: F401
+    adaptive_threshold,
+    blob_brightness,
+    calculate_area_limits,
+    find_star_blobs,
+    label_contours,
+)
+from astro_nav.image_source import (
+    JPEG_EXTENSIONS,
+    MAPPED_EXTENSIONS,
+    jpeg_size,
+    open_image_source,
+    read_reduced_gray,
+    reduced_decode_scale,
+    to_display_8bit,
+    to_full_resolution,
+)
 
 
 def get_star_brightness(img, cnt, x, y, w, h):
     """
-    Yıldızın gerçek parlaklığını hesaplar.
-    
-    Eski kod: bounding box tüm piksel ortalaması → karanlık kenarlar dahil
-    Yeni kod: sadece kontur içindeki piksellerin maksimum + ortalama kombinasyonu
+    Tek bir konturun parlaklığı (0.6 * max + 0.4 * ortalama).
+
+    Maske artık tam görüntü yerine sadece konturun bounding box'ı kadar
+    oluşturulur; toplu kullanım için blob_brightness() tercih edilmeli.
     """
-    # Kontur maskesi oluştur
-    mask = np.zeros(img.shape[:2], dtype=np.uint8)
-    cv2.drawContours(mask, [cnt], -1, 255, -1)
+    mask = np.zeros((h, w), dtype=np.uint8)
+    cv2.drawContours(mask, [cnt], -1, 255, -1, offset=(-x, -y))
 
-    # Sadece yıldız piksellerini al
-    star_pixels = img[mask == 255]
+    star_pixels = img[y:y + h, x:x + w][mask == 255]
 
     if len(star_pixels) == 0:
         return 0.0
 
-    # Maksimum parlaklık + ortalama kombinasyonu
-    # Max: yıldızın gerçek tepe parlaklığı
-    # Mean: gürültüye karşı dayanıklılık
     brightness = 0.6 * np.max(star_pixels) + 0.4 * np.mean(star_pixels)
     return float(brightness)
 
 
-def calculate_area_limits(img_shape):
+def load_luminance(image_path):
     """
-    Görüntü boyutuna göre dinamik alan sınırları hesaplar.
-    
-    Eski kod: sabit 3-200 → yüksek çözünürlükte yıldızları eliyor
-    Yeni kod: görüntü diyagonaline orantılı
-    """
-    height, width = img_shape[:2]
-    diagonal = np.hypot(height, width)
-
-    # Diyagonalin binde 0.5'i ile binde 10'u arasındaki nesneler yıldız
-    min_area = max(3, (diagonal * 0.0005) ** 2)
-    max_area = min(500, (diagonal * 0.01) ** 2)
+    Yıldız tespiti için tek kanallı 8-bit görüntü.
 
-    return min_area, max_area
-
-
-def detect_stars(image_path):
+    FITS, sıkıştırılmamış TIFF/DNG yolları ve ImageSource nesneleri bellek eşlemeli
+    okunur (tam BGR kopyası yok); diğer formatlar eskisi gibi renkli çözülür.
     """
-    Yıldızları tespit eder ve merkez koordinatlarıyla parlaklığını döndürür.
+    if not isinstance(image_path, str) or image_path.lower().endswith(MAPPED_EXTENSIONS):
+        try:
+            gray = open_image_source(image_path).gray()
+        except (ValueError, OSError) as exc:
+            raise ValueError(f"Görüntü yüklenemedi: {image_path}") from exc
+        return np.ascontiguousarray(to_display_8bit(gray))
 
-    Args:
-        image_path: Gökyüzü fotoğrafı yolu
-
-    Returns:
-        stars: [(x, y, brightness), ...] listesi
-        shape: Görüntü boyutları (height, width)
-    """
     # DÜZELTME: Renkli oku, sonra luminance'a çevir
     # Gri direkt okumak yerine weighted luminance daha doğru yıldız rengi yakalar
     img_color = cv2.imread(image_path, cv2.IMREAD_COLOR)
@@ -86,43 +64,62 @@ def detect_stars(image_path):
         raise ValueError(f"Görüntü yüklenemedi: {image_path}")
 
     # Luminance = 0.299R + 0.587G + 0.114B (insan gözü ağırlıkları)
-    img = np.dot(img_color[..., ::-1].astype(np.float32),
-                 [0.299, 0.587, 0.114]).astype(np.uint8)
-
-    # Gaussian blur — kernel boyutu görüntüye orantılı
-    blur_kernel = 5
-    img_blur = cv2.GaussianBlur(img, (blur_kernel, blur_kernel), 0)
-
-    # DÜZELTME: Adaptif threshold
-    threshold_val = adaptive_threshold(img_blur)
-    _, thresh = cv2.threshold(img_blur, threshold_val, 255, cv2.THRESH_BINARY)
-
-    # Morfoloji — küçük gürültü temizle
-    kernel = np.ones((3, 3), np.uint8)
-    thresh = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel, iterations=1)
+    return np.dot(img_color[..., ::-1].astype(np.float32),
+                  [0.299, 0.587, 0.114]).astype(np.uint8)
 
-    # Konturları bul
-    contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
 
-    # DÜZELTME: Dinamik alan limitleri
-    min_area, max_area = calculate_area_limits(img.shape)
-
-    stars = []
-    for cnt in contours:
-        area = cv2.contourArea(cnt)
+def reduced_jpeg_scale(image_path, vertical_fov, star_size_arcmin=6.0, min_star_diameter=4.0):
+    """
+    JPEG için DCT ölçekli okuma katsayısı (1, 2, 4 veya 8).
 
-        if min_area < area < max_area:
-            x, y, w, h = cv2.boundingRect(cnt)
+    Beklenen yıldız boyutu (ark dakika) ve dikey FOV'dan yıldızın piksel çapı hesaplanır;
+    küçültülmüş görüntüde yıldız en az `min_star_diameter` piksel kalacak en büyük ölçek seçilir.
+    """
+    if vertical_fov is None or not isinstance(image_path, str):
+        return 1
+    if not image_path.lower().endswith(JPEG_EXTENSIONS):
+        return 1
+    try:
+        height, _ = jpeg_size(image_path)
+    except OSError:
+        return 1
+    return reduced_decode_scale(height, vertical_fov, star_size_arcmin, min_star_diameter)
+
+
+def detect_stars(image_path, centroid_method="moments", centroid_radius=3,
+                 vertical_fov=None, star_size_arcmin=6.0, backend=None):
+    """
+    Yıldızları tespit eder ve merkez koordinatlarıyla parlaklığını döndürür.
 
-            # Merkez koordinat (integer değil float — daha hassas)
-            cx = x + w / 2.0
-            cy = y + h / 2.0
+    Args:
+        image_path: Gökyüzü fotoğrafı yolu veya astro_nav ImageSource
+        centroid_method: "none" (bounding box ortası), "moments" veya "gaussian"
+        centroid_radius: Alt-piksel merkez penceresinin yarıçapı (piksel)
+        vertical_fov: Dikey FOV (derece). Verilirse JPEG'ler küçültülmüş ölçekte gri okunur;
+            koordinatlar yine tam çözünürlük pikselleri olarak döner.
+        star_size_arcmin: Ölçek seçimi için beklenen yıldız boyutu (ark dakika)
+        backend: Dedektör adı (astro_nav.backends.available_backends()); None veya "contour"
+            kontur tespitini (astro_nav.contour.find_star_blobs) kullanır.
 
-            # DÜZELTME: Gerçek yıldız parlaklığı (kontur maskesi ile)
-            brightness = get_star_brightness(img, cnt, x, y, w, h)
+    Returns:
+        stars: [(x, y, brightness), ...] listesi
+        shape: Tam çözünürlük görüntü boyutları (height, width)
+    """
+    scale = reduced_jpeg_scale(image_path, vertical_fov, star_size_arcmin)
+    if scale > 1:
+        full_shape = jpeg_size(image_path)
+        img = read_reduced_gray(image_path, scale)
+    else:
+        img = load_luminance(image_path)
+        full_shape = img.shape
 
-            # Çok sönük yıldızları ele (parlaklık threshold'un %70'inden düşükse)
-            if brightness > threshold_val * 0.7:
-                stars.append((cx, cy, brightness))
+    if backend is None or backend == "contour":
+        stars = [(x, y, b) for x, y, b, _ in find_star_blobs(img, centroid_method, centroid_radius)]
+    else:
+        # Kayıtlı bir astro_nav dedektörü (DetectionConfig varsayılanları, en parlak top_star_limit yıldız)
+        config = DetectionConfig(centroid_method=centroid_method, centroid_radius_px=centroid_radius)
+        stars = [(s.x, s.y, s.brightness) for s in create_detector(backend, config).detect(img)]
 
-    return stars, img.shape
\ No newline at end of file
+    if scale > 1:
+        stars = [(to_full_resolution(x, scale), to_full_resolution(y, scale), b) for x, y, b in stars]
+    return stars, full_shape
\ No newline at end of file